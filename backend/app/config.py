@@ -16,9 +16,153 @@ class Settings(BaseSettings):
     root_path: str = Field("", env="ROOT_PATH")
     logging_level: str = Field("INFO", env="LOGGING_LEVEL")
 
+    # Database connection pool, per worker process: Postgres sees up to
+    # WEB_CONCURRENCY x (pool size + overflow) connections. DB_PGBOUNCER
+    # turns off prepared statement caching for PgBouncer transaction mode.
+    db_pool_size: int = Field(5, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(10, env="DB_MAX_OVERFLOW")
+    db_pool_timeout_seconds: float = Field(30.0, env="DB_POOL_TIMEOUT_SECONDS")
+    db_pool_recycle_seconds: int = Field(1800, env="DB_POOL_RECYCLE_SECONDS")
+    db_pool_pre_ping: bool = Field(False, env="DB_POOL_PRE_PING")
+    db_connect_timeout_seconds: float = Field(10.0, env="DB_CONNECT_TIMEOUT_SECONDS")
+    db_command_timeout_seconds: float = Field(0.0, env="DB_COMMAND_TIMEOUT_SECONDS")
+    db_statement_cache_size: int = Field(100, env="DB_STATEMENT_CACHE_SIZE")
+    db_pgbouncer: bool = Field(False, env="DB_PGBOUNCER")
+    db_pool_stats_interval_seconds: float = Field(
+        60.0, env="DB_POOL_STATS_INTERVAL_SECONDS"
+    )
+
+    # Optional read replica behind get_read_db. A client's reads stay on the
+    # primary for DB_READ_YOUR_WRITES_SECONDS after its writes (per worker),
+    # and everyone's do while the replica lags more than
+    # DB_REPLICA_MAX_LAG_SECONDS or for DB_REPLICA_RETRY_SECONDS after it fails.
+    db_replica_uri: str = Field("", env="DB_REPLICA_URI")
+    db_read_your_writes_seconds: float = Field(5.0, env="DB_READ_YOUR_WRITES_SECONDS")
+    db_replica_max_lag_seconds: float = Field(5.0, env="DB_REPLICA_MAX_LAG_SECONDS")
+    db_replica_retry_seconds: float = Field(30.0, env="DB_REPLICA_RETRY_SECONDS")
+    db_replica_check_interval_seconds: float = Field(
+        5.0, env="DB_REPLICA_CHECK_INTERVAL_SECONDS"
+    )
+
+    # Per-request SQL statement counts, added to the request log line and,
+    # with QUERY_STATS_HEADER, to an X-DB-Queries response header (debug
+    # only). A statement repeated QUERY_REPEAT_THRESHOLD times within one
+    # request is logged as a likely N+1.
+    query_stats_enabled: bool = Field(True, env="QUERY_STATS_ENABLED")
+    query_stats_header: bool = Field(False, env="QUERY_STATS_HEADER")
+    query_repeat_threshold: int = Field(5, env="QUERY_REPEAT_THRESHOLD")
+
+    # Slow-query log: statements over SLOW_QUERY_MS (0 disables) are logged
+    # with their route, SQL fingerprint and bind-parameter shapes (never the
+    # values) and ranked per worker at /api/admin/slow-queries. With
+    # SLOW_QUERY_EXPLAIN the first one of each fingerprint is EXPLAINed.
+    slow_query_ms: float = Field(200.0, env="SLOW_QUERY_MS")
+    slow_query_explain: bool = Field(False, env="SLOW_QUERY_EXPLAIN")
+    slow_query_max_fingerprints: int = Field(500, env="SLOW_QUERY_MAX_FINGERPRINTS")
+
     # TTS/STT settings
     tts_model: str = Field("gemini-2.5-flash-preview-tts", env="TTS_MODEL")
     stt_model: str = Field("gemini-2.5-flash", env="STT_MODEL")
+    # Spoken-length budget for Eve replies ("truncate" or "split")
+    tts_max_seconds: float = Field(120.0, env="TTS_MAX_SECONDS")
+    tts_words_per_minute: int = Field(150, env="TTS_WORDS_PER_MINUTE")
+    tts_overflow_mode: str = Field("truncate", env="TTS_OVERFLOW_MODE")
+    tts_segment_seconds: float = Field(30.0, env="TTS_SEGMENT_SECONDS")
+
+    # How long an on-demand list total (include_total=true) is reused
+    pagination_total_ttl_seconds: float = Field(
+        30.0, env="PAGINATION_TOTAL_TTL_SECONDS"
+    )
+
+    # Public blog feed / post response cache (per worker; 0 entries disables)
+    blog_cache_entries: int = Field(512, env="BLOG_CACHE_ENTRIES")
+    blog_cache_ttl_seconds: float = Field(60.0, env="BLOG_CACHE_TTL_SECONDS")
+
+    # Profile photos: upload limits and the per-worker response cache
+    photo_max_upload_mb: int = Field(5, env="PHOTO_MAX_UPLOAD_MB")
+    photo_max_pixels: int = Field(40_000_000, env="PHOTO_MAX_PIXELS")
+    photo_max_dimension: int = Field(1024, env="PHOTO_MAX_DIMENSION")
+    photo_cache_entries: int = Field(1024, env="PHOTO_CACHE_ENTRIES")
+    photo_cache_ttl_seconds: float = Field(300.0, env="PHOTO_CACHE_TTL_SECONDS")
+
+    # Password hashing: bcrypt cost (changing it rehashes on next login) and
+    # the executor it runs on, "thread" or "process"
+    bcrypt_rounds: int = Field(12, env="BCRYPT_ROUNDS")
+    password_hash_executor: str = Field("thread", env="PASSWORD_HASH_EXECUTOR")
+    password_hash_workers: int = Field(4, env="PASSWORD_HASH_WORKERS")
+
+    # Verified token -> user snapshot cache (per worker; 0 entries disables)
+    principal_cache_entries: int = Field(10000, env="PRINCIPAL_CACHE_ENTRIES")
+    principal_cache_ttl_seconds: float = Field(60.0, env="PRINCIPAL_CACHE_TTL_SECONDS")
+
+    # Token revocation store: "database" (shared by every worker) or "memory"
+    # (single-process stand-in). Workers pull remote logouts every sync
+    # interval; the Bloom filter is sized for the expected live revocations.
+    revocation_store: str = Field("database", env="REVOCATION_STORE")
+    revocation_sync_interval_seconds: float = Field(
+        5.0, env="REVOCATION_SYNC_INTERVAL_SECONDS"
+    )
+    revocation_rebuild_interval_seconds: float = Field(
+        3600.0, env="REVOCATION_REBUILD_INTERVAL_SECONDS"
+    )
+    revocation_bloom_capacity: int = Field(100_000, env="REVOCATION_BLOOM_CAPACITY")
+    revocation_bloom_error_rate: float = Field(0.001, env="REVOCATION_BLOOM_ERROR_RATE")
+    revocation_checked_entries: int = Field(10000, env="REVOCATION_CHECKED_ENTRIES")
+
+    # Full-text search ranks at most this many of the newest matches
+    search_rank_window: int = Field(1000, env="SEARCH_RANK_WINDOW")
+
+    # Journal embeddings: provider "gemini" or "hashing" (offline stand-in),
+    # store "auto" (pgvector if available), "pgvector" or "numpy"
+    embedding_provider: str = Field("gemini", env="EMBEDDING_PROVIDER")
+    embedding_model: str = Field("gemini-embedding-001", env="EMBEDDING_MODEL")
+    embedding_dimensions: int = Field(768, env="EMBEDDING_DIMENSIONS")
+    embedding_store: str = Field("auto", env="EMBEDDING_STORE")
+    embedding_cache_users: int = Field(1024, env="EMBEDDING_CACHE_USERS")
+    eve_related_journals: int = Field(3, env="EVE_RELATED_JOURNALS")
+
+    # Audio storage / retention settings (quota and age limits of 0 disable them)
+    audio_dir: str = Field(str(BASE_DIR.parent.parent / "audio"), env="AUDIO_DIR")
+    audio_sweep_enabled: bool = Field(True, env="AUDIO_SWEEP_ENABLED")
+    audio_sweep_interval_seconds: int = Field(3600, env="AUDIO_SWEEP_INTERVAL_SECONDS")
+    audio_sweep_batch_size: int = Field(500, env="AUDIO_SWEEP_BATCH_SIZE")
+    audio_sweep_batch_pause_seconds: float = Field(
+        0.05, env="AUDIO_SWEEP_BATCH_PAUSE_SECONDS"
+    )
+    audio_orphan_grace_seconds: int = Field(3600, env="AUDIO_ORPHAN_GRACE_SECONDS")
+    audio_hot_days: int = Field(7, env="AUDIO_HOT_DAYS")
+    audio_max_age_days: int = Field(0, env="AUDIO_MAX_AGE_DAYS")
+    audio_user_quota_mb: int = Field(0, env="AUDIO_USER_QUOTA_MB")
+    audio_global_quota_mb: int = Field(0, env="AUDIO_GLOBAL_QUOTA_MB")
+
+    # Account deletion: requested accounts are deleted in the background,
+    # ACCOUNT_DELETION_BATCH_SIZE rows per transaction; the periodic run
+    # picks up any deletion a restart interrupted
+    account_deletion_batch_size: int = Field(1000, env="ACCOUNT_DELETION_BATCH_SIZE")
+    account_deletion_batch_pause_seconds: float = Field(
+        0.05, env="ACCOUNT_DELETION_BATCH_PAUSE_SECONDS"
+    )
+    account_deletion_interval_seconds: int = Field(
+        600, env="ACCOUNT_DELETION_INTERVAL_SECONDS"
+    )
+
+    # Monthly partitions of eve_messages and messages: maintenance keeps
+    # PARTITION_MONTHS_AHEAD future months created and, with
+    # PARTITION_ARCHIVE_AFTER_MONTHS (0 disables), writes months older than
+    # that to PARTITION_ARCHIVE_DIR as gzipped NDJSON and drops them. Audio
+    # files of archived messages are then unreferenced and left to the sweep,
+    # so restoring a month brings back its text without that audio.
+    partition_maintenance_enabled: bool = Field(
+        True, env="PARTITION_MAINTENANCE_ENABLED"
+    )
+    partition_maintenance_interval_seconds: int = Field(
+        6 * 3600, env="PARTITION_MAINTENANCE_INTERVAL_SECONDS"
+    )
+    partition_months_ahead: int = Field(3, env="PARTITION_MONTHS_AHEAD")
+    partition_archive_after_months: int = Field(0, env="PARTITION_ARCHIVE_AFTER_MONTHS")
+    partition_archive_dir: str = Field(
+        str(BASE_DIR.parent.parent / "archive"), env="PARTITION_ARCHIVE_DIR"
+    )
 
 
 settings = Settings()
@@ -1,6 +1,7 @@
+import asyncio
 import time
 from typing import Any, Callable, TypeVar, Dict, AsyncGenerator
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, nullcontext
 
 import uvicorn
 from fastapi import FastAPI, Request, Response
@@ -14,12 +15,22 @@ from app.routes.chat.chat import router as chat_router
 from app.routes.blog.blog import router as blog_router
 from app.routes.journal.journal import router as journal_router
 from app.routes.eve.eve import router as eve_router
+from app.routes.photo.photo import router as photo_router
 from app.routes.voice_session_response.voice_session_response import (
     router as voice_session_response_router,
 )
 
-from app.utilities.db import init_models, async_session
-from app.services.auth.auth import create_default_admin_if_missing
+from app.utilities.db import async_session, log_pool_stats
+from app.utilities.migrations import check_schema
+from app.utilities.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from app.services.account_deletion.account_deletion import AccountDeletionService
+from app.services.audio_retention.audio_retention import AudioRetentionService
+from app.services.embeddings.embeddings import journal_embeddings
+from app.services.partition_archive.partition_archive import PartitionArchiveService
+from app.utilities.passwords import password_hasher
+from app.utilities.query_stats import QUERY_STATS_HEADER, record_request, track_queries
+from app.utilities.replica import SAFE_METHODS, read_router
+from app.utilities.revocation import revocations
 
 description = """
 HearU API's
@@ -32,15 +43,54 @@ log = logger()
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
     log.info("Starting HearU API...")
-    await init_models()
-    async with async_session() as session:
-        await create_default_admin_if_missing(session)
+    # Schema changes and the default admin are applied beforehand by
+    # `python -m app.utilities.migrations upgrade`; workers only check.
+    await check_schema()
+    try:
+        await journal_embeddings.init()
+    except Exception as exc:
+        log.error("Journal embeddings unavailable: %s", exc)
+    await revocations.sync()
+    revocation_task = asyncio.create_task(revocations.run_forever())
+
+    pool_stats_task = None
+    if settings.db_pool_stats_interval_seconds > 0:
+        pool_stats_task = asyncio.create_task(log_pool_stats())
+    replica_task = None
+    if read_router.replica is not None:
+        await read_router.check()
+        replica_task = asyncio.create_task(read_router.run_forever())
+    sweeper_task = None
+    if settings.audio_sweep_enabled:
+        sweeper_task = asyncio.create_task(AudioRetentionService().run_forever())
+    partition_task = None
+    if settings.partition_maintenance_enabled:
+        partition_task = asyncio.create_task(PartitionArchiveService().run_forever())
+    deletion_task = asyncio.create_task(AccountDeletionService().run_forever())
     log.info("Startup complete.")
 
     yield
 
     log.info("Shutting down HearU API...")
+    tasks = [
+        task
+        for task in (
+            sweeper_task,
+            partition_task,
+            deletion_task,
+            pool_stats_task,
+            replica_task,
+            revocation_task,
+        )
+        if task is not None
+    ]
+    for task in tasks:
+        task.cancel()
+    # let them unwind (release advisory locks, return connections) while
+    # the loop still runs
+    await asyncio.gather(*tasks, return_exceptions=True)
     await async_session().close_all()
+    password_hasher.shutdown()
     log.info("Shutdown complete.")
 
 
@@ -59,6 +109,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, QUERY_STATS_HEADER],
     allow_origins=[
         "http://localhost:5173",
         "http://127.0.0.1:5173",
@@ -72,6 +123,7 @@ app.include_router(chat_router)
 app.include_router(blog_router)
 app.include_router(journal_router)
 app.include_router(eve_router)
+app.include_router(photo_router)
 app.include_router(voice_session_response_router)
 
 
@@ -88,16 +140,54 @@ async def process_time_log_middleware(
     request: Request, call_next: Callable[[Request], Any]
 ) -> Response:
     start_time = time.time()
-    response: Response = await call_next(request)
+    tracking = (
+        track_queries(request.scope) if settings.query_stats_enabled else nullcontext()
+    )
+    with tracking as queries:
+        response: Response = await call_next(request)
     process_time = str(round(time.time() - start_time, 3))
     response.headers["X-Process-Time"] = process_time
+    if queries is None:
+        log.info(
+            "Method=%s Path=%s StatusCode=%s ProcessTime=%s",
+            request.method,
+            request.url.path,
+            response.status_code,
+            process_time,
+        )
+        return response
+
+    if settings.query_stats_header:
+        response.headers[QUERY_STATS_HEADER] = queries.header()
     log.info(
-        "Method=%s Path=%s StatusCode=%s ProcessTime=%s",
+        "Method=%s Path=%s StatusCode=%s ProcessTime=%s Queries=%s QueryTime=%.1fms",
         request.method,
         request.url.path,
         response.status_code,
         process_time,
+        queries.statements,
+        queries.total_ms,
     )
+    for sql, count in queries.repeated():
+        log.warning(
+            "Possible N+1: %s %s ran the same statement %s times: %s",
+            request.method,
+            request.url.path,
+            count,
+            " ".join(sql.split())[:200],
+        )
+    record_request(request.method, request.url.path, queries)
+    return response
+
+
+@app.middleware("http")
+async def read_your_writes_middleware(
+    request: Request, call_next: Callable[[Request], Any]
+) -> Response:
+    response: Response = await call_next(request)
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        # keep this client's reads on the primary until the replica catches up
+        read_router.note_write(request.headers.get("authorization"))
     return response
 
 
@@ -0,0 +1,358 @@
+"""
+Baseline: the schema as create_all() plus the startup SCHEMA_PATCHES left
+it. Every statement is idempotent, so this is safe both on an empty
+database and on one those built, and brings the latter up to date.
+"""
+
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+TABLES: List[str] = [
+    """
+    DO $$
+    BEGIN
+        CREATE TYPE role AS ENUM ('user', 'assistant', 'system');
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id VARCHAR(36) NOT NULL,
+        name VARCHAR(255),
+        age INTEGER,
+        photo_version VARCHAR(32),
+        gender VARCHAR(32),
+        username VARCHAR(128),
+        email VARCHAR(255) NOT NULL,
+        hashed_password VARCHAR(255) NOT NULL,
+        is_admin BOOLEAN NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_username ON users (username)",
+    """
+    CREATE TABLE IF NOT EXISTS revoked_tokens (
+        jti VARCHAR(36) NOT NULL,
+        expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        revoked_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        PRIMARY KEY (jti)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_revoked_tokens_expires_at "
+    "ON revoked_tokens (expires_at)",
+    "CREATE INDEX IF NOT EXISTS ix_revoked_tokens_revoked_at "
+    "ON revoked_tokens (revoked_at)",
+    """
+    CREATE TABLE IF NOT EXISTS blogs (
+        id VARCHAR(36) NOT NULL,
+        user_id VARCHAR NOT NULL,
+        title VARCHAR(255) NOT NULL,
+        content TEXT,
+        tags TEXT[],
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_blogs_user_id ON blogs (user_id)",
+    """
+    CREATE TABLE IF NOT EXISTS chat_sessions (
+        id SERIAL NOT NULL,
+        user_id VARCHAR(36) NOT NULL,
+        title VARCHAR(255),
+        crisis_flagged_at TIMESTAMP WITH TIME ZONE,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_chat_sessions_id ON chat_sessions (id)",
+    "CREATE INDEX IF NOT EXISTS ix_chat_sessions_user_id ON chat_sessions (user_id)",
+    """
+    CREATE TABLE IF NOT EXISTS eve_sessions (
+        id VARCHAR(36) NOT NULL,
+        user_id VARCHAR(36) NOT NULL,
+        system_prompt TEXT NOT NULL,
+        is_active BOOLEAN NOT NULL,
+        crisis_flagged_at TIMESTAMP WITH TIME ZONE,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        ended_at TIMESTAMP WITHOUT TIME ZONE,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_eve_sessions_user_id ON eve_sessions (user_id)",
+    """
+    CREATE TABLE IF NOT EXISTS journals (
+        id VARCHAR(36) NOT NULL,
+        user_id VARCHAR NOT NULL,
+        title VARCHAR(255) NOT NULL,
+        content TEXT,
+        tags TEXT[],
+        entry_date TIMESTAMP WITH TIME ZONE NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_journals_user_id ON journals (user_id)",
+    """
+    CREATE TABLE IF NOT EXISTS user_photos (
+        user_id VARCHAR(36) NOT NULL,
+        variant VARCHAR(16) NOT NULL,
+        content_type VARCHAR(64) NOT NULL,
+        width INTEGER,
+        height INTEGER,
+        size_bytes INTEGER NOT NULL,
+        etag VARCHAR(64) NOT NULL,
+        data BYTEA NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        PRIMARY KEY (user_id, variant),
+        FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS voice_session_responses (
+        id VARCHAR(36) NOT NULL,
+        user_id VARCHAR(36) NOT NULL,
+        session_id VARCHAR(36) NOT NULL,
+        status VARCHAR(50) NOT NULL,
+        summary TEXT,
+        notes_journal_id VARCHAR(36),
+        notes_content TEXT,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        updated_at TIMESTAMP WITHOUT TIME ZONE,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_voice_session_responses_session_id "
+    "ON voice_session_responses (session_id)",
+    "CREATE INDEX IF NOT EXISTS ix_voice_session_responses_user_id "
+    "ON voice_session_responses (user_id)",
+    """
+    CREATE TABLE IF NOT EXISTS eve_messages (
+        id VARCHAR(36) NOT NULL,
+        user_id VARCHAR(36) NOT NULL,
+        journal_id VARCHAR(36),
+        session_id VARCHAR(36),
+        role VARCHAR(20) NOT NULL,
+        text TEXT NOT NULL,
+        audio_path VARCHAR(512),
+        audio_duration_seconds FLOAT,
+        audio_sample_rate INTEGER,
+        audio_channels INTEGER,
+        audio_codec VARCHAR(32),
+        audio_size_bytes INTEGER,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE,
+        FOREIGN KEY(journal_id) REFERENCES journals (id) ON DELETE SET NULL,
+        FOREIGN KEY(session_id) REFERENCES eve_sessions (id) ON DELETE SET NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_eve_messages_journal_id ON eve_messages (journal_id)",
+    "CREATE INDEX IF NOT EXISTS ix_eve_messages_journal_ordered "
+    "ON eve_messages (journal_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_eve_messages_session_id ON eve_messages (session_id)",
+    "CREATE INDEX IF NOT EXISTS ix_eve_messages_session_ordered "
+    "ON eve_messages (session_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_eve_messages_user_id ON eve_messages (user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_eve_messages_user_ordered "
+    "ON eve_messages (user_id, created_at)",
+    """
+    CREATE TABLE IF NOT EXISTS messages (
+        id SERIAL NOT NULL,
+        session_id INTEGER NOT NULL,
+        role role NOT NULL,
+        content TEXT,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(session_id) REFERENCES chat_sessions (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_messages_id ON messages (id)",
+    "CREATE INDEX IF NOT EXISTS ix_messages_session_id ON messages (session_id)",
+]
+
+
+# Frozen copies of what utilities/search and utilities/tags generated when
+# this migration was written; later edits there must not change it.
+def _search_vector(table: str) -> List[str]:
+    vector = (
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(content, '')), 'B')"
+    )
+    return [
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({vector}) STORED",
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector "
+        f"ON {table} USING GIN (search_vector)",
+    ]
+
+
+_TAG_COUNTS: List[str] = [
+    "CREATE TABLE IF NOT EXISTS tag_counts ("
+    "scope VARCHAR(32) NOT NULL, "
+    "owner_id VARCHAR(36) NOT NULL DEFAULT '', "
+    "tag TEXT NOT NULL, "
+    "count INTEGER NOT NULL DEFAULT 0, "
+    "PRIMARY KEY (scope, owner_id, tag))",
+    # SQL twin of normalize_tags() for rows written as comma-joined strings
+    """
+    CREATE OR REPLACE FUNCTION tags_from_csv(_csv TEXT) RETURNS TEXT[] AS $$
+        SELECT NULLIF(ARRAY(
+            SELECT t FROM (
+                SELECT left(lower(regexp_replace(btrim(raw), '\\s+', ' ', 'g')),
+                            64) AS t, ord
+                FROM unnest(string_to_array(_csv, ',')) WITH ORDINALITY AS u(raw, ord)
+            ) s
+            WHERE t <> ''
+            GROUP BY t
+            ORDER BY min(ord)
+        ), '{}')
+    $$ LANGUAGE sql IMMUTABLE
+    """,
+    # Upserts changed tags in sorted order so concurrent writers sharing
+    # tags lock counter rows in the same order, then drops emptied rows.
+    """
+    CREATE OR REPLACE FUNCTION tag_counts_apply(
+        _scope TEXT, _owner TEXT, _tags TEXT[], _delta INTEGER
+    ) RETURNS void AS $$
+    BEGIN
+        IF _tags IS NULL OR cardinality(_tags) = 0 THEN
+            RETURN;
+        END IF;
+        INSERT INTO tag_counts AS c (scope, owner_id, tag, count)
+        SELECT _scope, _owner, t, _delta
+        FROM (SELECT DISTINCT unnest(_tags) AS t) s
+        ORDER BY t
+        ON CONFLICT (scope, owner_id, tag)
+        DO UPDATE SET count = c.count + EXCLUDED.count;
+        IF _delta < 0 THEN
+            DELETE FROM tag_counts
+            WHERE scope = _scope AND owner_id = _owner
+              AND tag = ANY(_tags) AND count <= 0;
+        END IF;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    # TG_ARGV: scope name, then 'user' for per-owner counts or 'global'
+    """
+    CREATE OR REPLACE FUNCTION tag_counts_maintain() RETURNS trigger AS $$
+    DECLARE
+        _scope TEXT := TG_ARGV[0];
+        _per_user BOOLEAN := TG_ARGV[1] = 'user';
+        _old_owner TEXT;
+        _new_owner TEXT;
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            _new_owner := CASE WHEN _per_user THEN NEW.user_id ELSE '' END;
+            PERFORM tag_counts_apply(_scope, _new_owner, NEW.tags, 1);
+        ELSIF TG_OP = 'DELETE' THEN
+            _old_owner := CASE WHEN _per_user THEN OLD.user_id ELSE '' END;
+            PERFORM tag_counts_apply(_scope, _old_owner, OLD.tags, -1);
+        ELSE
+            _old_owner := CASE WHEN _per_user THEN OLD.user_id ELSE '' END;
+            _new_owner := CASE WHEN _per_user THEN NEW.user_id ELSE '' END;
+            IF _old_owner = _new_owner THEN
+                -- only the tags that were actually added or removed
+                PERFORM tag_counts_apply(_scope, _old_owner, ARRAY(
+                    SELECT unnest(OLD.tags) EXCEPT SELECT unnest(NEW.tags)
+                ), -1);
+                PERFORM tag_counts_apply(_scope, _new_owner, ARRAY(
+                    SELECT unnest(NEW.tags) EXCEPT SELECT unnest(OLD.tags)
+                ), 1);
+            ELSE
+                PERFORM tag_counts_apply(_scope, _old_owner, OLD.tags, -1);
+                PERFORM tag_counts_apply(_scope, _new_owner, NEW.tags, 1);
+            END IF;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+]
+
+
+def _tags(table_name: str, *, per_user: bool) -> List[str]:
+    owner = "user_id" if per_user else "''"
+    mode = "user" if per_user else "global"
+    return [
+        f"""
+        DO $$
+        BEGIN
+            IF (SELECT data_type FROM information_schema.columns
+                WHERE table_schema = current_schema()
+                  AND table_name = '{table_name}' AND column_name = 'tags'
+               ) <> 'ARRAY' THEN
+                ALTER TABLE {table_name} ALTER COLUMN tags TYPE TEXT[]
+                    USING tags_from_csv(tags);
+                DELETE FROM tag_counts WHERE scope = '{table_name}';
+                INSERT INTO tag_counts (scope, owner_id, tag, count)
+                SELECT '{table_name}', {owner}, t, count(*)
+                FROM {table_name}, unnest(tags) AS t
+                GROUP BY 2, t;
+            END IF;
+        END
+        $$
+        """,
+        f"CREATE INDEX IF NOT EXISTS ix_{table_name}_tags "
+        f"ON {table_name} USING GIN (tags)",
+        f"DROP TRIGGER IF EXISTS {table_name}_tag_counts ON {table_name}",
+        f"CREATE TRIGGER {table_name}_tag_counts "
+        f"AFTER INSERT OR DELETE OR UPDATE OF tags, user_id ON {table_name} "
+        "FOR EACH ROW EXECUTE FUNCTION "
+        f"tag_counts_maintain('{table_name}', '{mode}')",
+    ]
+
+
+# Formerly db.SCHEMA_PATCHES: columns and objects added after the tables
+# above first shipped. No-ops on a database created from TABLES.
+PATCHES: List[str] = [
+    "ALTER TABLE eve_messages ADD COLUMN IF NOT EXISTS audio_duration_seconds FLOAT",
+    "ALTER TABLE eve_messages ADD COLUMN IF NOT EXISTS audio_sample_rate INTEGER",
+    "ALTER TABLE eve_messages ADD COLUMN IF NOT EXISTS audio_channels INTEGER",
+    "ALTER TABLE eve_messages ADD COLUMN IF NOT EXISTS audio_codec VARCHAR(32)",
+    "ALTER TABLE eve_messages ADD COLUMN IF NOT EXISTS audio_size_bytes INTEGER",
+    "ALTER TABLE eve_sessions ADD COLUMN IF NOT EXISTS crisis_flagged_at TIMESTAMPTZ",
+    "ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS crisis_flagged_at TIMESTAMPTZ",
+    *_search_vector("journals"),
+    *_search_vector("blogs"),
+    *_TAG_COUNTS,
+    *_tags("journals", per_user=True),
+    *_tags("blogs", per_user=False),
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS photo_version VARCHAR(32)",
+    # Move legacy users.photo bytes into user_photos (renditions are built
+    # lazily on first read, see services/photo) and drop the column.
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM information_schema.columns
+                   WHERE table_schema = current_schema()
+                     AND table_name = 'users' AND column_name = 'photo') THEN
+            INSERT INTO user_photos
+                (user_id, variant, content_type, size_bytes, etag, data)
+            SELECT id, 'original', 'application/octet-stream',
+                   octet_length(photo), md5(photo), photo
+            FROM users WHERE photo IS NOT NULL
+            ON CONFLICT DO NOTHING;
+            UPDATE users SET photo_version = md5(photo) WHERE photo IS NOT NULL;
+            ALTER TABLE users DROP COLUMN photo;
+        END IF;
+    END
+    $$
+    """,
+]
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    for stmt in TABLES + PATCHES:
+        await conn.execute(text(stmt))
@@ -0,0 +1,71 @@
+"""
+journal_embeddings, as pgvector when the extension can be enabled and
+real[] otherwise (EMBEDDING_STORE overrides). The app reads the column
+type at startup to pick the matching store.
+"""
+
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config import settings
+from app.utilities.logger import logger
+
+log = logger(__name__)
+
+
+def _table(column_type: str) -> List[str]:
+    return [
+        f"""
+        CREATE TABLE IF NOT EXISTS journal_embeddings (
+            journal_id VARCHAR(36) PRIMARY KEY
+                REFERENCES journals(id) ON DELETE CASCADE,
+            user_id VARCHAR(36) NOT NULL,
+            model VARCHAR(64) NOT NULL,
+            embedding {column_type} NOT NULL,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_journal_embeddings_user_model "
+        "ON journal_embeddings (user_id, model)",
+    ]
+
+
+PGVECTOR: List[str] = [
+    *_table(f"vector({settings.embedding_dimensions})"),
+    "CREATE INDEX IF NOT EXISTS ix_journal_embeddings_hnsw "
+    "ON journal_embeddings USING hnsw (embedding vector_cosine_ops)",
+]
+NUMPY: List[str] = _table("REAL[]")
+
+
+async def _pgvector(conn: AsyncConnection) -> bool:
+    existing = (
+        await conn.execute(
+            text(
+                "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+                "WHERE attrelid = to_regclass('journal_embeddings') "
+                "AND attname = 'embedding'"
+            )
+        )
+    ).scalar()
+    # an existing table keeps the store it was created for
+    if existing is not None:
+        return bool(existing.startswith("vector"))
+    if settings.embedding_store == "numpy":
+        return False
+    try:
+        async with conn.begin_nested():
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        return True
+    except Exception as exc:
+        if settings.embedding_store == "pgvector":
+            raise
+        log.warning("pgvector unavailable (%s); using NumPy fallback", exc)
+        return False
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    for stmt in PGVECTOR if await _pgvector(conn) else NUMPY:
+        await conn.execute(text(stmt))
@@ -0,0 +1,71 @@
+"""
+Composite indexes for the keyset-paginated lists: each matches a list's
+filter plus its (created_at, id) sort, so a page is an index range scan
+in order instead of a scan of the owner's rows and a sort. The single-
+column indexes they start with are dropped; the composites serve those
+lookups (and the foreign-key checks on delete) as well.
+
+Built CONCURRENTLY so writes continue while they build, which Postgres
+only allows outside a transaction.
+"""
+
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+TRANSACTIONAL = False
+
+# (name, definition after ON)
+INDEXES: List[Tuple[str, str]] = [
+    # GET /api/journals, /api/eve/journals: one user's entries, newest first
+    ("ix_journals_user_created", "journals (user_id, created_at, id)"),
+    # GET /api/blogs: everyone's posts, newest first
+    ("ix_blogs_created", "blogs (created_at, id)"),
+    # GET /api/chat/{session_id} and the model's context: oldest first
+    ("ix_messages_session_created", "messages (session_id, created_at, id)"),
+    # GET /api/voice-session-responses/
+    (
+        "ix_voice_session_responses_user_created",
+        "voice_session_responses (user_id, created_at, id)",
+    ),
+    # GET /api/voice-session-responses/session/{session_id}
+    (
+        "ix_voice_session_responses_session_user",
+        "voice_session_responses (session_id, user_id, created_at)",
+    ),
+    # GET /api/admin/users lists non-admins only; admins stay out of the index
+    ("ix_users_created_non_admin", "users (created_at, id) WHERE is_admin IS false"),
+]
+
+# prefixes of the composites above
+SUPERSEDED: List[str] = [
+    "ix_journals_user_id",
+    "ix_messages_session_id",
+    "ix_voice_session_responses_user_id",
+    "ix_voice_session_responses_session_id",
+]
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    for name, definition in INDEXES:
+        # an interrupted CONCURRENTLY build leaves an invalid index behind,
+        # which IF NOT EXISTS would accept; rebuild it instead
+        invalid = (
+            await conn.execute(
+                text(
+                    "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname = :name AND NOT i.indisvalid"
+                ),
+                {"name": name},
+            )
+        ).scalar()
+        if invalid:
+            await conn.execute(text(f"DROP INDEX CONCURRENTLY {name}"))
+        await conn.execute(
+            text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+        )
+    for name in SUPERSEDED:
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    for table in ("journals", "blogs", "messages", "voice_session_responses", "users"):
+        await conn.execute(text(f"ANALYZE {table}"))
@@ -0,0 +1,159 @@
+"""
+Primary and foreign keys from VARCHAR(36) to native uuid: 16 bytes in
+every index and referencing column instead of 37. New ids are UUIDv7
+(app.utilities.ids), whose time prefix keeps inserts at the right edge
+of each key index; existing uuid4 ids convert as they are.
+
+The foreign keys and triggers on the converted tables are dropped, the
+columns retyped in place and both recreated exactly as they were.
+Retyping rewrites each table under an ACCESS EXCLUSIVE lock, so run this
+one while the app is stopped or quiet.
+
+Left as text on purpose: voice_session_responses.session_id and
+notes_journal_id hold client-supplied ids, tag_counts.owner_id uses ''
+for site-wide counts, and token jtis never join anything.
+"""
+
+from typing import Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# table -> columns to convert
+COLUMNS: Dict[str, List[str]] = {
+    "users": ["id"],
+    "journals": ["id", "user_id"],
+    "blogs": ["id", "user_id"],
+    "eve_sessions": ["id", "user_id"],
+    "eve_messages": ["id", "user_id", "journal_id", "session_id"],
+    "voice_session_responses": ["id", "user_id"],
+    "chat_sessions": ["user_id"],
+    "user_photos": ["user_id"],
+    "journal_embeddings": ["journal_id", "user_id"],
+}
+
+# tag_counts_maintain() from the baseline, with user_id cast to text for the
+# '' owner; TG_ARGV: scope name, then 'user' for per-owner counts or 'global'
+TAG_COUNTS_MAINTAIN = """
+    CREATE OR REPLACE FUNCTION tag_counts_maintain() RETURNS trigger AS $$
+    DECLARE
+        _scope TEXT := TG_ARGV[0];
+        _per_user BOOLEAN := TG_ARGV[1] = 'user';
+        _old_owner TEXT;
+        _new_owner TEXT;
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            _new_owner := CASE WHEN _per_user THEN NEW.user_id::text ELSE '' END;
+            PERFORM tag_counts_apply(_scope, _new_owner, NEW.tags, 1);
+        ELSIF TG_OP = 'DELETE' THEN
+            _old_owner := CASE WHEN _per_user THEN OLD.user_id::text ELSE '' END;
+            PERFORM tag_counts_apply(_scope, _old_owner, OLD.tags, -1);
+        ELSE
+            _old_owner := CASE WHEN _per_user THEN OLD.user_id::text ELSE '' END;
+            _new_owner := CASE WHEN _per_user THEN NEW.user_id::text ELSE '' END;
+            IF _old_owner = _new_owner THEN
+                -- only the tags that were actually added or removed
+                PERFORM tag_counts_apply(_scope, _old_owner, ARRAY(
+                    SELECT unnest(OLD.tags) EXCEPT SELECT unnest(NEW.tags)
+                ), -1);
+                PERFORM tag_counts_apply(_scope, _new_owner, ARRAY(
+                    SELECT unnest(NEW.tags) EXCEPT SELECT unnest(OLD.tags)
+                ), 1);
+            ELSE
+                PERFORM tag_counts_apply(_scope, _old_owner, OLD.tags, -1);
+                PERFORM tag_counts_apply(_scope, _new_owner, NEW.tags, 1);
+            END IF;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """
+
+_UUID_PATTERN = "^[0-9a-fA-F]{8}-?([0-9a-fA-F]{4}-?){3}[0-9a-fA-F]{12}$"
+
+
+async def _column_type(conn: AsyncConnection, table: str, column: str) -> str:
+    return (
+        await conn.execute(
+            text(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_schema = current_schema() "
+                "AND table_name = :table AND column_name = :column"
+            ),
+            {"table": table, "column": column},
+        )
+    ).scalar_one()
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    pending: List[Tuple[str, str]] = []
+    for table, columns in COLUMNS.items():
+        for column in columns:
+            if await _column_type(conn, table, column) == "uuid":
+                continue
+            bad = (
+                await conn.execute(
+                    text(
+                        f"SELECT count(*) FROM {table} "
+                        f"WHERE {column} IS NOT NULL AND {column} !~ :pattern"
+                    ),
+                    {"pattern": _UUID_PATTERN},
+                )
+            ).scalar_one()
+            if bad:
+                raise RuntimeError(
+                    f"{table}.{column} has {bad} value(s) that are not UUIDs; "
+                    "fix or remove them before migrating"
+                )
+            pending.append((table, column))
+    await conn.execute(text(TAG_COUNTS_MAINTAIN))
+    if not pending:
+        return
+
+    # every foreign key touching a converted table, to drop and restore
+    tables = list(COLUMNS)
+    constraints = (
+        await conn.execute(
+            text(
+                "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) "
+                "FROM pg_constraint WHERE contype = 'f' "
+                "AND (conrelid::regclass::text = ANY(:tables) "
+                "OR confrelid::regclass::text = ANY(:tables))"
+            ),
+            {"tables": tables},
+        )
+    ).all()
+    for table, name, _ in constraints:
+        await conn.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT {name}"))
+    # Postgres refuses to retype a column a trigger names (UPDATE OF user_id)
+    triggers = (
+        await conn.execute(
+            text(
+                "SELECT tgrelid::regclass::text, tgname, pg_get_triggerdef(oid) "
+                "FROM pg_trigger WHERE NOT tgisinternal "
+                "AND tgrelid::regclass::text = ANY(:tables)"
+            ),
+            {"tables": tables},
+        )
+    ).all()
+    for table, name, _ in triggers:
+        await conn.execute(text(f"DROP TRIGGER {name} ON {table}"))
+
+    by_table: Dict[str, List[str]] = {}
+    for table, column in pending:
+        by_table.setdefault(table, []).append(column)
+    for table, columns in by_table.items():
+        changes = ", ".join(
+            f"ALTER COLUMN {column} TYPE uuid USING {column}::uuid"
+            for column in columns
+        )
+        await conn.execute(text(f"ALTER TABLE {table} {changes}"))
+
+    for _, _, definition in triggers:
+        await conn.execute(text(definition))
+    for table, name, definition in constraints:
+        await conn.execute(
+            text(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+        )
+    for table in by_table:
+        await conn.execute(text(f"ANALYZE {table}"))
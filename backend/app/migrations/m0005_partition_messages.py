@@ -0,0 +1,117 @@
+"""
+eve_messages and chat messages become tables range-partitioned by month
+on created_at: they are append-only and grow fastest, and old months are
+rarely read. A query bounded below by its session's or journal's
+created_at only opens the months since then, and a cold month can be
+archived and dropped as a whole (app/services/partition_archive).
+
+Each table is rebuilt as a partitioned twin with monthly partitions from
+its oldest row through PARTITION_MONTHS_AHEAD months from now, plus a
+default partition for anything outside them; the rows are copied over and
+the old table dropped. Indexes, foreign keys and the messages id sequence
+carry over under their old names, except the single-column indexes below:
+each is the leading column of a composite that serves the same lookups
+(and foreign-key checks), and every voice turn wrote to all of them.
+Postgres requires the partition key in every unique index, so the primary
+keys become (id, created_at); ids stay unique since every new one is
+generated (UUIDv7 or the sequence).
+
+Copying rewrites both tables under an ACCESS EXCLUSIVE lock, so run this
+one while the app is stopped or quiet.
+"""
+
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config import settings
+from app.utilities.partitions import (
+    PARTITIONED_TABLES,
+    Month,
+    create_partition,
+    current_month,
+    default_partition,
+    is_partitioned,
+    month_range,
+)
+
+SUPERSEDED: List[str] = [
+    "ix_messages_id",
+    "ix_eve_messages_journal_id",
+    "ix_eve_messages_session_id",
+    "ix_eve_messages_user_id",
+]
+
+
+async def _definitions(conn: AsyncConnection, sql: str, table: str) -> List[str]:
+    params = {"t": table, "superseded": SUPERSEDED}
+    return list((await conn.execute(text(sql), params)).scalars().all())
+
+
+async def _partition(conn: AsyncConnection, table: str) -> None:
+    old = f"{table}_unpartitioned"
+    indexes = await _definitions(
+        conn,
+        "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+        "WHERE indrelid = to_regclass(:t) AND NOT indisprimary "
+        "AND indexrelid::regclass::text <> ALL(:superseded)",
+        table,
+    )
+    foreign_keys = await _definitions(
+        conn,
+        "SELECT conname || ' ' || pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass(:t) AND contype = 'f'",
+        table,
+    )
+    sequences = await _definitions(
+        conn,
+        "SELECT a.attname || ' ' || pg_get_serial_sequence(:t, a.attname) "
+        "FROM pg_attribute a WHERE a.attrelid = to_regclass(:t) "
+        "AND a.attnum > 0 AND NOT a.attisdropped "
+        "AND pg_get_serial_sequence(:t, a.attname) IS NOT NULL",
+        table,
+    )
+    oldest = (await conn.execute(text(f"SELECT min(created_at) FROM {table}"))).scalar()
+
+    await conn.execute(text(f"ALTER TABLE {table} RENAME TO {old}"))
+    # the sequence would be dropped with the table that owns it
+    for entry in sequences:
+        _, sequence = entry.split(" ", 1)
+        await conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+    await conn.execute(
+        text(
+            f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) "
+            "PARTITION BY RANGE (created_at)"
+        )
+    )
+    await conn.execute(
+        text(f"CREATE TABLE {default_partition(table)} PARTITION OF {table} DEFAULT")
+    )
+    last = current_month().plus(settings.partition_months_ahead)
+    first = min(Month.of(oldest), last) if oldest is not None else current_month()
+    for month in month_range(first, last):
+        await create_partition(conn, table, month)
+    await conn.execute(text(f"INSERT INTO {table} SELECT * FROM {old}"))
+    await conn.execute(text(f"DROP TABLE {old}"))
+
+    for entry in sequences:
+        column, sequence = entry.split(" ", 1)
+        await conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table}.{column}"))
+    await conn.execute(
+        text(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey "
+            "PRIMARY KEY (id, created_at)"
+        )
+    )
+    for definition in indexes:
+        await conn.execute(text(definition))
+    for definition in foreign_keys:
+        await conn.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT {definition}"))
+    await conn.execute(text(f"ANALYZE {table}"))
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    for table in PARTITIONED_TABLES:
+        if not await is_partitioned(conn, table):
+            await _partition(conn, table)
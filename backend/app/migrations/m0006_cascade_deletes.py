@@ -0,0 +1,85 @@
+"""
+Deleting a user, chat session, eve session or journal removes its rows in
+the database through ON DELETE CASCADE on every foreign key that points at
+it, instead of the ORM loading each child and deleting it by primary key.
+The journal and session links of eve_messages change from SET NULL to
+CASCADE: the ORM cascades already deleted those messages, so behaviour
+through the app is unchanged, and raw SQL deletes now agree with it.
+
+Each key is dropped and re-added in one ALTER, NOT VALID where Postgres
+allows it, then validated separately, which only blocks schema changes
+while it scans. Partitioned tables cannot take NOT VALID keys and are
+validated under the ALTER's lock instead. Also adds
+users.deletion_requested_at for services/account_deletion.
+"""
+
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.utilities.partitions import is_partitioned
+
+TRANSACTIONAL = False
+
+# (table, column, referenced table)
+CASCADES: List[Tuple[str, str, str]] = [
+    ("blogs", "user_id", "users"),
+    ("chat_sessions", "user_id", "users"),
+    ("journals", "user_id", "users"),
+    ("eve_sessions", "user_id", "users"),
+    ("eve_messages", "user_id", "users"),
+    ("user_photos", "user_id", "users"),
+    ("voice_session_responses", "user_id", "users"),
+    ("messages", "session_id", "chat_sessions"),
+    ("eve_messages", "session_id", "eve_sessions"),
+    ("eve_messages", "journal_id", "journals"),
+    ("journal_embeddings", "journal_id", "journals"),
+]
+
+
+async def _cascade(conn: AsyncConnection, table: str, column: str, parent: str) -> None:
+    existing = (
+        await conn.execute(
+            text(
+                "SELECT c.conname, c.confdeltype::text, c.convalidated "
+                "FROM pg_constraint c JOIN pg_attribute a "
+                "ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1] "
+                "WHERE c.conrelid = to_regclass(:t) AND c.contype = 'f' "
+                "AND a.attname = :c AND cardinality(c.conkey) = 1"
+            ),
+            {"t": table, "c": column},
+        )
+    ).first()
+    name = existing[0] if existing else f"{table}_{column}_fkey"
+    if existing is None or existing[1] != "c":
+        drop = f"DROP CONSTRAINT {name}, " if existing else ""
+        not_valid = "" if await is_partitioned(conn, table) else " NOT VALID"
+        await conn.execute(
+            text(
+                f"ALTER TABLE {table} {drop}ADD CONSTRAINT {name} "
+                f"FOREIGN KEY ({column}) REFERENCES {parent} (id) "
+                f"ON DELETE CASCADE{not_valid}"
+            )
+        )
+    elif existing[2]:
+        return
+    await conn.execute(text(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}"))
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    await conn.execute(
+        text(
+            "ALTER TABLE users "
+            "ADD COLUMN IF NOT EXISTS deletion_requested_at TIMESTAMPTZ"
+        )
+    )
+    await conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_users_deletion_requested "
+            "ON users (deletion_requested_at) "
+            "WHERE deletion_requested_at IS NOT NULL"
+        )
+    )
+    for table, column, parent in CASCADES:
+        await _cascade(conn, table, column, parent)
@@ -1,6 +1,16 @@
 # Import all models to ensure SQLModel.metadata is populated
 from app.models.user import User
+from app.models.user_photo import UserPhoto
+from app.models.revoked_token import RevokedToken
 from app.models.chat import ChatSession, Message, Role
 from app.models.voice_session_response import VoiceSessionResponseData
 
-__all__ = ["User", "ChatSession", "Message", "Role", "VoiceSessionResponseData"]
+__all__ = [
+    "User",
+    "UserPhoto",
+    "RevokedToken",
+    "ChatSession",
+    "Message",
+    "Role",
+    "VoiceSessionResponseData",
+]
@@ -1,27 +1,36 @@
-import uuid
 from datetime import datetime
-from typing import Optional, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
 
-from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, DateTime, func, Text
+from sqlmodel import SQLModel, Field, Relationship, col
+from sqlalchemy import Column, DateTime, func, Index, Text
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.utilities.ids import UUIDString, gen_uuid
 
 if TYPE_CHECKING:
     from app.models.user import User
 
 
-def gen_uuid() -> str:
-    return str(uuid.uuid4())
-
-
 class Blog(SQLModel, table=True):
     __tablename__ = "blogs"
-
-    id: str = Field(default_factory=gen_uuid, primary_key=True, max_length=36)
-    user_id: str = Field(foreign_key="users.id", index=True, nullable=False)
+    # UPDATEs return the new updated_at (RETURNING) instead of expiring it,
+    # so a commit needs no refresh() before the row is serialized
+    __mapper_args__ = {"eager_defaults": True}
+
+    id: str = Field(default_factory=gen_uuid, primary_key=True, sa_type=UUIDString)
+    user_id: str = Field(
+        foreign_key="users.id",
+        ondelete="CASCADE",
+        index=True,
+        nullable=False,
+        sa_type=UUIDString,
+    )
 
     title: str = Field(max_length=255, nullable=False)
     content: str = Field(sa_column=Column("content", Text), default="")
-    tags: Optional[str] = Field(default=None, max_length=1024)
+    tags: Optional[List[str]] = Field(
+        sa_column=Column("tags", ARRAY(Text)), default=None
+    )
 
     created_at: datetime = Field(
         sa_column=Column(
@@ -38,3 +47,7 @@ class Blog(SQLModel, table=True):
 
     # Relationship back to User
     user: Optional["User"] = Relationship(back_populates="blogs")
+
+
+# Keyset pages of all posts (see migrations/m0003)
+Index("ix_blogs_created", col(Blog.created_at), col(Blog.id))
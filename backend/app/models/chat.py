@@ -2,8 +2,10 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional, TYPE_CHECKING
 
-from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, DateTime, Text
+from sqlmodel import SQLModel, Field, Relationship, col
+from sqlalchemy import Column, DateTime, Index, Text
+
+from app.utilities.ids import UUIDString
 
 if TYPE_CHECKING:
     from app.models.user import User
@@ -20,9 +22,15 @@ class ChatSession(SQLModel, table=True):
 
     id: Optional[int] = Field(default=None, primary_key=True, index=True)
 
-    user_id: str = Field(foreign_key="users.id", max_length=36, index=True)
+    user_id: str = Field(
+        foreign_key="users.id", ondelete="CASCADE", index=True, sa_type=UUIDString
+    )
 
     title: Optional[str] = Field(default=None, max_length=255)
+    # Set the first time crisis language is detected in the session
+    crisis_flagged_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
     created_at: datetime = Field(
         default_factory=datetime.now,
         sa_column=Column(
@@ -31,7 +39,7 @@ class ChatSession(SQLModel, table=True):
     )
 
     messages: list["Message"] = Relationship(
-        back_populates="session", cascade_delete=True
+        back_populates="session", cascade_delete=True, passive_deletes=True
     )
 
     user: "User" = Relationship(back_populates="chat_sessions")
@@ -39,10 +47,12 @@ class ChatSession(SQLModel, table=True):
 
 class Message(SQLModel, table=True):
     __tablename__ = "messages"
+    # range-partitioned by month on created_at (migrations/m0005); the
+    # primary key there is (id, created_at)
 
-    id: Optional[int] = Field(default=None, primary_key=True, index=True)
+    id: Optional[int] = Field(default=None, primary_key=True)
 
-    session_id: int = Field(foreign_key="chat_sessions.id", index=True)
+    session_id: int = Field(foreign_key="chat_sessions.id", ondelete="CASCADE")
 
     role: Role = Field()
     content: str = Field(sa_column=Column(Text))
@@ -54,3 +64,12 @@ class Message(SQLModel, table=True):
     )
 
     session: ChatSession = Relationship(back_populates="messages")
+
+
+# A session's history in order (see migrations/m0003)
+Index(
+    "ix_messages_session_created",
+    col(Message.session_id),
+    col(Message.created_at),
+    col(Message.id),
+)
@@ -1,4 +1,3 @@
-import uuid
 from datetime import datetime
 from enum import Enum
 from typing import List, Optional, TYPE_CHECKING
@@ -14,15 +13,13 @@ from sqlalchemy import (
     ForeignKey,
 )
 
+from app.utilities.ids import UUIDString, gen_uuid
+
 if TYPE_CHECKING:
     from app.models.user import User
     from app.models.journal import Journal
 
 
-def gen_uuid() -> str:
-    return str(uuid.uuid4())
-
-
 class EveRole(str, Enum):
     USER = "user"
     EVE = "eve"
@@ -36,7 +33,7 @@ class EveSession(SQLModel, table=True):
 
     __tablename__ = "eve_sessions"
 
-    id: str = Field(default_factory=gen_uuid, primary_key=True, max_length=36)
+    id: str = Field(default_factory=gen_uuid, primary_key=True, sa_type=UUIDString)
 
     # FK with CASCADE (if user is deleted, remove sessions)
     user_id: str = Field(
@@ -51,6 +48,11 @@ class EveSession(SQLModel, table=True):
     system_prompt: str = Field(sa_column=Column(Text, nullable=False))
     is_active: bool = Field(default=True)
 
+    # Set the first time crisis language is detected in the session
+    crisis_flagged_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
+
     created_at: datetime = Field(
         sa_column=Column(
             DateTime(timezone=True), server_default=func.now(), nullable=False
@@ -64,6 +66,7 @@ class EveSession(SQLModel, table=True):
         back_populates="session",
         sa_relationship_kwargs={
             "cascade": "all, delete-orphan",
+            "passive_deletes": True,
             # "lazy": "selectin",  # enable if you prefer prefetching
         },
     )
@@ -78,36 +81,33 @@ class EveMessage(SQLModel, table=True):
     """
 
     __tablename__ = "eve_messages"
+    # range-partitioned by month on created_at (migrations/m0005); the
+    # primary key there is (id, created_at)
 
-    id: str = Field(default_factory=gen_uuid, primary_key=True, max_length=36)
+    id: str = Field(default_factory=gen_uuid, primary_key=True, sa_type=UUIDString)
 
     # FK with CASCADE (if user is deleted, remove messages)
     user_id: str = Field(
         sa_column=Column(
             ForeignKey("users.id", ondelete="CASCADE"),
-            index=True,
             nullable=False,
         )
     )
 
-    # Journal link is optional; if journal is deleted, set NULL to keep message record integrity
+    # Journal link is optional; the journal's replies are deleted with it
     journal_id: Optional[str] = Field(
         default=None,
         sa_column=Column(
-            ForeignKey("journals.id", ondelete="SET NULL"),
-            index=True,
+            ForeignKey("journals.id", ondelete="CASCADE"),
             nullable=True,
         ),
     )
 
-    # Session link is optional; if session is deleted, cascade delete messages at relationship level
-    # (DB-level ondelete CASCADE isn’t strictly required because of relationship cascade,
-    #  but we keep SET NULL for safety if you delete via raw SQL).
+    # Session link is optional; the session's turns are deleted with it
     session_id: Optional[str] = Field(
         default=None,
         sa_column=Column(
-            ForeignKey("eve_sessions.id", ondelete="SET NULL"),
-            index=True,
+            ForeignKey("eve_sessions.id", ondelete="CASCADE"),
             nullable=True,
         ),
     )
@@ -124,6 +124,14 @@ class EveMessage(SQLModel, table=True):
     # Optional pointer to audio asset (GCS signed URL, gs:// path, or local path)
     audio_path: Optional[str] = Field(default=None, max_length=512)
 
+    # Audio metadata captured when the file is written (kept even if the file
+    # is later swept, so audio usage can be aggregated without touching disk)
+    audio_duration_seconds: Optional[float] = Field(default=None)
+    audio_sample_rate: Optional[int] = Field(default=None)
+    audio_channels: Optional[int] = Field(default=None)
+    audio_codec: Optional[str] = Field(default=None, max_length=32)
+    audio_size_bytes: Optional[int] = Field(default=None)
+
     created_at: datetime = Field(
         sa_column=Column(
             DateTime(timezone=True), server_default=func.now(), nullable=False
@@ -136,7 +144,8 @@ class EveMessage(SQLModel, table=True):
     session: Optional["EveSession"] = Relationship(back_populates="messages")
 
 
-# Helpful indexes for common access patterns
+# Helpful indexes for common access patterns; each also serves lookups and
+# foreign-key checks on its first column (see migrations/m0005)
 Index("ix_eve_messages_session_ordered", EveMessage.session_id, EveMessage.created_at)
 Index("ix_eve_messages_journal_ordered", EveMessage.journal_id, EveMessage.created_at)
 Index("ix_eve_messages_user_ordered", EveMessage.user_id, EveMessage.created_at)
@@ -1,28 +1,33 @@
-import uuid
 from datetime import datetime
 from typing import List, Optional, TYPE_CHECKING
 
-from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, DateTime, func, Text
+from sqlmodel import SQLModel, Field, Relationship, col
+from sqlalchemy import Column, DateTime, func, Index, Text
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.utilities.ids import UUIDString, gen_uuid
 
 if TYPE_CHECKING:
     from app.models.user import User
     from app.models.eve import EveMessage
 
 
-def gen_uuid() -> str:
-    return str(uuid.uuid4())
-
-
 class Journal(SQLModel, table=True):
     __tablename__ = "journals"
+    # UPDATEs return the new updated_at (RETURNING) instead of expiring it,
+    # so a commit needs no refresh() before the row is serialized
+    __mapper_args__ = {"eager_defaults": True}
 
-    id: str = Field(default_factory=gen_uuid, primary_key=True, max_length=36)
-    user_id: str = Field(foreign_key="users.id", index=True, nullable=False)
+    id: str = Field(default_factory=gen_uuid, primary_key=True, sa_type=UUIDString)
+    user_id: str = Field(
+        foreign_key="users.id", ondelete="CASCADE", nullable=False, sa_type=UUIDString
+    )
 
     title: str = Field(max_length=255, nullable=False)
     content: str = Field(sa_column=Column("content", Text), default="")
-    tags: Optional[str] = Field(default=None, max_length=1024)
+    tags: Optional[List[str]] = Field(
+        sa_column=Column("tags", ARRAY(Text)), default=None
+    )
 
     # User-provided date (e.g., 4 February 7:30 PM)
     entry_date: datetime = Field(
@@ -45,8 +50,20 @@ class Journal(SQLModel, table=True):
 
     eve_messages: List["EveMessage"] = Relationship(
         back_populates="journal",
-        sa_relationship_kwargs={"cascade": "all, delete-orphan"},
+        sa_relationship_kwargs={
+            "cascade": "all, delete-orphan",
+            "passive_deletes": True,
+        },
     )
 
     # Relationship back to User
     user: Optional["User"] = Relationship(back_populates="journals")
+
+
+# Keyset pages of one user's entries (see migrations/m0003)
+Index(
+    "ix_journals_user_created",
+    col(Journal.user_id),
+    col(Journal.created_at),
+    col(Journal.id),
+)
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, DateTime, String, func
+
+
+class RevokedToken(SQLModel, table=True):
+    """
+    A logged-out access token, shared by every worker and replica.
+
+    Rows are only needed until the token would have expired anyway;
+    the revocation list purges them after `expires_at`.
+    """
+
+    __tablename__ = "revoked_tokens"
+
+    jti: str = Field(sa_column=Column(String(36), primary_key=True))
+    expires_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False, index=True)
+    )
+    revoked_at: datetime = Field(
+        sa_column=Column(
+            DateTime(timezone=True),
+            server_default=func.now(),
+            nullable=False,
+            index=True,
+        )
+    )
@@ -1,10 +1,11 @@
-import uuid
 from datetime import datetime
 from typing import Optional, Dict, Any, TYPE_CHECKING, List
 
-from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, LargeBinary, DateTime, func
-from passlib.context import CryptContext
+from sqlmodel import SQLModel, Field, Relationship, col
+from sqlalchemy import Column, DateTime, Index, func
+
+from app.utilities.ids import UUIDString, gen_uuid
+from app.utilities.passwords import hash_password_sync, verify_password_sync
 
 if TYPE_CHECKING:
     from app.models.chat import ChatSession
@@ -12,21 +13,22 @@ if TYPE_CHECKING:
     from app.models.journal import Journal
     from app.models.eve import EveSession, EveMessage
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
-def gen_uuid() -> str:
-    return str(uuid.uuid4())
+# Child rows go with their user through ON DELETE CASCADE in the database
+# (see migrations/m0006); passive_deletes keeps the ORM from loading and
+# deleting them one by one first.
+_CHILDREN = {"cascade": "all, delete-orphan", "passive_deletes": True}
 
 
 class User(SQLModel, table=True):
     __tablename__ = "users"
 
-    id: str = Field(default_factory=gen_uuid, primary_key=True, max_length=36)
+    id: str = Field(default_factory=gen_uuid, primary_key=True, sa_type=UUIDString)
 
     name: Optional[str] = Field(default=None, max_length=255)
     age: Optional[int] = Field(default=None)
-    photo: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary))
+    # Content hash of the current photo (bytes live in user_photos)
+    photo_version: Optional[str] = Field(default=None, max_length=32)
     gender: Optional[str] = Field(default=None, max_length=32)
 
     username: Optional[str] = Field(
@@ -37,6 +39,11 @@ class User(SQLModel, table=True):
     hashed_password: str = Field(max_length=255)
 
     is_admin: bool = Field(default=False)
+    # Set when the account's deletion is requested; the user is treated as
+    # gone from then on, and services/account_deletion removes the rows
+    deletion_requested_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
     created_at: datetime = Field(
         sa_column=Column(
             "created_at",
@@ -47,32 +54,35 @@ class User(SQLModel, table=True):
     )
 
     chat_sessions: List["ChatSession"] = Relationship(
-        back_populates="user", sa_relationship_kwargs={"cascade": "all, delete-orphan"}
+        back_populates="user", sa_relationship_kwargs=_CHILDREN
     )
 
     blogs: List["Blog"] = Relationship(
-        back_populates="user", sa_relationship_kwargs={"cascade": "all, delete-orphan"}
+        back_populates="user", sa_relationship_kwargs=_CHILDREN
     )
 
     journals: List["Journal"] = Relationship(
-        back_populates="user", sa_relationship_kwargs={"cascade": "all, delete-orphan"}
+        back_populates="user", sa_relationship_kwargs=_CHILDREN
     )
     eve_sessions: List["EveSession"] = Relationship(
-        back_populates="user", sa_relationship_kwargs={"cascade": "all, delete-orphan"}
+        back_populates="user", sa_relationship_kwargs=_CHILDREN
     )
     eve_messages: List["EveMessage"] = Relationship(
-        back_populates="user", sa_relationship_kwargs={"cascade": "all, delete-orphan"}
+        back_populates="user", sa_relationship_kwargs=_CHILDREN
     )
 
     def set_password(self, raw_password: str) -> None:
-        """Hash and store password."""
-        self.hashed_password = pwd_context.hash(raw_password)
+        """
+        Hash and store password. Blocks for the full bcrypt cost; async code
+        should use app.utilities.passwords.password_hasher instead.
+        """
+        self.hashed_password = hash_password_sync(raw_password)
 
     def verify_password(self, raw_password: str) -> bool:
-        """Verify provided password against stored hash."""
+        """Verify provided password against stored hash (blocking)."""
         if not self.hashed_password:
             return False
-        return pwd_context.verify(raw_password, self.hashed_password)
+        return verify_password_sync(raw_password, self.hashed_password)[0]
 
     def to_dict(self) -> Dict[str, Any]:
         """Minimal public representation (no hashed password)."""
@@ -85,7 +95,31 @@ class User(SQLModel, table=True):
             "email": self.email,
             "is_admin": self.is_admin,
             "created_at": self.created_at.isoformat() if self.created_at else None,
+            "photo_url": self.photo_url,
         }
 
+    @property
+    def photo_url(self) -> Optional[str]:
+        """Versioned, so clients may cache it indefinitely."""
+        if not self.photo_version:
+            return None
+        return f"/api/users/{self.id}/photo?v={self.photo_version}"
+
     def __repr__(self) -> str:
         return f"<User id={self.id} email={self.email} admin={self.is_admin}>"
+
+
+# Admin user list (non-admins only, newest first; see migrations/m0003)
+Index(
+    "ix_users_created_non_admin",
+    col(User.created_at),
+    col(User.id),
+    postgresql_where=col(User.is_admin).is_(False),
+)
+
+# Accounts waiting for services/account_deletion
+Index(
+    "ix_users_deletion_requested",
+    col(User.deletion_requested_at),
+    postgresql_where=col(User.deletion_requested_at).is_not(None),
+)
@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, DateTime, ForeignKey, LargeBinary, String, func
+
+
+class UserPhoto(SQLModel, table=True):
+    """
+    One rendition of a user's profile photo ("original", "small", "thumb").
+
+    Kept out of the users row so authentication and author lookups never
+    read image bytes; users.photo_version is all they need to build a URL.
+    """
+
+    __tablename__ = "user_photos"
+
+    user_id: str = Field(
+        sa_column=Column(
+            ForeignKey("users.id", ondelete="CASCADE"),
+            primary_key=True,
+            nullable=False,
+        )
+    )
+    variant: str = Field(sa_column=Column(String(16), primary_key=True))
+
+    content_type: str = Field(max_length=64)
+    width: Optional[int] = Field(default=None)
+    height: Optional[int] = Field(default=None)
+    size_bytes: int = Field(default=0)
+    etag: str = Field(max_length=64)
+    data: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+
+    updated_at: datetime = Field(
+        sa_column=Column(
+            "updated_at",
+            DateTime(timezone=True),
+            server_default=func.now(),
+            onupdate=func.now(),
+            nullable=False,
+        )
+    )
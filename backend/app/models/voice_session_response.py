@@ -1,24 +1,22 @@
-import uuid
 from datetime import datetime
 from typing import Optional, TYPE_CHECKING
 
-from sqlmodel import SQLModel, Field
+from sqlmodel import SQLModel, Field, col
 from sqlalchemy import (
     Column,
     Text,
     DateTime,
     func,
     ForeignKey,
+    Index,
 )
 
+from app.utilities.ids import UUIDString, gen_uuid
+
 if TYPE_CHECKING:
     pass
 
 
-def gen_uuid() -> str:
-    return str(uuid.uuid4())
-
-
 class VoiceSessionResponseData(SQLModel, table=True):
     """
     Stores the response data from /api/eve/voice/end endpoint.
@@ -27,19 +25,18 @@ class VoiceSessionResponseData(SQLModel, table=True):
 
     __tablename__ = "voice_session_responses"
 
-    id: str = Field(default_factory=gen_uuid, primary_key=True, max_length=36)
+    id: str = Field(default_factory=gen_uuid, primary_key=True, sa_type=UUIDString)
 
     # FK with CASCADE (if user is deleted, remove responses)
     user_id: str = Field(
         sa_column=Column(
             ForeignKey("users.id", ondelete="CASCADE"),
-            index=True,
             nullable=False,
         )
     )
 
     # Original session ID from the voice session
-    session_id: str = Field(max_length=36, nullable=False, index=True)
+    session_id: str = Field(max_length=36, nullable=False)
 
     # Status from the voice session end response
     status: str = Field(max_length=50, nullable=False)
@@ -65,3 +62,18 @@ class VoiceSessionResponseData(SQLModel, table=True):
 
     # Relationships - we don't define back_populates since User model might not have this relationship
     # user: Optional["User"] = Relationship(back_populates="voice_session_responses")
+
+
+# Newest-first lists per user and per session (see migrations/m0003)
+Index(
+    "ix_voice_session_responses_user_created",
+    col(VoiceSessionResponseData.user_id),
+    col(VoiceSessionResponseData.created_at),
+    col(VoiceSessionResponseData.id),
+)
+Index(
+    "ix_voice_session_responses_session_user",
+    col(VoiceSessionResponseData.session_id),
+    col(VoiceSessionResponseData.user_id),
+    col(VoiceSessionResponseData.created_at),
+)
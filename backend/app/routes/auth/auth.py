@@ -1,16 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from datetime import datetime, timedelta, timezone
 from typing import Optional, List, Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.utilities.db import get_db
+from app.utilities.db import async_engine, get_db, pool_stats
+from app.utilities.replica import get_read_db, read_router
+from app.utilities.slow_queries import slow_queries
+from app.services.account_deletion.account_deletion import request_account_deletion
+from app.services.data_export.data_export import DataExport
 from app.services.auth.auth import (
     register_user,
     authenticate_user,
     create_default_admin_if_missing,
 )
-from app.utilities.jwt import create_access_token, decode_token, revoke_jti
+from app.utilities.jwt import (
+    ACCESS_TOKEN_EXPIRE_HOURS,
+    create_access_token,
+    decode_token,
+)
+from app.utilities.pagination import paginate
+from app.utilities.principal import Principal, principal_cache
+from app.utilities.revocation import revocations
 from app.models.user import User
 from app.routes.auth.schema.auth import RegisterRequest, LoginRequest, UserOut
 
@@ -20,9 +33,12 @@ router = APIRouter(prefix="/api", tags=["auth"])
 # ----- helper dependencies -----
 async def get_current_user(
     authorization: Optional[str] = Header(None), db: AsyncSession = Depends(get_db)
-) -> User:
+) -> Principal:
     """
-    Read Authorization: Bearer <token>, decode token, return User instance.
+    Read Authorization: Bearer <token> and return a snapshot of its user.
+    Tokens seen recently are answered from the principal cache without
+    re-verifying the JWT or touching the database; the revocation check
+    stays in-process unless the token's jti hits the Bloom filter.
     """
     if not authorization:
         raise HTTPException(
@@ -38,6 +54,19 @@ async def get_current_user(
         )
 
     token = parts[1]
+    cached = principal_cache.get(token)
+    if cached is not None:
+        # an account being deleted is revoked as a whole; the database check
+        # below only runs on a cache miss
+        if await revocations.is_revoked(
+            cached.jti
+        ) or await revocations.is_user_revoked(cached.id):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token error: Token revoked",
+            )
+        return cached
+
     try:
         payload = decode_token(token)
     except Exception as e:
@@ -50,18 +79,48 @@ async def get_current_user(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload"
         )
+    if await revocations.is_revoked(payload.get("jti")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token error: Token revoked",
+        )
 
+    generation = principal_cache.generation
     user = await db.get(User, user_id)
-    if not user:
+    # an account pending deletion is already gone as far as clients go
+    if not user or user.deletion_requested_at is not None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
         )
 
-    user._token_jti = payload.get("jti")
+    exp = payload.get("exp")
+    principal = Principal.from_user(
+        user,
+        jti=payload.get("jti"),
+        token_expires_at=(
+            datetime.fromtimestamp(exp, tz=timezone.utc)
+            if isinstance(exp, (int, float))
+            else None
+        ),
+    )
+    principal_cache.put(token, principal, generation, token_exp=payload.get("exp"))
+    return principal
+
+
+async def get_current_user_record(
+    principal: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """The authenticated user as an ORM row, for routes that modify it."""
+    user = await db.get(User, principal.id)
+    if not user or user.deletion_requested_at is not None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
+        )
     return user
 
 
-async def admin_required(user: User = Depends(get_current_user)) -> User:
+async def admin_required(user: Principal = Depends(get_current_user)) -> Principal:
     if not user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required"
@@ -112,29 +171,107 @@ async def login(
 
 
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_user)) -> dict[str, str]:
-    jti = getattr(current_user, "_token_jti", None)
+async def logout(
+    current_user: Principal = Depends(get_current_user),
+) -> dict[str, str]:
+    jti = current_user.jti
     if not jti:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Token jti not available"
         )
-    revoke_jti(jti)
+    # kept until the token would have expired anyway
+    expires_at = current_user.token_expires_at or datetime.now(
+        timezone.utc
+    ) + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
+    await revocations.revoke(jti, expires_at)
+    principal_cache.invalidate_jti(jti)
     return {"message": "Successfully logged out"}
 
 
 @router.get("/me", response_model=UserOut)
-async def me(current_user: User = Depends(get_current_user)) -> UserOut:
+async def me(current_user: Principal = Depends(get_current_user)) -> UserOut:
     return UserOut(**current_user.to_dict())
 
 
+@router.get("/me/export")
+async def export_me(
+    current_user: Principal = Depends(get_current_user),
+) -> StreamingResponse:
+    """Everything stored for the account, as a zip streamed while it is built."""
+    filename = f"hearu-export-{datetime.now(timezone.utc):%Y%m%d}.zip"
+    return StreamingResponse(
+        DataExport(current_user.id).stream(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.delete("/me", status_code=status.HTTP_202_ACCEPTED)
+async def delete_me(
+    user: User = Depends(get_current_user_record),
+    db: AsyncSession = Depends(get_db),
+) -> dict[str, str]:
+    """Delete the account and everything in it, in the background."""
+    await request_account_deletion(db, user)
+    return {"message": "Account deletion scheduled"}
+
+
 @router.get("/admin/users", response_model=List[UserOut])
 async def list_users(
-    admin: User = Depends(admin_required), db: AsyncSession = Depends(get_db)
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    admin: Principal = Depends(admin_required),
+    db: AsyncSession = Depends(get_read_db),
 ) -> List[UserOut]:
     stmt = select(User).where(getattr(User.is_admin, "is_")(False))
-    res = await db.execute(stmt)
-    users = res.scalars().all()
-    return [UserOut(**u.to_dict()) for u in users]
+    try:
+        page = await paginate(
+            db,
+            stmt,
+            created_col=User.created_at,
+            id_col=User.id,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    page.set_headers(response)
+    return [UserOut(**u.to_dict()) for u in page.items]
+
+
+@router.delete("/admin/users/{user_id}", status_code=status.HTTP_202_ACCEPTED)
+async def delete_user(
+    user_id: str,
+    admin: Principal = Depends(admin_required),
+    db: AsyncSession = Depends(get_db),
+) -> dict[str, str]:
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    await request_account_deletion(db, user)
+    return {"message": "Account deletion scheduled"}
+
+
+@router.get("/admin/db-pool")
+async def db_pool(admin: Principal = Depends(admin_required)) -> dict[str, Any]:
+    """Pool counters of the worker that served this request."""
+    stats = pool_stats.snapshot(async_engine)
+    replica = read_router.snapshot()
+    if replica is not None:
+        stats["replica"] = replica
+    return stats
+
+
+@router.get("/admin/slow-queries")
+async def slow_query_report(
+    limit: int = Query(20, ge=1, le=200),
+    admin: Principal = Depends(admin_required),
+) -> dict[str, Any]:
+    """Slowest statement fingerprints seen by the worker that served this request."""
+    return slow_queries.report(limit)
 
 
 @router.post("/setup/create-default-admin", status_code=status.HTTP_201_CREATED)
@@ -23,3 +23,4 @@ class UserOut(SQLModel):
     email: EmailStr
     username: Optional[str]
     is_admin: bool
+    photo_url: Optional[str] = None
@@ -1,21 +1,35 @@
 from typing import Dict, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    status,
+    Query,
+    Request,
+    Response,
+)
+from pydantic import TypeAdapter
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.utilities.db import get_db
+from app.utilities.replica import get_read_db
+from app.utilities.http_cache import CachedResponse, cached_response
 
 # reuse auth dependency from your existing auth router
 from app.routes.auth.auth import get_current_user
-from app.models.user import User
+from app.utilities.principal import Principal
 from app.services.blog.blog import (
+    blog_feed_cache,
+    blog_post_cache,
+    blog_tag_counts,
     create_blog,
     get_blog,
     list_blogs,
     update_blog,
     delete_blog,
 )
-from app.routes.blog.schema.blog import BlogCreate, BlogUpdate, BlogOut
+from app.routes.blog.schema.blog import BlogCreate, BlogUpdate, BlogOut, TagCountOut
 
 router = APIRouter(prefix="/api/blogs", tags=["blogs"])
 
@@ -24,7 +38,7 @@ router = APIRouter(prefix="/api/blogs", tags=["blogs"])
 async def create_blog_endpoint(
     payload: BlogCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> BlogOut:
     blog = await create_blog(
         db,
@@ -38,7 +52,7 @@ async def create_blog_endpoint(
         user_id=blog.user_id,
         title=blog.title,
         content=blog.content,
-        tags=blog.tags.split(",") if blog.tags else [],
+        tags=blog.tags or [],
         created_at=blog.created_at,
         updated_at=blog.updated_at,
         author_name=current_user.name or current_user.username,
@@ -46,56 +60,111 @@ async def create_blog_endpoint(
     return out
 
 
+_blog_list = TypeAdapter(List[BlogOut])
+
+
 @router.get("", response_model=List[BlogOut])
 async def list_blogs_endpoint(
+    request: Request,
     db: AsyncSession = Depends(get_db),
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     limit: int = Query(10, ge=1, le=100),
+    include_total: bool = Query(False),
     q: Optional[str] = Query(None),
-) -> List[BlogOut]:
-    items, total = await list_blogs(db, skip=skip, limit=limit, q=q)
-    out = []
-    for b in items:
-        author_name = None
-        if b.user:
-            author_name = b.user.name or b.user.username
-        out.append(
-            BlogOut(
-                id=b.id,
-                user_id=b.user_id,
-                title=b.title,
-                content=b.content,
-                tags=b.tags.split(",") if b.tags else [],
-                created_at=b.created_at,
-                updated_at=b.updated_at,
-                author_name=author_name,
+    tag: Optional[List[str]] = Query(None, description="Repeat to require several"),
+) -> Response:
+    """
+    Served from the feed cache when possible; send If-None-Match (or
+    If-Modified-Since) to get a 304 without a database round-trip.
+    """
+    key = (cursor, limit, include_total, q, tuple(tag or ()))
+    cached = blog_feed_cache.get(key)
+    if cached is None:
+        generation = blog_feed_cache.generation
+        try:
+            page = await list_blogs(
+                db,
+                cursor=cursor,
+                limit=limit,
+                q=q,
+                tags=tag,
+                include_total=include_total,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        out = []
+        for hit in page.items:
+            b = hit.item
+            author_name = None
+            if b.user:
+                author_name = b.user.name or b.user.username
+            out.append(
+                BlogOut(
+                    id=b.id,
+                    user_id=b.user_id,
+                    title=b.title,
+                    content=b.content,
+                    tags=b.tags or [],
+                    created_at=b.created_at,
+                    updated_at=b.updated_at,
+                    author_name=author_name,
+                    rank=hit.rank,
+                    snippet=hit.snippet,
+                )
             )
+        cached = CachedResponse(
+            body=_blog_list.dump_json(out),
+            last_modified=blog_feed_cache.last_modified(
+                b.updated_at or b.created_at for b in out
+            ),
+            headers=page.headers(),
         )
-    return out
+        blog_feed_cache.put(key, cached, generation)
+    return cached_response(request, cached)
+
+
+@router.get("/tags", response_model=List[TagCountOut])
+async def blog_tags_endpoint(
+    limit: int = Query(50, ge=1, le=500), db: AsyncSession = Depends(get_read_db)
+) -> List[TagCountOut]:
+    """Tags across all blogs with how many posts carry each."""
+    counts = await blog_tag_counts(db, limit=limit)
+    return [TagCountOut(tag=c.tag, count=c.count) for c in counts]
 
 
 @router.get("/{blog_id}", response_model=BlogOut)
 async def get_blog_endpoint(
-    blog_id: str, db: AsyncSession = Depends(get_db)
-) -> BlogOut:
-    blog = await get_blog(db, blog_id)
-    if not blog:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Blog not found"
+    blog_id: str, request: Request, db: AsyncSession = Depends(get_db)
+) -> Response:
+    cached = blog_post_cache.get(blog_id)
+    if cached is None:
+        generation = blog_post_cache.generation
+        blog = await get_blog(db, blog_id)
+        if not blog:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Blog not found"
+            )
+        author_name = None
+        if blog.user:
+            author_name = blog.user.name or blog.user.username
+        out = BlogOut(
+            id=blog.id,
+            user_id=blog.user_id,
+            title=blog.title,
+            content=blog.content,
+            tags=blog.tags or [],
+            created_at=blog.created_at,
+            updated_at=blog.updated_at,
+            author_name=author_name,
         )
-    author_name = None
-    if blog.user:
-        author_name = blog.user.name or blog.user.username
-    return BlogOut(
-        id=blog.id,
-        user_id=blog.user_id,
-        title=blog.title,
-        content=blog.content,
-        tags=blog.tags.split(",") if blog.tags else [],
-        created_at=blog.created_at,
-        updated_at=blog.updated_at,
-        author_name=author_name,
-    )
+        cached = CachedResponse(
+            body=out.model_dump_json().encode("utf-8"),
+            last_modified=blog_post_cache.last_modified(
+                [out.updated_at or out.created_at]
+            ),
+        )
+        blog_post_cache.put(blog_id, cached, generation)
+    return cached_response(request, cached)
 
 
 @router.put("/{blog_id}", response_model=BlogOut)
@@ -103,7 +172,7 @@ async def update_blog_endpoint(
     blog_id: str,
     payload: BlogUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> BlogOut:
     try:
         blog = await update_blog(
@@ -125,7 +194,7 @@ async def update_blog_endpoint(
         user_id=blog.user_id,
         title=blog.title,
         content=blog.content,
-        tags=blog.tags.split(",") if blog.tags else [],
+        tags=blog.tags or [],
         created_at=blog.created_at,
         updated_at=blog.updated_at,
         author_name=current_user.name or current_user.username,
@@ -136,7 +205,7 @@ async def update_blog_endpoint(
 async def delete_blog_endpoint(
     blog_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Dict[str, str]:
     try:
         ok = await delete_blog(db, blog_id=blog_id, user=current_user)
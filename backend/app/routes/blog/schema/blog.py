@@ -24,6 +24,14 @@ class BlogOut(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
     author_name: Optional[str] = None
+    # Set on search results (?q=): relevance and an HTML excerpt with <mark> hits
+    rank: Optional[float] = None
+    snippet: Optional[str] = None
 
     class Config:
         from_attributes = True
+
+
+class TagCountOut(BaseModel):
+    tag: str
+    count: int
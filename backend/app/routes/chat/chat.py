@@ -1,15 +1,18 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.utilities.db import get_db, async_session
+from app.utilities.db import async_session
+from app.utilities.replica import get_read_db
 from app.routes.auth.auth import get_current_user
-from app.models.user import User
+from app.utilities.principal import Principal
 from app.models.chat import Message
 from app.services.chat.chat import ChatService, GeminiProvider
+from app.utilities.pagination import paginate
+from app.utilities.partitions import month_floor
 
 from app.routes.chat.schema.chat import (
     CreateSessionRequest,
@@ -29,7 +32,7 @@ _chat_service = ChatService(provider=_provider, db_session_factory=async_session
 
 @router.post("/session", response_model=SessionOut, status_code=status.HTTP_201_CREATED)
 async def create_session(
-    payload: CreateSessionRequest, current_user: User = Depends(get_current_user)
+    payload: CreateSessionRequest, current_user: Principal = Depends(get_current_user)
 ) -> SessionOut:
     cs = await _chat_service.create_session(
         user_id=current_user.id, title=payload.title
@@ -40,8 +43,10 @@ async def create_session(
 @router.get("/{session_id}", response_model=ChatHistoryResponse)
 async def get_session(
     session_id: int,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ) -> ChatHistoryResponse:
     cs = await _chat_service.get_session(session_id)
     if not cs:
@@ -52,13 +57,23 @@ async def get_session(
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="access denied"
         )
-    q = (
-        select(Message)
-        .where(Message.session_id == session_id)
-        .order_by(Message.created_at)
-    )
-    res = await db.execute(q)
-    msgs: List[Message] = res.scalars().all()
+    # oldest first; each page continues after the previous one's last message
+    try:
+        page = await paginate(
+            db,
+            select(Message).where(
+                Message.session_id == session_id,
+                Message.created_at >= month_floor(cs.created_at),
+            ),
+            created_col=Message.created_at,
+            id_col=Message.id,
+            cursor=cursor,
+            limit=limit,
+            descending=False,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    msgs: List[Message] = page.items
     items = [
         MessageOut(
             id=m.id,
@@ -68,12 +83,14 @@ async def get_session(
         )
         for m in msgs
     ]
-    return ChatHistoryResponse(session_id=session_id, messages=items)
+    return ChatHistoryResponse(
+        session_id=session_id, messages=items, next_cursor=page.next_cursor
+    )
 
 
 @router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_session(
-    session_id: int, current_user: User = Depends(get_current_user)
+    session_id: int, current_user: Principal = Depends(get_current_user)
 ) -> None:
     cs = await _chat_service.get_session(session_id)
     if not cs:
@@ -92,7 +109,7 @@ async def delete_session(
 async def send_message(
     session_id: int,
     payload: SendMessageRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> dict[str, str]:
     cs = await _chat_service.get_session(session_id)
     if not cs:
@@ -111,7 +128,7 @@ async def send_message(
 
 @router.post("/agent", response_model=AgentResponse)
 async def agent_endpoint(
-    payload: AgentRequest, current_user: User = Depends(get_current_user)
+    payload: AgentRequest, current_user: Principal = Depends(get_current_user)
 ) -> AgentResponse:
     session_id = payload.session_id
     if session_id:
@@ -142,7 +159,7 @@ async def agent_endpoint(
         session_id = cs.id
 
     assert session_id is not None
-    reply = await _chat_service.send_user_message_and_get_reply(
+    turn = await _chat_service.send_user_message(
         session_id=session_id, user_text=payload.text
     )
-    return AgentResponse(reply=reply, session_id=session_id)
+    return AgentResponse(reply=turn.reply, session_id=session_id, crisis=turn.crisis)
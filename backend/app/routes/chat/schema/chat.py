@@ -26,6 +26,7 @@ class MessageOut(SQLModel):
 class ChatHistoryResponse(SQLModel):
     session_id: int
     messages: List[MessageOut]
+    next_cursor: Optional[str] = None
 
 
 class AgentRequest(SQLModel):
@@ -38,3 +39,4 @@ class AgentRequest(SQLModel):
 class AgentResponse(SQLModel):
     reply: str
     session_id: Optional[int] = None
+    crisis: bool = False
@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from app.services.eve.eve import EveService
 from app.utilities.db import get_db
+from app.utilities.replica import get_read_db
 from app.routes.auth.auth import get_current_user
-from app.models.user import User
+from app.utilities.principal import Principal
 from app.routes.eve.schema.eve import (
     JournalEveRequest,
     JournalEveResponse,
@@ -30,7 +31,7 @@ router = APIRouter(prefix="/api/eve", tags=["Eve"])
 async def journal_reply(
     payload: JournalEveRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> JournalEveResponse:
     """Generate Eve's supportive voice reply to a journal entry."""
     service = EveService(db)
@@ -45,7 +46,7 @@ async def journal_reply(
 async def start_voice_session(
     payload: VoiceSessionStartRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> VoiceSessionStartResponse:
     """Start a new interactive voice session with Eve."""
     service = EveService(db)
@@ -57,7 +58,7 @@ async def voice_turn(
     session_id: str,
     audio: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> VoiceSessionTurnResponse:
     """Process a voice turn in an active session."""
     service = EveService(db)
@@ -74,11 +75,22 @@ async def voice_turn(
     return result
 
 
+@router.get("/voice/{session_id}/messages", response_model=List[EveMessageResponse])
+async def list_session_messages(
+    session_id: str,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+) -> List[EveMessageResponse]:
+    """List messages for a voice session."""
+    service = EveService(db)
+    return await service.list_session_messages(session_id, current_user)
+
+
 @router.post("/voice/end", response_model=VoiceSessionEndResponse)
 async def end_voice_session(
     payload: VoiceSessionEndRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> VoiceSessionEndResponse:
     """End a voice session with optional summarization."""
     service = EveService(db)
@@ -95,19 +107,27 @@ async def end_voice_session(
 # --- Journal CRUD ---
 @router.get("/journals", response_model=List[JournalResponse])
 async def list_journals(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ) -> List[JournalResponse]:
-    """List user's journals."""
+    """List user's journals. The next page's cursor is in X-Next-Cursor."""
     service = EveService(db)
-    return await service.list_journals(current_user)
+    try:
+        page = await service.list_journals(current_user, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page.set_headers(response)
+    return page.items
 
 
 @router.get("/journals/{journal_id}", response_model=JournalResponse)
 async def get_journal(
     journal_id: str,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ) -> JournalResponse:
     """Get a specific journal."""
     service = EveService(db)
@@ -121,7 +141,7 @@ async def get_journal(
 async def create_journal(
     payload: JournalCreateRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> JournalResponse:
     """Create a new journal."""
     service = EveService(db)
@@ -133,7 +153,7 @@ async def update_journal(
     journal_id: str,
     payload: JournalUpdateRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> JournalResponse:
     """Update a journal."""
     service = EveService(db)
@@ -147,7 +167,7 @@ async def update_journal(
 async def delete_journal(
     journal_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Dict[str, str]:
     """Delete a journal."""
     service = EveService(db)
@@ -161,8 +181,8 @@ async def delete_journal(
 @router.get("/journals/{journal_id}/messages", response_model=List[EveMessageResponse])
 async def list_messages(
     journal_id: str,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ) -> List[EveMessageResponse]:
     """List messages for a journal."""
     service = EveService(db)
@@ -174,11 +194,14 @@ async def create_message(
     journal_id: str,
     payload: EveMessageCreateRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> EveMessageResponse:
     """Create a new message."""
     service = EveService(db)
-    return await service.create_message(journal_id, payload, current_user)
+    message = await service.create_message(journal_id, payload, current_user)
+    if not message:
+        raise HTTPException(status_code=404, detail="Journal not found")
+    return message
 
 
 @router.put("/messages/{message_id}", response_model=EveMessageResponse)
@@ -186,7 +209,7 @@ async def update_message(
     message_id: str,
     payload: EveMessageUpdateRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> EveMessageResponse:
     """Update a message."""
     service = EveService(db)
@@ -200,7 +223,7 @@ async def update_message(
 async def delete_message(
     message_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Dict[str, str]:
     """Delete a message."""
     service = EveService(db)
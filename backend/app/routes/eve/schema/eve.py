@@ -3,6 +3,17 @@ from pydantic import BaseModel
 from datetime import datetime
 
 
+# -------------------- Audio --------------------
+
+
+class AudioMetadata(BaseModel):
+    duration_seconds: Optional[float] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    codec: Optional[str] = None
+    size_bytes: Optional[int] = None
+
+
 # -------------------- Journal --------------------
 
 
@@ -42,8 +53,11 @@ class JournalEveResponse(BaseModel):
     message_id: str
     text: str
     audio_path: Optional[str]
+    audio: Optional[AudioMetadata] = None
     created_at: datetime
     session_id: str
+    # True when the reply is the helpline fast path; the full reply follows
+    crisis: bool = False
 
 
 # -------------------- Voice Session --------------------
@@ -58,6 +72,9 @@ class VoiceSessionStartResponse(BaseModel):
     system_prompt: str
     is_active: bool
     created_at: datetime
+    greeting_text: Optional[str] = None
+    greeting_audio_path: Optional[str] = None
+    greeting_audio: Optional[AudioMetadata] = None
 
 
 class VoiceSessionTurnRequest(BaseModel):
@@ -71,7 +88,12 @@ class VoiceSessionTurnResponse(BaseModel):
     eve_text: str
     audio_path: Optional[str]
     user_audio_path: Optional[str] = None
+    audio: Optional[AudioMetadata] = None
+    user_audio: Optional[AudioMetadata] = None
     created_at: datetime
+    # True when the reply is the helpline fast path; the full reply is
+    # appended to the session shortly after
+    crisis: bool = False
 
 
 class VoiceSessionEndRequest(BaseModel):
@@ -126,6 +148,7 @@ class EveMessageResponse(BaseModel):
     role: str
     text: str
     audio_path: Optional[str] = None
+    audio: Optional[AudioMetadata] = None
     created_at: datetime
 
     class Config:
@@ -1,18 +1,26 @@
 from typing import Dict, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.utilities.db import get_db
+from app.utilities.replica import get_read_db
 from app.routes.auth.auth import get_current_user
-from app.models.user import User
+from app.utilities.principal import Principal
 from app.services.journal.journal import (
     create_journal,
     get_journal,
+    journal_tag_counts,
     list_journals,
+    similar_journals,
     update_journal,
     delete_journal,
 )
-from app.routes.journal.schema.journal import JournalCreate, JournalUpdate, JournalOut
+from app.routes.journal.schema.journal import (
+    JournalCreate,
+    JournalUpdate,
+    JournalOut,
+    TagCountOut,
+)
 
 router = APIRouter(prefix="/api/journals", tags=["journals"])
 
@@ -21,7 +29,7 @@ router = APIRouter(prefix="/api/journals", tags=["journals"])
 async def create_journal_endpoint(
     payload: JournalCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> JournalOut:
     journal = await create_journal(
         db,
@@ -36,7 +44,7 @@ async def create_journal_endpoint(
         user_id=journal.user_id,
         title=journal.title,
         content=journal.content,
-        tags=journal.tags.split(",") if journal.tags else [],
+        tags=journal.tags or [],
         entry_date=journal.entry_date,
         created_at=journal.created_at,
         updated_at=journal.updated_at,
@@ -46,22 +54,32 @@ async def create_journal_endpoint(
 
 @router.get("", response_model=List[JournalOut])
 async def list_journals_endpoint(
-    db: AsyncSession = Depends(get_db),
-    skip: int = Query(0, ge=0),
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    cursor: Optional[str] = Query(None),
     limit: int = Query(10, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    include_total: bool = Query(False),
+    current_user: Principal = Depends(get_current_user),
     q: Optional[str] = Query(None),
+    tag: Optional[List[str]] = Query(None, description="Repeat to require several"),
 ) -> List[JournalOut]:
-    items, total = await list_journals(
-        db,
-        skip=skip,
-        limit=limit,
-        q=q,
-        user_id=current_user.id,
-    )
+    try:
+        page = await list_journals(
+            db,
+            cursor=cursor,
+            limit=limit,
+            q=q,
+            user_id=current_user.id,
+            tags=tag,
+            include_total=include_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    page.set_headers(response)
 
     out = []
-    for j in items:
+    for hit in page.items:
+        j = hit.item
         author_name = j.user.name or j.user.username if j.user else None
         out.append(
             JournalOut(
@@ -69,11 +87,60 @@ async def list_journals_endpoint(
                 user_id=j.user_id,
                 title=j.title,
                 content=j.content,
-                tags=j.tags.split(",") if j.tags else [],
+                tags=j.tags or [],
                 entry_date=j.entry_date,
                 created_at=j.created_at,
                 updated_at=j.updated_at,
                 author_name=author_name,
+                rank=hit.rank,
+                snippet=hit.snippet,
+            )
+        )
+    return out
+
+
+@router.get("/tags", response_model=List[TagCountOut])
+async def journal_tags_endpoint(
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+) -> List[TagCountOut]:
+    """The current user's tags with how many entries carry each."""
+    counts = await journal_tag_counts(db, user_id=current_user.id, limit=limit)
+    return [TagCountOut(tag=c.tag, count=c.count) for c in counts]
+
+
+@router.get("/similar", response_model=List[JournalOut])
+async def similar_journals_endpoint(
+    q: Optional[str] = Query(None, description="Describe a feeling or situation"),
+    journal_id: Optional[str] = Query(None),
+    k: int = Query(5, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+) -> List[JournalOut]:
+    """Entries semantically similar to `q` or to one of the user's journals."""
+    try:
+        hits = await similar_journals(
+            db, user_id=current_user.id, q=q, journal_id=journal_id, k=k
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    out = []
+    for hit in hits:
+        j = hit.item
+        out.append(
+            JournalOut(
+                id=j.id,
+                user_id=j.user_id,
+                title=j.title,
+                content=j.content,
+                tags=j.tags or [],
+                entry_date=j.entry_date,
+                created_at=j.created_at,
+                updated_at=j.updated_at,
+                author_name=j.user.name or j.user.username if j.user else None,
+                rank=hit.rank,
             )
         )
     return out
@@ -81,7 +148,7 @@ async def list_journals_endpoint(
 
 @router.get("/{journal_id}", response_model=JournalOut)
 async def get_journal_endpoint(
-    journal_id: str, db: AsyncSession = Depends(get_db)
+    journal_id: str, db: AsyncSession = Depends(get_read_db)
 ) -> JournalOut:
     journal = await get_journal(db, journal_id)
     if not journal:
@@ -96,7 +163,7 @@ async def get_journal_endpoint(
         user_id=journal.user_id,
         title=journal.title,
         content=journal.content,
-        tags=journal.tags.split(",") if journal.tags else [],
+        tags=journal.tags or [],
         entry_date=journal.entry_date,
         created_at=journal.created_at,
         updated_at=journal.updated_at,
@@ -109,7 +176,7 @@ async def update_journal_endpoint(
     journal_id: str,
     payload: JournalUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> JournalOut:
     try:
         journal = await update_journal(
@@ -132,7 +199,7 @@ async def update_journal_endpoint(
         user_id=journal.user_id,
         title=journal.title,
         content=journal.content,
-        tags=journal.tags.split(",") if journal.tags else [],
+        tags=journal.tags or [],
         entry_date=journal.entry_date,
         created_at=journal.created_at,
         updated_at=journal.updated_at,
@@ -144,7 +211,7 @@ async def update_journal_endpoint(
 async def delete_journal_endpoint(
     journal_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Dict[str, str]:
     try:
         ok = await delete_journal(db, journal_id=journal_id, user=current_user)
@@ -27,6 +27,14 @@ class JournalOut(JournalBase):
     created_at: datetime
     updated_at: Optional[datetime]
     author_name: Optional[str]
+    # Set on search results (?q=): relevance and an HTML excerpt with <mark> hits
+    rank: Optional[float] = None
+    snippet: Optional[str] = None
 
     class Config:
         from_attributes = True
+
+
+class TagCountOut(BaseModel):
+    tag: str
+    count: int
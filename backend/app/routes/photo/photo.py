@@ -0,0 +1,94 @@
+from typing import Dict, Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.utilities.db import get_db
+from app.utilities.http_cache import CachedResponse, cached_response
+from app.routes.auth.auth import get_current_user_record
+from app.routes.auth.schema.auth import UserOut
+from app.models.user import User
+from app.services.photo.photo import (
+    ORIGINAL,
+    cache_key,
+    delete_photo,
+    get_photo,
+    photo_cache,
+    set_photo,
+    version_of,
+)
+
+router = APIRouter(prefix="/api", tags=["photos"])
+
+# /api/users/{id}/photo?v=<version> never changes; unversioned URLs revalidate
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@router.put("/me/photo", response_model=UserOut)
+async def upload_photo(
+    photo: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_record),
+) -> UserOut:
+    """Replace the profile photo; thumbnails are rendered before returning."""
+    # read one byte past the cap so oversized uploads are rejected unbuffered
+    raw = await photo.read(settings.photo_max_upload_mb * 1024 * 1024 + 1)
+    try:
+        user = await set_photo(db, user=current_user, raw=raw)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return UserOut(**user.to_dict())
+
+
+@router.delete("/me/photo", status_code=status.HTTP_200_OK)
+async def remove_photo(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_record),
+) -> Dict[str, str]:
+    if not await delete_photo(db, user=current_user):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No photo")
+    return {"message": "Photo removed"}
+
+
+@router.get("/users/{user_id}/photo")
+async def user_photo(
+    user_id: str,
+    request: Request,
+    size: str = Query(ORIGINAL, description="original, small (256px) or thumb (64px)"),
+    v: Optional[str] = Query(None, description="photo_version from the user"),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    key = cache_key(user_id, size)
+    cached = photo_cache.get(key)
+    if cached is None:
+        generation = photo_cache.generation
+        try:
+            photo = await get_photo(db, user_id=user_id, variant=size)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        if photo is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Photo not found"
+            )
+        cached = CachedResponse(
+            body=photo.data,
+            last_modified=photo.updated_at,
+            etag=f'"{photo.etag}"',
+            media_type=photo.content_type,
+        )
+        photo_cache.put(key, cached, generation)
+    versioned = v is not None and v == version_of(cached.etag)
+    return cached_response(
+        request, cached, IMMUTABLE if versioned else "public, no-cache"
+    )
@@ -43,3 +43,5 @@ class VoiceSessionResponseListResponse(BaseModel):
     """Response schema for listing voice session responses"""
 
     responses: List[VoiceSessionResponseResponse]
+    # Pass back as ?cursor= for the next page; None on the last page
+    next_cursor: Optional[str] = None
@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Dict
+from typing import Dict, Optional
 
 from app.services.voice_session_response.voice_session_response import (
     VoiceSessionResponseService,
 )
 from app.utilities.db import get_db
+from app.utilities.replica import get_read_db
 from app.routes.auth.auth import get_current_user
-from app.models.user import User
+from app.utilities.principal import Principal
 from app.routes.voice_session_response.schema.voice_session_response import (
     VoiceSessionResponseCreateRequest,
     VoiceSessionResponseUpdateRequest,
@@ -24,7 +25,7 @@ router = APIRouter(
 async def create_voice_session_response(
     payload: VoiceSessionResponseCreateRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> VoiceSessionResponseResponse:
     """Create a new voice session response record."""
     service = VoiceSessionResponseService(db)
@@ -33,20 +34,29 @@ async def create_voice_session_response(
 
 @router.get("/", response_model=VoiceSessionResponseListResponse)
 async def list_voice_session_responses(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ) -> VoiceSessionResponseListResponse:
-    """List all voice session responses for the current user."""
+    """List voice session responses for the current user, newest first."""
     service = VoiceSessionResponseService(db)
-    responses = await service.list_responses(current_user)
-    return VoiceSessionResponseListResponse(responses=responses)
+    try:
+        page = await service.list_responses(current_user, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page.set_headers(response)
+    return VoiceSessionResponseListResponse(
+        responses=page.items, next_cursor=page.next_cursor
+    )
 
 
 @router.get("/{response_id}", response_model=VoiceSessionResponseResponse)
 async def get_voice_session_response(
     response_id: str,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ) -> VoiceSessionResponseResponse:
     """Get a specific voice session response by ID."""
     service = VoiceSessionResponseService(db)
@@ -59,8 +69,8 @@ async def get_voice_session_response(
 @router.get("/session/{session_id}", response_model=VoiceSessionResponseListResponse)
 async def get_voice_session_responses_by_session(
     session_id: str,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ) -> VoiceSessionResponseListResponse:
     """Get all voice session responses for a specific session."""
     service = VoiceSessionResponseService(db)
@@ -73,7 +83,7 @@ async def update_voice_session_response(
     response_id: str,
     payload: VoiceSessionResponseUpdateRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> VoiceSessionResponseResponse:
     """Update a voice session response."""
     service = VoiceSessionResponseService(db)
@@ -87,7 +97,7 @@ async def update_voice_session_response(
 async def delete_voice_session_response(
     response_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Dict[str, str]:
     """Delete a voice session response."""
     service = VoiceSessionResponseService(db)
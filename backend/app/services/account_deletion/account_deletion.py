@@ -0,0 +1,254 @@
+import asyncio
+import dataclasses
+import os
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlmodel import col
+
+from app.config import settings
+from app.models.blog import Blog
+from app.models.user import User
+from app.services.audio_retention.audio_retention import remove_files
+from app.services.blog.blog import invalidate_blogs
+from app.utilities.audio import EVE_AUDIO_DIR, USER_AUDIO_DIR
+from app.utilities.background import spawn
+from app.utilities.db import async_engine
+from app.utilities.logger import logger
+from app.utilities.revocation import revocations
+from app.utilities.slow_queries import SKIP_OPTION
+
+log = logger(__name__)
+
+# pg_try_advisory_lock(key, hashtext(user id)): one worker per account
+_LOCK_KEY = 0x44454C45  # "DELE"
+# never re-run under EXPLAIN ANALYZE, which would take the lock again
+_LOCK = text("SELECT pg_try_advisory_lock(:k, hashtext(:u))").execution_options(
+    **{SKIP_OPTION: True}
+)
+_UNLOCK = text("SELECT pg_advisory_unlock(:k, hashtext(:u))").execution_options(
+    **{SKIP_OPTION: True}
+)
+
+# (table, primary key, the account's rows) after its eve messages, children
+# before parents, so every statement deletes a bounded number of rows and
+# nothing is left to cascade from them
+_TABLES: List[Tuple[str, str, str]] = [
+    (
+        "messages",
+        "id, created_at",
+        "session_id IN (SELECT id FROM chat_sessions WHERE user_id = :u)",
+    ),
+    ("chat_sessions", "id", "user_id = :u"),
+    ("eve_sessions", "id", "user_id = :u"),
+    # one embedding per journal cascades with it
+    ("journals", "id", "user_id = :u"),
+    ("blogs", "id", "user_id = :u"),
+    ("voice_session_responses", "id", "user_id = :u"),
+]
+
+
+@dataclasses.dataclass
+class DeletionReport:
+    user_id: str
+    rows: int = 0
+    audio_files: int = 0
+    bytes_freed: int = 0
+
+
+def _owned_audio(path: Optional[str]) -> bool:
+    """
+    Recordings and synthesized replies belong to their one message; the
+    pre-rendered phrases (PHRASE_AUDIO_DIR) are shared by every user.
+    """
+    if not path:
+        return False
+    return os.path.dirname(os.path.abspath(path)) in (USER_AUDIO_DIR, EVE_AUDIO_DIR)
+
+
+async def request_account_deletion(db: AsyncSession, user: User) -> None:
+    """
+    Mark the account for deletion and start deleting it in the background.
+    From the commit on its logins are refused (services/auth), and its
+    tokens are revoked: at once by this worker, by the others at their next
+    revocation sync (REVOCATION_SYNC_INTERVAL_SECONDS), however long their
+    principal caches would have kept them. Its blog posts are dropped from
+    this worker's caches (services/blog) at once as well.
+    """
+    if user.deletion_requested_at is None:
+        user.deletion_requested_at = datetime.now(timezone.utc)
+        db.add(user)
+        await db.commit()
+    await revocations.revoke_user(user.id)
+    blog_ids = (
+        await db.execute(select(col(Blog.id)).where(col(Blog.user_id) == user.id))
+    ).scalars()
+    invalidate_blogs(str(blog_id) for blog_id in blog_ids)
+    spawn(AccountDeletionService().delete_pending(), name="account-deletion")
+
+
+class AccountDeletionService:
+    """
+    Deletes the accounts whose deletion was requested
+    (users.deletion_requested_at), `batch_size` rows per transaction, so
+    memory, statement count per transaction and lock time stay flat however
+    much history the account has.
+
+    The account's eve messages go first; each batch's audio files are
+    removed once its rows are committed (a failed removal leaves an orphan
+    for the audio sweep). The rest of its rows follow table by table, and
+    deleting the users row last cascades whatever is left, such as photos
+    and rows other workers wrote before they synced the account's
+    revocation (their audio files are left to the orphan sweep). Months of messages already
+    archived (services/partition_archive) keep the account's rows in their
+    files; restoring one drops them again.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine = async_engine,
+        *,
+        batch_size: int = settings.account_deletion_batch_size,
+        batch_pause_seconds: float = settings.account_deletion_batch_pause_seconds,
+    ) -> None:
+        self.engine = engine
+        self.batch_size = max(1, batch_size)
+        self.batch_pause_seconds = batch_pause_seconds
+
+    # ---------- public API ----------
+    async def delete_pending(self) -> List[DeletionReport]:
+        """Delete every account waiting for it; ones busy in another worker are skipped."""
+        reports: List[DeletionReport] = []
+        async with self.engine.connect() as conn:
+            pending = (
+                (
+                    await conn.execute(
+                        text(
+                            "SELECT id FROM users "
+                            "WHERE deletion_requested_at IS NOT NULL "
+                            "ORDER BY deletion_requested_at"
+                        )
+                    )
+                )
+                .scalars()
+                .all()
+            )
+            await conn.commit()
+            for user_id in pending:
+                report = await self._delete_locked(conn, str(user_id))
+                if report is not None:
+                    log.info(
+                        "Deleted account %s: rows=%s audio_files=%s freed=%s",
+                        report.user_id,
+                        report.rows,
+                        report.audio_files,
+                        report.bytes_freed,
+                    )
+                    reports.append(report)
+        return reports
+
+    async def run_forever(
+        self, interval_seconds: int = settings.account_deletion_interval_seconds
+    ) -> None:
+        """Delete pending accounts periodically until cancelled (started from the app lifespan)."""
+        while True:
+            try:
+                await self.delete_pending()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Account deletion failed")
+            await asyncio.sleep(interval_seconds)
+
+    # ---------- internals ----------
+    async def _delete_locked(
+        self, conn: AsyncConnection, user_id: str
+    ) -> Optional[DeletionReport]:
+        lock = {"k": _LOCK_KEY, "u": user_id}
+        locked = (await conn.execute(_LOCK, lock)).scalar()
+        await conn.commit()
+        if not locked:
+            return None
+        try:
+            return await self._delete(conn, user_id)
+        finally:
+            await conn.rollback()
+            await conn.execute(_UNLOCK, lock)
+            await conn.commit()
+
+    async def _delete(
+        self, conn: AsyncConnection, user_id: str
+    ) -> Optional[DeletionReport]:
+        params = {"u": user_id, "n": self.batch_size}
+        requested = (
+            await conn.execute(
+                text("SELECT deletion_requested_at FROM users WHERE id = :u"), params
+            )
+        ).scalar()
+        await conn.commit()
+        if requested is None:
+            # deleted by another worker meanwhile
+            return None
+
+        report = DeletionReport(user_id)
+        while True:
+            paths = (
+                (
+                    await conn.execute(
+                        text(
+                            "DELETE FROM eve_messages WHERE (id, created_at) IN "
+                            "(SELECT id, created_at FROM eve_messages "
+                            "WHERE user_id = :u LIMIT :n) RETURNING audio_path"
+                        ),
+                        params,
+                    )
+                )
+                .scalars()
+                .all()
+            )
+            await conn.commit()
+            report.rows += len(paths)
+            files = [p for p in paths if _owned_audio(p)]
+            if files:
+                report.bytes_freed += await asyncio.to_thread(remove_files, files)
+                report.audio_files += len(files)
+            if len(paths) < self.batch_size:
+                break
+            await asyncio.sleep(self.batch_pause_seconds)
+
+        for table, key, owned in _TABLES:
+            while True:
+                deleted = (
+                    (
+                        await conn.execute(
+                            text(
+                                f"DELETE FROM {table} WHERE ({key}) IN "
+                                f"(SELECT {key} FROM {table} WHERE {owned} LIMIT :n) "
+                                "RETURNING id"
+                            ),
+                            params,
+                        )
+                    )
+                    .scalars()
+                    .all()
+                )
+                await conn.commit()
+                report.rows += len(deleted)
+                if table == "blogs":
+                    # raw SQL bypasses services/blog, which keeps its caches
+                    invalidate_blogs(str(blog_id) for blog_id in deleted)
+                if len(deleted) < self.batch_size:
+                    break
+                await asyncio.sleep(self.batch_pause_seconds)
+
+        await conn.execute(text("DELETE FROM users WHERE id = :u"), params)
+        await conn.commit()
+        report.rows += 1
+        return report
+
+
+if __name__ == "__main__":
+    # One-shot run, e.g. from a cron job: python -m app.services.account_deletion.account_deletion
+    print(asyncio.run(AccountDeletionService().delete_pending()))
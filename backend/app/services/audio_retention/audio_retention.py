@@ -0,0 +1,280 @@
+import asyncio
+import dataclasses
+import fcntl
+import os
+import time
+from typing import Any, AsyncIterator, Callable, Dict, IO, Iterator, List, Optional
+
+from sqlalchemy import select, update
+from sqlmodel import col
+
+from app.config import settings
+from app.models.eve import EveMessage
+from app.utilities.audio import AUDIO_ROOT, EVE_AUDIO_DIR, USER_AUDIO_DIR
+from app.utilities.db import async_session
+from app.utilities.logger import logger
+
+log = logger(__name__)
+
+LOCK_FILENAME = ".sweeper.lock"
+MB = 1024 * 1024
+DAY = 24 * 3600
+
+
+@dataclasses.dataclass
+class AudioFile:
+    path: str
+    size: int
+    mtime: float
+    user_id: Optional[str] = None
+
+
+@dataclasses.dataclass
+class SweepReport:
+    scanned: int = 0
+    orphans_deleted: int = 0
+    expired_deleted: int = 0
+    quota_evicted: int = 0
+    bytes_freed: int = 0
+    bytes_in_use: int = 0
+
+
+def _next_batch(entries: Iterator[os.DirEntry[str]], size: int) -> List[AudioFile]:
+    """Pull up to `size` regular files from a scandir iterator and stat them."""
+    batch: List[AudioFile] = []
+    for entry in entries:
+        if entry.name.startswith("."):
+            continue
+        try:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            st = entry.stat(follow_symlinks=False)
+        except FileNotFoundError:
+            # removed between listing and stat
+            continue
+        batch.append(AudioFile(path=entry.path, size=st.st_size, mtime=st.st_mtime))
+        if len(batch) >= size:
+            break
+    return batch
+
+
+def remove_files(paths: List[str]) -> int:
+    """Delete files, returning the number of bytes actually freed."""
+    freed = 0
+    for path in paths:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            freed += size
+        except FileNotFoundError:
+            continue
+        except OSError as exc:
+            log.warning("Could not remove audio file %s: %s", path, exc)
+    return freed
+
+
+class AudioRetentionService:
+    """
+    Reconciles the on-disk audio store against EveMessage.audio_path.
+
+    A sweep walks USER_AUDIO_DIR and EVE_AUDIO_DIR in bounded batches and:
+      - deletes orphans (files no message points at) once past a grace period,
+      - expires referenced files older than `max_age_days`,
+      - evicts the oldest referenced files until every user and the store as a
+        whole fit their quotas. Files younger than `hot_days` are never evicted.
+    Messages whose audio is expired or evicted keep their text; only
+    audio_path is cleared.
+    """
+
+    def __init__(
+        self,
+        db_session_factory: Callable[[], Any] = async_session,
+        *,
+        audio_dirs: Optional[List[str]] = None,
+        batch_size: int = settings.audio_sweep_batch_size,
+        batch_pause_seconds: float = settings.audio_sweep_batch_pause_seconds,
+        orphan_grace_seconds: int = settings.audio_orphan_grace_seconds,
+        hot_days: int = settings.audio_hot_days,
+        max_age_days: int = settings.audio_max_age_days,
+        user_quota_mb: int = settings.audio_user_quota_mb,
+        global_quota_mb: int = settings.audio_global_quota_mb,
+    ) -> None:
+        self.db_session_factory = db_session_factory
+        self.audio_dirs = audio_dirs or [USER_AUDIO_DIR, EVE_AUDIO_DIR]
+        self.batch_size = max(1, batch_size)
+        self.batch_pause_seconds = batch_pause_seconds
+        self.orphan_grace_seconds = orphan_grace_seconds
+        self.hot_seconds = hot_days * DAY
+        self.max_age_seconds = max_age_days * DAY
+        self.user_quota_bytes = user_quota_mb * MB
+        self.global_quota_bytes = global_quota_mb * MB
+
+    # ---------- public API ----------
+    async def sweep_once(self) -> Optional[SweepReport]:
+        """
+        Run one full sweep. Returns None if another process on this host
+        already holds the sweeper lock for the audio directory.
+        """
+        lock = self._acquire_lock()
+        if lock is None:
+            log.debug("Audio sweep skipped: lock held by another process")
+            return None
+        try:
+            return await self._sweep()
+        finally:
+            lock.close()
+
+    async def run_forever(
+        self, interval_seconds: int = settings.audio_sweep_interval_seconds
+    ) -> None:
+        """Sweep periodically until cancelled (started from the app lifespan)."""
+        while True:
+            try:
+                report = await self.sweep_once()
+                if report is not None:
+                    log.info(
+                        "Audio sweep: scanned=%s orphans=%s expired=%s evicted=%s freed=%s in_use=%s",
+                        report.scanned,
+                        report.orphans_deleted,
+                        report.expired_deleted,
+                        report.quota_evicted,
+                        report.bytes_freed,
+                        report.bytes_in_use,
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Audio sweep failed")
+            await asyncio.sleep(interval_seconds)
+
+    # ---------- sweep phases ----------
+    async def _sweep(self) -> SweepReport:
+        report = SweepReport()
+        now = time.time()
+        tracked: List[AudioFile] = []
+
+        async for batch in self._scan():
+            report.scanned += len(batch)
+            owners = await self._lookup_owners([f.path for f in batch])
+
+            orphans: List[str] = []
+            expired: List[str] = []
+            for f in batch:
+                age = now - f.mtime
+                if f.path not in owners:
+                    if age > self.orphan_grace_seconds:
+                        orphans.append(f.path)
+                elif self.max_age_seconds and age > self.max_age_seconds:
+                    expired.append(f.path)
+                else:
+                    f.user_id = owners[f.path]
+                    tracked.append(f)
+
+            if orphans:
+                report.bytes_freed += await asyncio.to_thread(remove_files, orphans)
+                report.orphans_deleted += len(orphans)
+            if expired:
+                report.bytes_freed += await self._detach_and_remove(expired)
+                report.expired_deleted += len(expired)
+
+        evictions = self._select_quota_evictions(tracked, now)
+        for start in range(0, len(evictions), self.batch_size):
+            chunk = evictions[start : start + self.batch_size]
+            report.bytes_freed += await self._detach_and_remove(chunk)
+            report.quota_evicted += len(chunk)
+            await asyncio.sleep(self.batch_pause_seconds)
+
+        evicted = set(evictions)
+        report.bytes_in_use = sum(f.size for f in tracked if f.path not in evicted)
+        return report
+
+    async def _scan(self) -> AsyncIterator[List[AudioFile]]:
+        """Yield files in batches, pausing between batches to spread out I/O."""
+        for directory in self.audio_dirs:
+            if not os.path.isdir(directory):
+                continue
+            with os.scandir(directory) as entries:
+                while True:
+                    batch = await asyncio.to_thread(
+                        _next_batch, entries, self.batch_size
+                    )
+                    if not batch:
+                        break
+                    yield batch
+                    await asyncio.sleep(self.batch_pause_seconds)
+
+    async def _lookup_owners(self, paths: List[str]) -> Dict[str, str]:
+        """Map each referenced path to the user that owns the message."""
+        async with self.db_session_factory() as session:
+            stmt = select(col(EveMessage.audio_path), col(EveMessage.user_id)).where(
+                col(EveMessage.audio_path).in_(paths)
+            )
+            res = await session.execute(stmt)
+            return {path: user_id for path, user_id in res.all()}
+
+    async def _detach_and_remove(self, paths: List[str]) -> int:
+        """
+        Clear audio_path on the owning messages, then delete the files.
+        DB first: if removal fails the file is merely an orphan for next sweep.
+        """
+        async with self.db_session_factory() as session:
+            await session.execute(
+                update(EveMessage)
+                .where(col(EveMessage.audio_path).in_(paths))
+                .values(audio_path=None)
+            )
+            await session.commit()
+        return await asyncio.to_thread(remove_files, paths)
+
+    def _select_quota_evictions(self, files: List[AudioFile], now: float) -> List[str]:
+        """Pick the oldest non-hot files to delete so all quotas are met."""
+        evict: List[str] = []
+        evicted = set()
+
+        if self.user_quota_bytes:
+            per_user: Dict[str, List[AudioFile]] = {}
+            for f in files:
+                per_user.setdefault(f.user_id or "", []).append(f)
+            for user_files in per_user.values():
+                total = sum(f.size for f in user_files)
+                for f in sorted(user_files, key=lambda x: x.mtime):
+                    if total <= self.user_quota_bytes:
+                        break
+                    if now - f.mtime < self.hot_seconds:
+                        break
+                    evict.append(f.path)
+                    evicted.add(f.path)
+                    total -= f.size
+
+        if self.global_quota_bytes:
+            remaining = [f for f in files if f.path not in evicted]
+            total = sum(f.size for f in remaining)
+            for f in sorted(remaining, key=lambda x: x.mtime):
+                if total <= self.global_quota_bytes:
+                    break
+                if now - f.mtime < self.hot_seconds:
+                    break
+                evict.append(f.path)
+                total -= f.size
+
+        return evict
+
+    # ---------- locking ----------
+    def _acquire_lock(self) -> Optional[IO[str]]:
+        """
+        Non-blocking flock on the audio root so only one worker per host
+        (gunicorn runs several) sweeps a given directory at a time.
+        """
+        os.makedirs(AUDIO_ROOT, exist_ok=True)
+        fh = open(os.path.join(AUDIO_ROOT, LOCK_FILENAME), "a")
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            fh.close()
+            return None
+        return fh
+
+
+if __name__ == "__main__":
+    # One-shot sweep, e.g. from a cron job: python -m app.services.audio_retention.audio_retention
+    print(asyncio.run(AudioRetentionService().sweep_once()))
@@ -1,8 +1,10 @@
 import os
 from typing import Optional
-from sqlalchemy import select
+from sqlalchemy import or_, select
+from sqlmodel import col
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
+from app.utilities.passwords import password_hasher
 
 
 # ----------------- async DB service functions -----------------
@@ -26,10 +28,11 @@ async def create_default_admin_if_missing(db: AsyncSession) -> User:
         username=os.environ.get("DEFAULT_ADMIN_USERNAME", "admin"),
         is_admin=True,
     )
-    admin.set_password(os.environ.get("DEFAULT_ADMIN_PASSWORD", "admin123"))
+    admin.hashed_password = await password_hasher.hash(
+        os.environ.get("DEFAULT_ADMIN_PASSWORD", "admin123")
+    )
     db.add(admin)
     await db.commit()
-    await db.refresh(admin)
     return admin
 
 
@@ -46,21 +49,22 @@ async def register_user(
     """
     Register a new user. Raises ValueError on duplicate email/username.
     """
-    res = await db.execute(select(User).filter_by(email=email))
-    existing = res.scalar_one_or_none()
-    if existing:
-        raise ValueError("Email already exists")
-
+    # both uniqueness checks in one query
+    taken = col(User.email) == email
     if username:
-        res2 = await db.execute(select(User).filter_by(username=username))
-        if res2.scalar_one_or_none():
-            raise ValueError("Username already exists")
+        taken = or_(taken, col(User.username) == username)
+    res = await db.execute(select(col(User.email), col(User.username)).where(taken))
+    clashes = res.all()
+    if any(row.email == email for row in clashes):
+        raise ValueError("Email already exists")
+    if clashes:
+        raise ValueError("Username already exists")
 
     user = User(name=name, email=email, username=username, age=age, gender=gender)
-    user.set_password(password)
+    user.hashed_password = await password_hasher.hash(password)
     db.add(user)
+    # id is generated client-side; created_at comes back from the INSERT
     await db.commit()
-    await db.refresh(user)
     return user
 
 
@@ -68,10 +72,18 @@ async def authenticate_user(
     db: AsyncSession, email: str, password: str
 ) -> Optional[User]:
     """
-    Return the User if authentication succeeds, else None.
+    Return the User if authentication succeeds, else None. A hash made with
+    outdated bcrypt parameters is replaced while the plaintext is at hand.
     """
     res = await db.execute(select(User).filter_by(email=email))
     user = res.scalar_one_or_none()
-    if user and user.verify_password(password):
-        return user
-    return None
+    if not user or user.deletion_requested_at is not None:
+        return None
+    ok, new_hash = await password_hasher.verify(password, user.hashed_password)
+    if not ok:
+        return None
+    if new_hash:
+        user.hashed_password = new_hash
+        db.add(user)
+        await db.commit()
+    return user
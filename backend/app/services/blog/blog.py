@@ -1,25 +1,52 @@
-from typing import Optional, List, Tuple
-from sqlalchemy import select, func, desc
+from typing import Iterable, Optional, List
+from sqlalchemy import select, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlmodel import col
 
+from app.config import settings
 from app.models.blog import Blog
-from app.models.user import User
+from app.utilities.principal import Principal
+from app.utilities.http_cache import ResponseCache
+from app.utilities.pagination import Page, cached_total, paginate
+from app.utilities.search import SearchHit, ranked_search, search_filter
+from app.utilities.tags import TagCount, normalize_tags, tag_counts
+
+# Rendered GET /api/blogs pages and GET /api/blogs/{id} bodies. Any write
+# drops every feed page (a post can sit on any of them) plus its own entry.
+blog_feed_cache = ResponseCache(
+    maxsize=settings.blog_cache_entries, ttl_seconds=settings.blog_cache_ttl_seconds
+)
+blog_post_cache = ResponseCache(
+    maxsize=settings.blog_cache_entries, ttl_seconds=settings.blog_cache_ttl_seconds
+)
+
+
+def _invalidate_blog(blog_id: str) -> None:
+    invalidate_blogs([blog_id])
+
+
+def invalidate_blogs(blog_ids: Iterable[str]) -> None:
+    """Drop every cached feed page and these posts' cached bodies."""
+    blog_feed_cache.clear()
+    for blog_id in blog_ids:
+        blog_post_cache.invalidate(blog_id)
 
 
 async def create_blog(
     db: AsyncSession,
     *,
-    user: User,
+    user: Principal,
     title: str,
     content: str,
     tags: Optional[List[str]] = None,
 ) -> Blog:
-    tags_str = ",".join([t.strip() for t in tags]) if tags else None
-    blog = Blog(user_id=user.id, title=title, content=content, tags=tags_str)
+    blog = Blog(
+        user_id=user.id, title=title, content=content, tags=normalize_tags(tags)
+    )
     db.add(blog)
     await db.commit()
-    await db.refresh(blog)
+    _invalidate_blog(blog.id)
     return blog
 
 
@@ -32,30 +59,55 @@ async def get_blog(db: AsyncSession, blog_id: str) -> Optional[Blog]:
 async def list_blogs(
     db: AsyncSession,
     *,
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 10,
     q: Optional[str] = None,
-) -> Tuple[List[Blog], int]:
-    stmt = select(Blog).options(selectinload(Blog.user)).order_by(desc(Blog.created_at))
+    tags: Optional[List[str]] = None,
+    include_total: bool = False,
+) -> Page[SearchHit[Blog]]:
+    stmt = select(Blog).options(selectinload(Blog.user))
+    tags = normalize_tags(tags)
+    if tags:
+        stmt = stmt.where(col(Blog.tags).contains(tags))
     if q:
-        pattern = f"%{q}%"
-        stmt = stmt.where(
-            (getattr(Blog.title, "ilike")(pattern))
-            | (getattr(Blog.content, "ilike")(pattern))
+        page = await ranked_search(
+            db,
+            stmt,
+            table="blogs",
+            id_col=Blog.id,
+            created_col=Blog.created_at,
+            snippet_col=Blog.content,
+            q=q,
+            cursor=cursor,
+            limit=limit,
         )
-    total_stmt = select(func.count()).select_from(stmt.subquery())
-    res = await db.execute(stmt.offset(skip).limit(limit))
-    items = res.scalars().all()
-    total_res = await db.execute(total_stmt)
-    total = total_res.scalar_one()
-    return items, int(total)
+        stmt = stmt.where(search_filter("blogs", q))
+    else:
+        plain = await paginate(
+            db,
+            stmt,
+            created_col=Blog.created_at,
+            id_col=Blog.id,
+            cursor=cursor,
+            limit=limit,
+        )
+        page = Page(
+            items=[SearchHit(b) for b in plain.items], next_cursor=plain.next_cursor
+        )
+    if include_total:
+        page.total = await cached_total(db, stmt, ("blogs", q, tuple(tags or ())))
+    return page
+
+
+async def blog_tag_counts(db: AsyncSession, *, limit: int = 50) -> List[TagCount]:
+    return await tag_counts(db, scope="blogs", limit=limit)
 
 
 async def update_blog(
     db: AsyncSession,
     *,
     blog_id: str,
-    user: User,
+    user: Principal,
     title: Optional[str] = None,
     content: Optional[str] = None,
     tags: Optional[List[str]] = None,
@@ -75,18 +127,18 @@ async def update_blog(
         blog.content = content
         updated = True
     if tags is not None:
-        blog.tags = ",".join([t.strip() for t in tags]) if tags else None
+        blog.tags = normalize_tags(tags)
         updated = True
 
     if updated:
         db.add(blog)
         await db.commit()
-        await db.refresh(blog)
+        _invalidate_blog(blog.id)
 
     return blog
 
 
-async def delete_blog(db: AsyncSession, *, blog_id: str, user: User) -> bool:
+async def delete_blog(db: AsyncSession, *, blog_id: str, user: Principal) -> bool:
     blog = await get_blog(db, blog_id)
     if not blog:
         return False
@@ -94,6 +146,7 @@ async def delete_blog(db: AsyncSession, *, blog_id: str, user: User) -> bool:
         raise PermissionError("Not allowed to delete this blog")
     await db.delete(blog)
     await db.commit()
+    _invalidate_blog(blog_id)
     return True
 
 
@@ -1,18 +1,24 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
 from typing import List, Optional, Protocol, Any, Callable
 
 from pydantic import BaseModel
 
 import google.generativeai as genai
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col
 from dotenv import load_dotenv
 import os
 import sys
 from app.utilities.logger import logger
+from app.utilities.background import spawn
+from app.utilities.crisis import crisis_detector
 from app.utilities.db import async_session
+from app.utilities.partitions import month_floor
 from app.models.chat import ChatSession, Message, Role
-from app.static_values import SYSTEM_PROMPT
+from app.static_values import EVE_PHRASES, PHRASE_HELPLINE, SYSTEM_PROMPT
 
 from app.config import settings
 
@@ -31,6 +37,12 @@ class ChatMessage(BaseModel):
     content: str
 
 
+class ChatTurn(BaseModel):
+    reply: str
+    # True when the reply is the helpline fast path; the full reply follows
+    crisis: bool = False
+
+
 class ChatProvider(Protocol):
     async def generate_response(
         self, prompt: str, history: List[ChatMessage]
@@ -95,8 +107,8 @@ class ChatService:
         async with self.db_session_factory() as session:
             cs = ChatSession(user_id=user_id, title=title)
             session.add(cs)
+            # the generated id comes back from the INSERT (RETURNING)
             await session.commit()
-            await session.refresh(cs)
             return cs
 
     async def get_session(self, session_id: int) -> Optional[ChatSession]:
@@ -115,29 +127,97 @@ class ChatService:
             msg = Message(session_id=session_id, role=role, content=content)
             session.add(msg)
             await session.commit()
-            await session.refresh(msg)
             return msg
 
     async def get_history(
         self, session_id: int, limit: Optional[int] = None
     ) -> List[ChatMessage]:
         async with self.db_session_factory() as session:
-            q = (
-                select(Message)
-                .where(Message.session_id == session_id)
-                .order_by(Message.created_at)
+            return await self._history(session, session_id, limit)
+
+    @staticmethod
+    async def _history(
+        session: AsyncSession, session_id: int, limit: Optional[int] = None
+    ) -> List[ChatMessage]:
+        started = (
+            select(col(ChatSession.created_at))
+            .where(col(ChatSession.id) == session_id)
+            .scalar_subquery()
+        )
+        q = (
+            select(Message)
+            .where(
+                Message.session_id == session_id,
+                # skips the months before the session (see utilities/partitions)
+                col(Message.created_at) >= month_floor(started),
+            )
+            .order_by(Message.created_at)
+        )
+        if limit:
+            q = q.limit(limit)
+        result = await session.execute(q)
+        msgs = result.scalars().all()
+        return [ChatMessage(role=m.role, content=m.content) for m in msgs]
+
+    @staticmethod
+    async def _flag_crisis(session: AsyncSession, session_id: int) -> None:
+        await session.execute(
+            update(ChatSession)
+            .where(
+                col(ChatSession.id) == session_id,
+                col(ChatSession.crisis_flagged_at).is_(None),
+            )
+            .values(crisis_flagged_at=datetime.now(timezone.utc))
+        )
+
+    async def _record_user_turn(
+        self, session_id: int, user_text: str, helpline: Optional[str]
+    ) -> List[ChatMessage]:
+        """
+        Store the user's message and read the history back (it includes
+        that message), plus the crisis flag and helpline reply when given,
+        all in one transaction.
+        """
+        async with self.db_session_factory() as session:
+            session.add(
+                Message(session_id=session_id, role=Role.user, content=user_text)
             )
-            if limit:
-                q = q.limit(limit)
-            result = await session.execute(q)
-            msgs = result.scalars().all()
-            return [ChatMessage(role=m.role, content=m.content) for m in msgs]
+            history = await self._history(session, session_id)
+            if helpline is not None:
+                await self._flag_crisis(session, session_id)
+                session.add(
+                    Message(
+                        session_id=session_id, role=Role.assistant, content=helpline
+                    )
+                )
+            await session.commit()
+        return history
+
+    async def send_user_message(self, session_id: int, user_text: str) -> ChatTurn:
+        crisis = crisis_detector.match(user_text)
+        helpline = EVE_PHRASES[PHRASE_HELPLINE] if crisis else None
+        history = await self._record_user_turn(session_id, user_text, helpline)
+
+        if helpline is not None:
+            # Answer with the helpline right away; the model's reply is
+            # generated in the background and appended to the session.
+            spawn(
+                self._reply(session_id, user_text, history),
+                name=f"chat-follow-up-{session_id}",
+            )
+            return ChatTurn(reply=helpline, crisis=True)
+
+        return ChatTurn(reply=await self._reply(session_id, user_text, history))
 
     async def send_user_message_and_get_reply(
         self, session_id: int, user_text: str
     ) -> str:
-        await self.add_message(session_id=session_id, role=Role.user, content=user_text)
-        history = await self.get_history(session_id=session_id)
+        turn = await self.send_user_message(session_id=session_id, user_text=user_text)
+        return turn.reply
+
+    async def _reply(
+        self, session_id: int, user_text: str, history: List[ChatMessage]
+    ) -> str:
         response_text = await self.provider.generate_response(user_text, history)
         await self.add_message(
             session_id=session_id, role=Role.assistant, content=response_text
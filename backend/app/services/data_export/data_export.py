@@ -0,0 +1,245 @@
+import asyncio
+import io
+import json
+import os
+import zipfile
+from datetime import datetime, timezone
+from typing import IO, Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import Select, select
+from sqlmodel import SQLModel, col
+
+from app.models.blog import Blog
+from app.models.chat import ChatSession, Message
+from app.models.eve import EveMessage, EveSession
+from app.models.journal import Journal
+from app.models.user import User
+from app.models.voice_session_response import VoiceSessionResponseData
+from app.utilities.audio import EVE_AUDIO_DIR, USER_AUDIO_DIR
+from app.utilities.db import async_session
+from app.utilities.logger import logger
+
+log = logger(__name__)
+
+# rows fetched per server-side cursor round trip, and compressed together
+BATCH_ROWS = 500
+# audio is copied into the archive this much at a time
+CHUNK_BYTES = 256 * 1024
+
+
+class _Sink(io.RawIOBase):
+    """
+    Where the zip is written: holds what the archive wrote since the last
+    take(). Not seekable, so zipfile puts each entry's sizes and CRC after
+    its data instead of seeking back to the header.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _audio_entry(path: Optional[str]) -> Optional[str]:
+    """
+    Archive name for a message's own audio: recordings and Eve's replies.
+    The pre-rendered phrases are shared by every user and not exported.
+    """
+    if not path:
+        return None
+    directory = os.path.dirname(os.path.abspath(path))
+    if directory not in (USER_AUDIO_DIR, EVE_AUDIO_DIR):
+        return None
+    return f"audio/{os.path.basename(directory)}/{os.path.basename(path)}"
+
+
+def _dump(row: SQLModel) -> Dict[str, Any]:
+    # columns come back as stored (EveMessage.role as a plain str), which
+    # pydantic would warn about on every row
+    return row.model_dump(mode="json", warnings=False)
+
+
+def _eve_message(message: EveMessage) -> Dict[str, Any]:
+    record = _dump(message)
+    record["audio_file"] = _audio_entry(message.audio_path)
+    return record
+
+
+def _write_lines(entry: IO[bytes], records: List[Dict[str, Any]]) -> None:
+    entry.write(
+        "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode()
+    )
+
+
+def _info(
+    name: str, when: datetime, compress_type: int = zipfile.ZIP_DEFLATED
+) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(name, when.timetuple()[:6])
+    info.compress_type = compress_type
+    info.external_attr = 0o644 << 16
+    return info
+
+
+def _copy_chunk(src: IO[bytes], entry: IO[bytes]) -> int:
+    chunk = src.read(CHUNK_BYTES)
+    entry.write(chunk)
+    return len(chunk)
+
+
+class DataExport:
+    """
+    One user's data as a zip, produced while it is sent: profile.json, an
+    NDJSON file per table (one JSON object per row) and the audio of their
+    Eve messages under audio/. Rows come through server-side cursors
+    BATCH_ROWS at a time and audio in CHUNK_BYTES reads, and each piece is
+    handed to the response before the next is read, so memory stays flat
+    however large the account. Eve messages name their file in
+    `audio_file`; files already removed by audio retention are left out.
+
+    The stream holds one database connection until it is done.
+    """
+
+    def __init__(
+        self, user_id: str, db_session_factory: Callable[[], Any] = async_session
+    ) -> None:
+        self.user_id = user_id
+        self.db_session_factory = db_session_factory
+
+    def _tables(
+        self,
+    ) -> List[Tuple[str, "Select[Any]", Callable[[Any], Dict[str, Any]]]]:
+        """(archive name, rows oldest first, row -> record)"""
+        uid = self.user_id
+        return [
+            (
+                "journals.ndjson",
+                select(Journal)
+                .where(col(Journal.user_id) == uid)
+                .order_by(col(Journal.created_at)),
+                _dump,
+            ),
+            (
+                "blogs.ndjson",
+                select(Blog)
+                .where(col(Blog.user_id) == uid)
+                .order_by(col(Blog.created_at)),
+                _dump,
+            ),
+            (
+                "chat_sessions.ndjson",
+                select(ChatSession)
+                .where(col(ChatSession.user_id) == uid)
+                .order_by(col(ChatSession.created_at)),
+                _dump,
+            ),
+            (
+                "chat_messages.ndjson",
+                select(Message)
+                .join(ChatSession, col(ChatSession.id) == col(Message.session_id))
+                .where(col(ChatSession.user_id) == uid)
+                .order_by(col(Message.session_id), col(Message.created_at)),
+                _dump,
+            ),
+            (
+                "eve_sessions.ndjson",
+                select(EveSession)
+                .where(col(EveSession.user_id) == uid)
+                .order_by(col(EveSession.created_at)),
+                _dump,
+            ),
+            (
+                "eve_messages.ndjson",
+                select(EveMessage)
+                .where(col(EveMessage.user_id) == uid)
+                .order_by(col(EveMessage.created_at)),
+                _eve_message,
+            ),
+            (
+                "voice_session_responses.ndjson",
+                select(VoiceSessionResponseData)
+                .where(col(VoiceSessionResponseData.user_id) == uid)
+                .order_by(col(VoiceSessionResponseData.created_at)),
+                _dump,
+            ),
+        ]
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        async for data in self._produce():
+            if data:
+                yield data
+
+    async def _produce(self) -> AsyncIterator[bytes]:
+        sink = _Sink()
+        archive = zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED)
+        async with self.db_session_factory() as db:
+            user = await db.get(User, self.user_id)
+            if user is None:
+                return
+            now = datetime.now(timezone.utc)
+            archive.writestr(
+                _info("profile.json", now), json.dumps(user.to_dict(), indent=2)
+            )
+            yield sink.take()
+
+            for name, stmt, record in self._tables():
+                entry = archive.open(_info(name, now), "w", force_zip64=True)
+                result = await db.stream_scalars(
+                    stmt.execution_options(yield_per=BATCH_ROWS)
+                )
+                async for rows in result.partitions():
+                    records = [record(row) for row in rows]
+                    await asyncio.to_thread(_write_lines, entry, records)
+                    yield sink.take()
+                await asyncio.to_thread(entry.close)
+                yield sink.take()
+
+            paths = await db.stream_scalars(
+                select(col(EveMessage.audio_path))
+                .where(
+                    col(EveMessage.user_id) == self.user_id,
+                    col(EveMessage.audio_path).is_not(None),
+                )
+                .order_by(col(EveMessage.created_at))
+                .execution_options(yield_per=BATCH_ROWS)
+            )
+            async for path in paths:
+                async for data in self._audio(archive, sink, path):
+                    yield data
+
+        await asyncio.to_thread(archive.close)
+        yield sink.take()
+        log.info("Exported the data of user %s", self.user_id)
+
+    async def _audio(
+        self, archive: zipfile.ZipFile, sink: _Sink, path: str
+    ) -> AsyncIterator[bytes]:
+        name = _audio_entry(path)
+        if name is None:
+            return
+        try:
+            src = await asyncio.to_thread(open, path, "rb")
+        except FileNotFoundError:
+            return
+        with src:
+            st = os.fstat(src.fileno())
+            # audio barely compresses; not worth the CPU
+            info = _info(
+                name,
+                datetime.fromtimestamp(st.st_mtime, timezone.utc),
+                zipfile.ZIP_STORED,
+            )
+            info.file_size = st.st_size
+            with archive.open(info, "w") as entry:
+                while await asyncio.to_thread(_copy_chunk, src, entry):
+                    yield sink.take()
+        yield sink.take()
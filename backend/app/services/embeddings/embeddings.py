@@ -0,0 +1,478 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Protocol, Sequence, Tuple, Union
+
+import numpy as np
+from google import genai
+from google.genai import types
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.config import settings
+from app.models.journal import Journal
+from app.utilities.background import spawn
+from app.utilities.db import async_engine, async_session
+from app.utilities.logger import logger
+
+log = logger(__name__)
+
+TABLE = "journal_embeddings"
+# Enough for a long entry; embedding models truncate beyond this anyway
+MAX_EMBED_CHARS = 8000
+
+Match = Tuple[str, float]  # (journal_id, cosine similarity)
+
+
+def _unit(vector: Union[Sequence[float], np.ndarray]) -> np.ndarray:
+    arr = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(arr))
+    return arr / norm if norm else arr
+
+
+def journal_text(journal: Journal) -> str:
+    return f"{journal.title}\n\n{journal.content or ''}"[:MAX_EMBED_CHARS]
+
+
+# ---------- Embedders ----------
+class Embedder(Protocol):
+    name: str
+    dimensions: int
+
+    async def embed(self, texts: List[str]) -> List[np.ndarray]: ...
+
+
+class GeminiEmbedder:
+    def __init__(
+        self,
+        model: str = settings.embedding_model,
+        dimensions: int = settings.embedding_dimensions,
+    ) -> None:
+        self.name = model
+        self.dimensions = dimensions
+        self.client = genai.Client(api_key=settings.gemini_api_key)
+
+    async def embed(self, texts: List[str]) -> List[np.ndarray]:
+        response = await asyncio.to_thread(
+            self.client.models.embed_content,
+            model=self.name,
+            contents=texts,
+            config=types.EmbedContentConfig(
+                task_type="SEMANTIC_SIMILARITY",
+                output_dimensionality=self.dimensions,
+            ),
+        )
+        # truncated (non-default) dimensionalities are not unit length
+        return [_unit(e.values or []) for e in response.embeddings or []]
+
+
+class HashingEmbedder:
+    """
+    Deterministic, offline stand-in for tests and local development: signed
+    feature hashing of words and word pairs. Shared vocabulary scores as
+    similar; meaning does not.
+    """
+
+    def __init__(self, dimensions: int = settings.embedding_dimensions) -> None:
+        self.name = f"hashing-{dimensions}"
+        self.dimensions = dimensions
+
+    async def embed(self, texts: List[str]) -> List[np.ndarray]:
+        return [self._embed_one(t) for t in texts]
+
+    def _embed_one(self, text: str) -> np.ndarray:
+        words = re.findall(r"\w+", text.casefold())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        vec = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimensions
+            vec[index] += 1.0 if digest[4] & 1 else -1.0
+        return _unit(vec)
+
+
+def make_embedder() -> Embedder:
+    if settings.embedding_provider == "hashing":
+        return HashingEmbedder()
+    return GeminiEmbedder()
+
+
+# ---------- Vector stores ----------
+class VectorStore(Protocol):
+    backend: str
+
+    async def upsert(
+        self,
+        db: AsyncSession,
+        journal_id: str,
+        user_id: str,
+        model: str,
+        vector: np.ndarray,
+    ) -> None: ...
+
+    async def get(
+        self, db: AsyncSession, journal_id: str, user_id: str, model: str
+    ) -> Optional[np.ndarray]: ...
+
+    async def nearest(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        model: str,
+        vector: np.ndarray,
+        k: int,
+        exclude_id: Optional[str] = None,
+    ) -> List[Match]: ...
+
+
+_UPSERT = f"""
+    INSERT INTO {TABLE} (journal_id, user_id, model, embedding, updated_at)
+    VALUES (:journal_id, :user_id, :model, {{value}}, now())
+    ON CONFLICT (journal_id) DO UPDATE
+    SET user_id = EXCLUDED.user_id, model = EXCLUDED.model,
+        embedding = EXCLUDED.embedding, updated_at = now()
+"""
+
+
+class PgVectorStore:
+    """pgvector column with an HNSW (cosine) index; Postgres does the top-k."""
+
+    backend = "pgvector"
+
+    @staticmethod
+    def _literal(vector: np.ndarray) -> str:
+        return "[" + ",".join(f"{x:.7g}" for x in vector.tolist()) + "]"
+
+    async def upsert(
+        self,
+        db: AsyncSession,
+        journal_id: str,
+        user_id: str,
+        model: str,
+        vector: np.ndarray,
+    ) -> None:
+        await db.execute(
+            text(_UPSERT.format(value="CAST(:embedding AS vector)")),
+            {
+                "journal_id": journal_id,
+                "user_id": user_id,
+                "model": model,
+                "embedding": self._literal(vector),
+            },
+        )
+
+    async def get(
+        self, db: AsyncSession, journal_id: str, user_id: str, model: str
+    ) -> Optional[np.ndarray]:
+        raw = (
+            await db.execute(
+                text(
+                    f"SELECT embedding::text FROM {TABLE} "
+                    "WHERE journal_id = :journal_id AND user_id = :user_id "
+                    "AND model = :model"
+                ),
+                {"journal_id": journal_id, "user_id": user_id, "model": model},
+            )
+        ).scalar_one_or_none()
+        return np.asarray(json.loads(raw), dtype=np.float32) if raw else None
+
+    async def nearest(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        model: str,
+        vector: np.ndarray,
+        k: int,
+        exclude_id: Optional[str] = None,
+    ) -> List[Match]:
+        # For a single user's entries the planner usually prefers the
+        # (user_id, model) index plus an exact sort over a filtered HNSW walk.
+        rows = await db.execute(
+            text(f"""
+                SELECT journal_id::text, 1 - (embedding <=> CAST(:embedding AS vector))
+                FROM {TABLE}
+                WHERE user_id = :user_id AND model = :model
+                  AND journal_id IS DISTINCT FROM :exclude_id
+                ORDER BY embedding <=> CAST(:embedding AS vector)
+                LIMIT :k
+                """),
+            {
+                "embedding": self._literal(vector),
+                "user_id": user_id,
+                "model": model,
+                "exclude_id": exclude_id,
+                "k": k,
+            },
+        )
+        return [(journal_id, float(score)) for journal_id, score in rows.all()]
+
+
+class NumpyVectorStore:
+    """
+    Fallback for databases without pgvector: vectors are stored as real[]
+    and each user's entries are scored in-process as one matrix product.
+    Matrices are cached per user and reloaded when the user's row count or
+    last update changes, so other workers' writes are picked up.
+    """
+
+    backend = "numpy"
+
+    def __init__(self, max_users: int = settings.embedding_cache_users) -> None:
+        self.max_users = max_users
+        # user_id -> (version, journal ids, unit vectors as rows)
+        self._cache: "OrderedDict[str, Tuple[Any, List[str], np.ndarray]]" = (
+            OrderedDict()
+        )
+
+    async def upsert(
+        self,
+        db: AsyncSession,
+        journal_id: str,
+        user_id: str,
+        model: str,
+        vector: np.ndarray,
+    ) -> None:
+        await db.execute(
+            text(_UPSERT.format(value=":embedding")),
+            {
+                "journal_id": journal_id,
+                "user_id": user_id,
+                "model": model,
+                "embedding": vector.tolist(),
+            },
+        )
+        self._cache.pop(user_id, None)
+
+    async def get(
+        self, db: AsyncSession, journal_id: str, user_id: str, model: str
+    ) -> Optional[np.ndarray]:
+        raw = (
+            await db.execute(
+                text(
+                    f"SELECT embedding FROM {TABLE} "
+                    "WHERE journal_id = :journal_id AND user_id = :user_id "
+                    "AND model = :model"
+                ),
+                {"journal_id": journal_id, "user_id": user_id, "model": model},
+            )
+        ).scalar_one_or_none()
+        return np.asarray(raw, dtype=np.float32) if raw else None
+
+    async def _matrix(
+        self, db: AsyncSession, user_id: str, model: str
+    ) -> Tuple[List[str], np.ndarray]:
+        params = {"user_id": user_id, "model": model}
+        version = tuple(
+            (
+                await db.execute(
+                    text(
+                        f"SELECT count(*), max(updated_at) FROM {TABLE} "
+                        "WHERE user_id = :user_id AND model = :model"
+                    ),
+                    params,
+                )
+            ).one()
+        )
+        cached = self._cache.get(user_id)
+        if cached and cached[0] == (model, version):
+            self._cache.move_to_end(user_id)
+            return cached[1], cached[2]
+
+        rows = (
+            await db.execute(
+                text(
+                    f"SELECT journal_id::text, embedding FROM {TABLE} "
+                    "WHERE user_id = :user_id AND model = :model"
+                ),
+                params,
+            )
+        ).all()
+        ids = [r[0] for r in rows]
+        matrix = (
+            np.asarray([r[1] for r in rows], dtype=np.float32)
+            if rows
+            else np.zeros((0, 0), dtype=np.float32)
+        )
+        self._cache[user_id] = ((model, version), ids, matrix)
+        if len(self._cache) > self.max_users:
+            self._cache.popitem(last=False)
+        return ids, matrix
+
+    async def nearest(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        model: str,
+        vector: np.ndarray,
+        k: int,
+        exclude_id: Optional[str] = None,
+    ) -> List[Match]:
+        ids, matrix = await self._matrix(db, user_id, model)
+        if not ids:
+            return []
+        scores = matrix @ vector
+        # one extra in case the excluded entry is among the best
+        take = min(k + 1, len(ids))
+        top = np.argpartition(-scores, take - 1)[:take]
+        ranked = sorted(top.tolist(), key=lambda i: -scores[i])
+        return [(ids[i], float(scores[i])) for i in ranked if ids[i] != exclude_id][:k]
+
+
+async def embedding_column_type(conn: AsyncConnection) -> Optional[str]:
+    return (
+        await conn.execute(
+            text(
+                "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+                "WHERE attrelid = to_regclass(:table) AND attname = 'embedding'"
+            ),
+            {"table": TABLE},
+        )
+    ).scalar()
+
+
+def store_for_column(column_type: Optional[str]) -> VectorStore:
+    if column_type is None:
+        raise RuntimeError(f"{TABLE} does not exist; run the migrations")
+    store: VectorStore = (
+        PgVectorStore() if column_type.startswith("vector") else NumpyVectorStore()
+    )
+    if settings.embedding_store not in ("auto", store.backend):
+        log.warning(
+            "EMBEDDING_STORE=%s ignored: %s was created for %s",
+            settings.embedding_store,
+            TABLE,
+            store.backend,
+        )
+    return store
+
+
+# ---------- Pipeline ----------
+class JournalEmbeddings:
+    """
+    Keeps one embedding per journal and answers per-user top-k queries.
+
+    Indexing runs in the background after a journal is created or updated,
+    so writes never wait on the embedding API. The store matches the
+    column type the migration created (see migrations/m0002).
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        store: Optional[VectorStore] = None,
+        db_session_factory: Callable[[], Any] = async_session,
+    ) -> None:
+        self._embedder = embedder
+        self._store = store
+        self.db_session_factory = db_session_factory
+        self._init_lock = asyncio.Lock()
+
+    @property
+    def embedder(self) -> Embedder:
+        if self._embedder is None:
+            self._embedder = make_embedder()
+        return self._embedder
+
+    async def init(self) -> VectorStore:
+        if self._store is not None:
+            return self._store
+        async with self._init_lock:
+            if self._store is None:
+                async with async_engine.connect() as conn:
+                    self._store = store_for_column(await embedding_column_type(conn))
+                log.info("Journal embeddings stored with %s", self._store.backend)
+        return self._store
+
+    def schedule(self, journal_id: str) -> None:
+        """Re-embed a journal after the current request finishes."""
+        spawn(self.index_journal(journal_id), name=f"embed-journal-{journal_id}")
+
+    async def index_journal(self, journal_id: str) -> bool:
+        store = await self.init()
+        async with self.db_session_factory() as db:
+            journal = await db.get(Journal, journal_id)
+            if journal is None:
+                return False
+            [vector] = await self.embedder.embed([journal_text(journal)])
+            await store.upsert(
+                db, journal.id, journal.user_id, self.embedder.name, vector
+            )
+            await db.commit()
+        return True
+
+    async def similar_to_text(
+        self, db: AsyncSession, user_id: str, query: str, k: int = 5
+    ) -> List[Match]:
+        store = await self.init()
+        [vector] = await self.embedder.embed([query[:MAX_EMBED_CHARS]])
+        return await store.nearest(db, user_id, self.embedder.name, vector, k)
+
+    async def similar_to_journal(
+        self, db: AsyncSession, user_id: str, journal_id: str, k: int = 5
+    ) -> List[Match]:
+        """
+        Entries like `journal_id`; [] until that journal has been indexed, and
+        for a journal `user_id` does not own.
+        """
+        store = await self.init()
+        vector = await store.get(db, journal_id, user_id, self.embedder.name)
+        if vector is None:
+            return []
+        return await store.nearest(
+            db, user_id, self.embedder.name, vector, k, exclude_id=journal_id
+        )
+
+    async def backfill(self, batch_size: int = 64) -> int:
+        """Embed every journal that has no vector for the current model."""
+        store = await self.init()
+        done = 0
+        while True:
+            async with self.db_session_factory() as db:
+                journals = (
+                    (
+                        await db.execute(
+                            select(Journal)
+                            .where(
+                                text(
+                                    f"NOT EXISTS (SELECT 1 FROM {TABLE} e "
+                                    "WHERE e.journal_id = journals.id "
+                                    "AND e.model = :model)"
+                                ).bindparams(model=self.embedder.name)
+                            )
+                            .limit(batch_size)
+                        )
+                    )
+                    .scalars()
+                    .all()
+                )
+                if not journals:
+                    return done
+                vectors = await self.embedder.embed([journal_text(j) for j in journals])
+                if len(vectors) != len(journals):
+                    # the missing ones would be selected again, forever
+                    raise RuntimeError(
+                        f"{self.embedder.name} returned {len(vectors)} embeddings "
+                        f"for {len(journals)} journals"
+                    )
+                for journal, vector in zip(journals, vectors):
+                    await store.upsert(
+                        db, journal.id, journal.user_id, self.embedder.name, vector
+                    )
+                await db.commit()
+                done += len(journals)
+                log.info("Embedded %d journals", done)
+
+
+journal_embeddings = JournalEmbeddings()
+
+
+if __name__ == "__main__":
+    # python -m app.services.embeddings.embeddings --backfill
+    parser = argparse.ArgumentParser(description="Journal embedding maintenance.")
+    parser.add_argument("--backfill", action="store_true")
+    args = parser.parse_args()
+    if args.backfill:
+        print(f"embedded {asyncio.run(journal_embeddings.backfill())} journals")
@@ -1,20 +1,42 @@
-from typing import Optional, List
-from sqlalchemy import select, desc, asc
+from typing import Optional, List, Dict, Any, Callable, Tuple
+from sqlalchemy import Select, asc, delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from datetime import datetime
+from sqlmodel import col
+from datetime import datetime, timezone
 import asyncio
+import dataclasses
+import functools
 import os
 import uuid
 import mimetypes
 from app.models.eve import EveMessage, EveSession, EveRole
 from app.models.journal import Journal
-from app.models.user import User
+from app.utilities.principal import Principal
 from app.utilities.tts import TTSResult, GeminiTTSAdapter
 from app.utilities.stt import SpeechToText
+from app.utilities.audio import (
+    USER_AUDIO_DIR,
+    EVE_AUDIO_DIR,
+    AudioInfo,
+    probe_audio_bytes,
+)
+from app.services.embeddings.embeddings import journal_embeddings
 from app.services.llm.gemini import GeminiService
+from app.services.phrase_library.phrase_library import (
+    PhraseAudio,
+    phrase_library,
+)
+from app.static_values import PHRASE_GREETING, PHRASE_HELPLINE, PHRASE_NOT_HEARD
+from app.utilities.background import spawn
+from app.utilities.crisis import crisis_detector
+from app.utilities.db import async_session
+from app.utilities.logger import logger
+from app.utilities.pagination import Page, paginate
+from app.utilities.partitions import month_floor
 from app.config import settings
 from app.routes.eve.schema.eve import (
+    AudioMetadata,
     JournalEveResponse,
     VoiceSessionStartResponse,
     VoiceSessionTurnResponse,
@@ -27,58 +49,86 @@ from app.routes.eve.schema.eve import (
     EveMessageResponse,
 )
 
+log = logger(__name__)
 
-USER_AUDIO_DIR = os.path.abspath(
-    os.path.join(os.path.dirname(__file__), "../../../../audio/user")
-)
 
-EVE_AUDIO_DIR = os.path.abspath(
-    os.path.join(os.path.dirname(__file__), "../../../../audio/eve")
-)
+def _messages_since(since: Any, *criteria: Any) -> "Select[Tuple[EveMessage]]":
+    """
+    EveMessages matching `criteria`, oldest first. `since` is when their
+    journal or session was created (a value or a scalar subquery): none
+    is older, and the bound lets Postgres skip the monthly partitions
+    before it (see utilities/partitions).
+    """
+    return (
+        select(EveMessage)
+        .where(*criteria, col(EveMessage.created_at) >= month_floor(since))
+        .order_by(asc(col(EveMessage.created_at)))
+    )
 
 
 class EveService:
     """Unified service for handling Eve interactions."""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self, db: AsyncSession, db_session_factory: Callable[[], Any] = async_session
+    ):
         self.db = db
+        # background follow-ups outlive the request-scoped session
+        self.db_session_factory = db_session_factory
         self.llm = GeminiService(settings.gemini_api_key)
         self.tts = GeminiTTSAdapter(model=settings.tts_model)
         self.stt = SpeechToText()
+        self.phrases = phrase_library
 
     # ---------- Journal → Eve (one-shot voice reply) ----------
     async def journal_reply(
-        self, journal_id: str, user: User
+        self, journal_id: str, user: Principal
     ) -> Optional[JournalEveResponse]:
-        stmt = (
-            select(Journal)
-            .options(selectinload(Journal.eve_messages))
-            .where(Journal.id == journal_id, Journal.user_id == user.id)
+        stmt = select(Journal).where(
+            Journal.id == journal_id, Journal.user_id == user.id
         )
         result = await self.db.execute(stmt)
         journal = result.scalar_one_or_none()
         if not journal:
             return None
+        found = await self.db.execute(
+            _messages_since(
+                journal.created_at, col(EveMessage.journal_id) == journal.id
+            )
+        )
+        previous = list(found.scalars().all())
 
-        context = self._build_journal_context(journal)
-
-        reply_text = await asyncio.to_thread(self.llm.generate_reply, context)
+        related = await self._related_journals(journal)
+        context = self._build_journal_context(journal, previous, related)
+        crisis = crisis_detector.match(f"{journal.title}\n{journal.content}")
+        # end the read transaction so no pooled connection idles through
+        # the LLM and TTS calls; both rows are written together below
+        await self.db.commit()
 
         # create session (set system_prompt to journal title/content)
         system_prompt = (
             f"Journal Title: {journal.title}\nJournal Content: {journal.content}"
         )
         session = EveSession(
-            user_id=user.id, system_prompt=system_prompt, is_active=True
+            user_id=user.id,
+            system_prompt=system_prompt,
+            is_active=True,
+            crisis_flagged_at=datetime.now(timezone.utc) if crisis else None,
         )
-        self.db.add(session)
-        await self.db.commit()
-        await self.db.refresh(session)
 
-        # create/eve tts
-        tts_result: TTSResult = await self.tts.synthesize_to_local(
-            reply_text, EVE_AUDIO_DIR
-        )
+        reply_audio_path: Optional[str]
+        reply_audio_info: Optional[AudioInfo]
+        if crisis:
+            reply_text, reply_audio_path, reply_audio_info = self._helpline_reply()
+        else:
+            reply_text = await asyncio.to_thread(self.llm.generate_reply, context)
+
+            # create/eve tts
+            tts_result: TTSResult = await self.tts.synthesize_to_local(
+                reply_text, EVE_AUDIO_DIR
+            )
+            reply_audio_path = tts_result.tts_meta.get("local_path")
+            reply_audio_info = tts_result.audio_info
 
         eve_msg = EveMessage(
             user_id=user.id,
@@ -86,24 +136,58 @@ class EveService:
             session_id=session.id,
             role=EveRole.EVE,
             text=reply_text,
-            audio_path=tts_result.tts_meta.get("local_path"),
+            audio_path=reply_audio_path,
+            **self._audio_columns(reply_audio_info),
         )
-        self.db.add(eve_msg)
+        # one transaction; created_at comes back from the INSERTs (RETURNING)
+        self.db.add_all([session, eve_msg])
         await self.db.commit()
-        await self.db.refresh(eve_msg)
+
+        if crisis:
+            self._schedule_follow_up(
+                user_id=user.id,
+                session_id=session.id,
+                journal_id=journal.id,
+                make_reply=functools.partial(self.llm.generate_reply, context),
+            )
 
         return JournalEveResponse(
             message_id=eve_msg.id,
             text=eve_msg.text,
             audio_path=eve_msg.audio_path,
+            audio=self._audio_metadata(eve_msg),
             created_at=eve_msg.created_at,
             session_id=session.id,
+            crisis=crisis is not None,
         )
 
-    def _build_journal_context(self, journal: Journal) -> str:
+    async def _related_journals(self, journal: Journal) -> List[Journal]:
+        """The user's past entries most similar to `journal`, best first."""
+        if settings.eve_related_journals <= 0:
+            return []
+        try:
+            matches = await journal_embeddings.similar_to_journal(
+                self.db, journal.user_id, journal.id, k=settings.eve_related_journals
+            )
+        except Exception as exc:
+            log.warning("Related journal lookup failed: %s", exc)
+            return []
+        if not matches:
+            return []
+        ids = [journal_id for journal_id, _ in matches]
+        result = await self.db.execute(select(Journal).where(col(Journal.id).in_(ids)))
+        by_id = {j.id: j for j in result.scalars().all()}
+        return [by_id[i] for i in ids if i in by_id]
+
+    def _build_journal_context(
+        self,
+        journal: Journal,
+        previous: List[EveMessage],
+        related: Optional[List[Journal]] = None,
+    ) -> str:
         """Build context for journal reply."""
         previous_messages = []
-        for msg in sorted(journal.eve_messages, key=lambda x: x.created_at):
+        for msg in previous:
             role_name = "User" if msg.role == EveRole.USER else "Eve"
             previous_messages.append(f"{role_name}: {msg.text}")
 
@@ -116,11 +200,44 @@ class EveService:
             context_parts.append("Previous conversation:")
             context_parts.extend(previous_messages)
 
+        if related:
+            context_parts.append("Related past journal entries:")
+            for past in related:
+                excerpt = " ".join((past.content or "").split())[:300]
+                context_parts.append(
+                    f"- {past.title} ({past.created_at:%Y-%m-%d}): {excerpt}"
+                )
+
         return "\n".join(context_parts)
 
+    @staticmethod
+    def _audio_columns(info: Optional[AudioInfo]) -> Dict[str, Any]:
+        """EveMessage column values for an audio file's metadata."""
+        if info is None:
+            return {}
+        return {
+            "audio_duration_seconds": info.duration_seconds,
+            "audio_sample_rate": info.sample_rate,
+            "audio_channels": info.channels,
+            "audio_codec": info.codec,
+            "audio_size_bytes": info.size_bytes,
+        }
+
+    @staticmethod
+    def _audio_metadata(msg: EveMessage) -> Optional[AudioMetadata]:
+        if msg.audio_codec is None and msg.audio_size_bytes is None:
+            return None
+        return AudioMetadata(
+            duration_seconds=msg.audio_duration_seconds,
+            sample_rate=msg.audio_sample_rate,
+            channels=msg.audio_channels,
+            codec=msg.audio_codec,
+            size_bytes=msg.audio_size_bytes,
+        )
+
     # ---------- Interactive voice session ----------
     async def start_voice_session(
-        self, system_prompt: str, user: User
+        self, system_prompt: str, user: Principal
     ) -> VoiceSessionStartResponse:
         """Start a new voice session."""
         session = EveSession(
@@ -130,20 +247,38 @@ class EveService:
         )
         self.db.add(session)
         await self.db.commit()
-        await self.db.refresh(session)
+
+        greeting = await self._phrase_or_none(PHRASE_GREETING)
 
         return VoiceSessionStartResponse(
             session_id=session.id,
             system_prompt=session.system_prompt,
             is_active=session.is_active,
             created_at=session.created_at,
+            greeting_text=self.phrases.text(PHRASE_GREETING),
+            greeting_audio_path=greeting.path if greeting else None,
+            greeting_audio=self._phrase_metadata(greeting),
         )
 
+    async def _phrase_or_none(self, key: str) -> Optional[PhraseAudio]:
+        """Fetch a pre-rendered phrase; a TTS outage must not fail the request."""
+        try:
+            return await self.phrases.get(key)
+        except Exception as exc:
+            log.warning("Phrase %s unavailable: %s", key, exc)
+            return None
+
+    @staticmethod
+    def _phrase_metadata(phrase: Optional[PhraseAudio]) -> Optional[AudioMetadata]:
+        if phrase is None:
+            return None
+        return AudioMetadata(**dataclasses.asdict(phrase.info))
+
     async def voice_turn(
         self,
         session_id: str,
         audio_bytes: bytes,
-        user: User,
+        user: Principal,
         original_filename: Optional[str] = None,
         content_type: Optional[str] = None,
     ) -> Optional[VoiceSessionTurnResponse]:
@@ -166,6 +301,9 @@ class EveService:
 
         if not session:
             return None
+        # release the connection during STT, LLM and TTS; the session row
+        # stays loaded (expire_on_commit=False) and is written with the turn
+        await self.db.commit()
 
         # ensure directories exist
         os.makedirs(USER_AUDIO_DIR, exist_ok=True)
@@ -185,6 +323,7 @@ class EveService:
         user_audio_path = os.path.join(USER_AUDIO_DIR, user_filename)
         with open(user_audio_path, "wb") as f:
             f.write(audio_bytes)
+        user_audio_info = probe_audio_bytes(audio_bytes, ext)
 
         # Convert speech to text (STT). Provide mime type if available (fallback to audio/wav)
         mime = content_type or "audio/wav"
@@ -192,15 +331,35 @@ class EveService:
             self.stt.transcribe_from_bytes, audio_bytes, mime
         )
 
-        # Get Eve's reply using session context
-        eve_reply = await asyncio.to_thread(
-            self.llm.chat_with_context, session, user_text
-        )
+        user_text = (user_text or "").strip()
+        crisis = crisis_detector.match(user_text)
+
+        eve_audio_path: Optional[str]
+        eve_audio_info: Optional[AudioInfo]
+        if not user_text:
+            # Nothing intelligible: answer with the pre-rendered fallback
+            # instead of spending an LLM and a TTS call on an empty turn
+            # (text only if its audio could not be rendered).
+            phrase = await self._phrase_or_none(PHRASE_NOT_HEARD)
+            eve_reply = self.phrases.text(PHRASE_NOT_HEARD)
+            eve_audio_path = phrase.path if phrase else None
+            eve_audio_info = phrase.info if phrase else None
+        elif crisis:
+            eve_reply, eve_audio_path, eve_audio_info = self._helpline_reply()
+            if session.crisis_flagged_at is None:
+                session.crisis_flagged_at = datetime.now(timezone.utc)
+        else:
+            # Get Eve's reply using session context
+            eve_reply = await asyncio.to_thread(
+                self.llm.chat_with_context, session, user_text
+            )
 
-        # Convert Eve's reply to speech (saved in EVE_AUDIO_DIR)
-        tts_result: TTSResult = await self.tts.synthesize_to_local(
-            eve_reply, EVE_AUDIO_DIR
-        )
+            # Convert Eve's reply to speech (saved in EVE_AUDIO_DIR)
+            tts_result: TTSResult = await self.tts.synthesize_to_local(
+                eve_reply, EVE_AUDIO_DIR
+            )
+            eve_audio_path = tts_result.tts_meta.get("local_path")
+            eve_audio_info = tts_result.audio_info
 
         # Store both user and eve messages (store local paths so you can serve or re-send them)
         user_msg = EveMessage(
@@ -209,19 +368,29 @@ class EveService:
             role=EveRole.USER,
             text=user_text,
             audio_path=user_audio_path,
+            **self._audio_columns(user_audio_info),
         )
         eve_msg = EveMessage(
             user_id=user.id,
             session_id=session.id,
             role=EveRole.EVE,
             text=eve_reply,
-            audio_path=tts_result.tts_meta.get("local_path"),
+            audio_path=eve_audio_path,
+            **self._audio_columns(eve_audio_info),
         )
 
         self.db.add_all([user_msg, eve_msg])
         await self.db.commit()
-        await self.db.refresh(user_msg)
-        await self.db.refresh(eve_msg)
+
+        if crisis:
+            # history was loaded before this turn's messages were added
+            self._schedule_follow_up(
+                user_id=user.id,
+                session_id=session.id,
+                make_reply=functools.partial(
+                    self.llm.chat_with_context, session, user_text
+                ),
+            )
 
         return VoiceSessionTurnResponse(
             user_message_id=user_msg.id,
@@ -230,21 +399,71 @@ class EveService:
             eve_text=eve_msg.text,
             audio_path=eve_msg.audio_path,
             user_audio_path=user_msg.audio_path,
+            audio=self._audio_metadata(eve_msg),
+            user_audio=self._audio_metadata(user_msg),
             created_at=eve_msg.created_at,
+            crisis=crisis is not None,
         )
 
+    # ---------- Crisis fast path ----------
+    def _helpline_reply(self) -> Tuple[str, Optional[str], Optional[AudioInfo]]:
+        """
+        Helpline text plus its pre-rendered audio when available. Never waits
+        on TTS; a missing render is queued so the next crisis turn has audio.
+        """
+        phrase = self.phrases.lookup(PHRASE_HELPLINE)
+        if phrase is None:
+            spawn(self.phrases.get(PHRASE_HELPLINE), name="render-helpline")
+            return self.phrases.text(PHRASE_HELPLINE), None, None
+        return phrase.text, phrase.path, phrase.info
+
+    def _schedule_follow_up(
+        self,
+        *,
+        user_id: str,
+        session_id: str,
+        make_reply: Callable[[], str],
+        journal_id: Optional[str] = None,
+    ) -> None:
+        """Queue the full LLM + TTS reply that follows a helpline answer."""
+        spawn(
+            self._follow_up(user_id, session_id, journal_id, make_reply),
+            name=f"eve-follow-up-{session_id}",
+        )
+
+    async def _follow_up(
+        self,
+        user_id: str,
+        session_id: str,
+        journal_id: Optional[str],
+        make_reply: Callable[[], str],
+    ) -> None:
+        reply_text = await asyncio.to_thread(make_reply)
+        tts_result: TTSResult = await self.tts.synthesize_to_local(
+            reply_text, EVE_AUDIO_DIR
+        )
+        async with self.db_session_factory() as db:
+            db.add(
+                EveMessage(
+                    user_id=user_id,
+                    journal_id=journal_id,
+                    session_id=session_id,
+                    role=EveRole.EVE,
+                    text=reply_text,
+                    audio_path=tts_result.tts_meta.get("local_path"),
+                    **self._audio_columns(tts_result.audio_info),
+                )
+            )
+            await db.commit()
+
     async def end_voice_session(
-        self, session_id: str, user: User, save_summary: bool = False
+        self, session_id: str, user: Principal, save_summary: bool = False
     ) -> Optional[VoiceSessionEndResponse]:
         """End a voice session and optionally save summary."""
-        stmt = (
-            select(EveSession)
-            .options(selectinload(EveSession.messages))
-            .where(
-                EveSession.id == session_id,
-                EveSession.user_id == user.id,
-                EveSession.is_active,
-            )
+        stmt = select(EveSession).where(
+            EveSession.id == session_id,
+            EveSession.user_id == user.id,
+            EveSession.is_active,
         )
         result = await self.db.execute(stmt)
         session = result.scalar_one_or_none()
@@ -256,8 +475,18 @@ class EveService:
         notes_journal_id = None
         notes_content = None
 
-        if save_summary and session.messages:
-            history = " ".join([m.text for m in session.messages])
+        messages: List[EveMessage] = []
+        if save_summary:
+            found = await self.db.execute(
+                _messages_since(
+                    session.created_at, col(EveMessage.session_id) == session.id
+                )
+            )
+            messages = list(found.scalars().all())
+        if messages:
+            # not holding a connection through the summary calls
+            await self.db.commit()
+            history = " ".join([m.text for m in messages])
             summary = await asyncio.to_thread(self.llm.summarize, history)
 
             # Using summarize with a specific prompt for refactoring notes
@@ -272,11 +501,9 @@ class EveService:
                 content=notes_content,
             )
             self.db.add(notes_journal)
-            await self.db.commit()
-            await self.db.refresh(notes_journal)
             notes_journal_id = notes_journal.id
 
-        # Mark session as ended
+        # Mark session as ended, in the same transaction as the notes
         session.is_active = False
         session.ended_at = datetime.utcnow()
 
@@ -291,30 +518,36 @@ class EveService:
         )
 
     # ---------- Journal CRUD (simplified for Eve context) ----------
-    async def list_journals(self, user: User) -> List[JournalResponse]:
-        """List user's journals."""
-        stmt = (
-            select(Journal)
-            .where(Journal.user_id == user.id)
-            .order_by(desc(Journal.created_at))
+    async def list_journals(
+        self, user: Principal, cursor: Optional[str] = None, limit: int = 50
+    ) -> Page[JournalResponse]:
+        """List user's journals, newest first."""
+        page = await paginate(
+            self.db,
+            select(Journal).where(col(Journal.user_id) == user.id),
+            created_col=Journal.created_at,
+            id_col=Journal.id,
+            cursor=cursor,
+            limit=limit,
         )
-        result = await self.db.execute(stmt)
-        journals = result.scalars().all()
 
-        return [
-            JournalResponse(
-                id=j.id,
-                user_id=j.user_id,
-                title=j.title,
-                content=j.content,
-                created_at=j.created_at,
-                updated_at=j.updated_at,
-            )
-            for j in journals
-        ]
+        return Page(
+            items=[
+                JournalResponse(
+                    id=j.id,
+                    user_id=j.user_id,
+                    title=j.title,
+                    content=j.content,
+                    created_at=j.created_at,
+                    updated_at=j.updated_at,
+                )
+                for j in page.items
+            ],
+            next_cursor=page.next_cursor,
+        )
 
     async def get_journal(
-        self, journal_id: str, user: User
+        self, journal_id: str, user: Principal
     ) -> Optional[JournalResponse]:
         """Get a specific journal."""
         stmt = select(Journal).where(
@@ -336,7 +569,7 @@ class EveService:
         )
 
     async def create_journal(
-        self, payload: JournalCreateRequest, user: User
+        self, payload: JournalCreateRequest, user: Principal
     ) -> JournalResponse:
         """Create a new journal."""
         journal = Journal(
@@ -346,7 +579,7 @@ class EveService:
         )
         self.db.add(journal)
         await self.db.commit()
-        await self.db.refresh(journal)
+        journal_embeddings.schedule(journal.id)
 
         return JournalResponse(
             id=journal.id,
@@ -358,25 +591,32 @@ class EveService:
         )
 
     async def update_journal(
-        self, journal_id: str, payload: JournalUpdateRequest, user: User
+        self, journal_id: str, payload: JournalUpdateRequest, user: Principal
     ) -> Optional[JournalResponse]:
         """Update a journal."""
-        stmt = select(Journal).where(
-            Journal.id == journal_id, Journal.user_id == user.id
-        )
-        result = await self.db.execute(stmt)
+        values: Dict[str, Any] = {}
+        if payload.title is not None:
+            values["title"] = payload.title
+        if payload.content is not None:
+            values["content"] = payload.content
+
+        owned = (col(Journal.id) == journal_id, col(Journal.user_id) == user.id)
+        if values:
+            # UPDATE ... RETURNING: the ownership check, the write and the
+            # new updated_at in one statement
+            result = await self.db.execute(
+                update(Journal).where(*owned).values(**values).returning(Journal)
+            )
+        else:
+            result = await self.db.execute(select(Journal).where(*owned))
         journal = result.scalar_one_or_none()
 
         if not journal:
             return None
 
-        if payload.title is not None:
-            journal.title = payload.title
-        if payload.content is not None:
-            journal.content = payload.content
-
         await self.db.commit()
-        await self.db.refresh(journal)
+        if values:
+            journal_embeddings.schedule(journal.id)
 
         return JournalResponse(
             id=journal.id,
@@ -387,7 +627,7 @@ class EveService:
             updated_at=journal.updated_at,
         )
 
-    async def delete_journal(self, journal_id: str, user: User) -> bool:
+    async def delete_journal(self, journal_id: str, user: Principal) -> bool:
         """Delete a journal."""
         stmt = select(Journal).where(
             Journal.id == journal_id, Journal.user_id == user.id
@@ -404,13 +644,50 @@ class EveService:
 
     # ---------- Eve Message CRUD ----------
     async def list_messages(
-        self, journal_id: str, user: User
+        self, journal_id: str, user: Principal
     ) -> List[EveMessageResponse]:
         """List messages for a journal."""
-        stmt = (
-            select(EveMessage)
-            .where(EveMessage.journal_id == journal_id, EveMessage.user_id == user.id)
-            .order_by(asc(EveMessage.created_at))
+        created = (
+            select(col(Journal.created_at))
+            .where(Journal.id == journal_id)
+            .scalar_subquery()
+        )
+        stmt = _messages_since(
+            created,
+            col(EveMessage.journal_id) == journal_id,
+            col(EveMessage.user_id) == user.id,
+        )
+        result = await self.db.execute(stmt)
+        messages = result.scalars().all()
+
+        return [
+            EveMessageResponse(
+                id=m.id,
+                user_id=m.user_id,
+                journal_id=m.journal_id,
+                session_id=m.session_id,
+                role=m.role,
+                text=m.text,
+                audio_path=m.audio_path,
+                audio=self._audio_metadata(m),
+                created_at=m.created_at,
+            )
+            for m in messages
+        ]
+
+    async def list_session_messages(
+        self, session_id: str, user: Principal
+    ) -> List[EveMessageResponse]:
+        """List messages for a voice session, including crisis follow-ups."""
+        created = (
+            select(col(EveSession.created_at))
+            .where(EveSession.id == session_id)
+            .scalar_subquery()
+        )
+        stmt = _messages_since(
+            created,
+            col(EveMessage.session_id) == session_id,
+            col(EveMessage.user_id) == user.id,
         )
         result = await self.db.execute(stmt)
         messages = result.scalars().all()
@@ -424,15 +701,23 @@ class EveService:
                 role=m.role,
                 text=m.text,
                 audio_path=m.audio_path,
+                audio=self._audio_metadata(m),
                 created_at=m.created_at,
             )
             for m in messages
         ]
 
     async def create_message(
-        self, journal_id: str, payload: EveMessageCreateRequest, user: User
-    ) -> EveMessageResponse:
-        """Create a new message."""
+        self, journal_id: str, payload: EveMessageCreateRequest, user: Principal
+    ) -> Optional[EveMessageResponse]:
+        """Create a new message on one of the user's journals."""
+        owned = await self.db.execute(
+            select(col(Journal.id)).where(
+                col(Journal.id) == journal_id, col(Journal.user_id) == user.id
+            )
+        )
+        if owned.scalar_one_or_none() is None:
+            return None
         message = EveMessage(
             user_id=user.id,
             journal_id=journal_id,
@@ -441,7 +726,6 @@ class EveService:
         )
         self.db.add(message)
         await self.db.commit()
-        await self.db.refresh(message)
 
         return EveMessageResponse(
             id=message.id,
@@ -451,27 +735,30 @@ class EveService:
             role=message.role,
             text=message.text,
             audio_path=message.audio_path,
+            audio=self._audio_metadata(message),
             created_at=message.created_at,
         )
 
     async def update_message(
-        self, message_id: str, payload: EveMessageUpdateRequest, user: User
+        self, message_id: str, payload: EveMessageUpdateRequest, user: Principal
     ) -> Optional[EveMessageResponse]:
         """Update a message."""
-        stmt = select(EveMessage).where(
-            EveMessage.id == message_id, EveMessage.user_id == user.id
-        )
-        result = await self.db.execute(stmt)
+        owned = (col(EveMessage.id) == message_id, col(EveMessage.user_id) == user.id)
+        if payload.text is not None:
+            result = await self.db.execute(
+                update(EveMessage)
+                .where(*owned)
+                .values(text=payload.text)
+                .returning(EveMessage)
+            )
+        else:
+            result = await self.db.execute(select(EveMessage).where(*owned))
         message = result.scalar_one_or_none()
 
         if not message:
             return None
 
-        if payload.text is not None:
-            message.text = payload.text
-
         await self.db.commit()
-        await self.db.refresh(message)
 
         return EveMessageResponse(
             id=message.id,
@@ -481,20 +768,17 @@ class EveService:
             role=message.role,
             text=message.text,
             audio_path=message.audio_path,
+            audio=self._audio_metadata(message),
             created_at=message.created_at,
         )
 
-    async def delete_message(self, message_id: str, user: User) -> bool:
+    async def delete_message(self, message_id: str, user: Principal) -> bool:
         """Delete a message."""
-        stmt = select(EveMessage).where(
-            EveMessage.id == message_id, EveMessage.user_id == user.id
+        stmt = (
+            delete(EveMessage)
+            .where(col(EveMessage.id) == message_id, col(EveMessage.user_id) == user.id)
+            .returning(col(EveMessage.id))
         )
-        result = await self.db.execute(stmt)
-        message = result.scalar_one_or_none()
-
-        if not message:
-            return False
-
-        await self.db.delete(message)
+        deleted = (await self.db.execute(stmt)).first()
         await self.db.commit()
-        return True
+        return deleted is not None
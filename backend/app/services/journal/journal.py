@@ -1,33 +1,38 @@
-from typing import Optional, List, Tuple
+from typing import Optional, List
 from datetime import datetime
-from sqlalchemy import select, func, desc
+from sqlalchemy import select, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlmodel import col
 
 from app.models.journal import Journal
-from app.models.user import User
+from app.utilities.ids import canonical_uuid
+from app.utilities.principal import Principal
+from app.services.embeddings.embeddings import journal_embeddings
+from app.utilities.pagination import Page, cached_total, paginate
+from app.utilities.search import SearchHit, ranked_search, search_filter
+from app.utilities.tags import TagCount, normalize_tags, tag_counts
 
 
 async def create_journal(
     db: AsyncSession,
     *,
-    user: User,
+    user: Principal,
     title: str,
     content: str,
     tags: Optional[List[str]] = None,
     entry_date: Optional[datetime] = None,
 ) -> Journal:
-    tags_str = ",".join([t.strip() for t in tags]) if tags else None
     journal = Journal(
         user_id=user.id,
         title=title,
         content=content,
-        tags=tags_str,
+        tags=normalize_tags(tags),
         entry_date=entry_date or datetime.utcnow(),
     )
     db.add(journal)
     await db.commit()
-    await db.refresh(journal)
+    journal_embeddings.schedule(journal.id)
     return journal
 
 
@@ -44,42 +49,108 @@ async def get_journal(db: AsyncSession, journal_id: str) -> Optional[Journal]:
 async def list_journals(
     db: AsyncSession,
     *,
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 10,
     q: Optional[str] = None,
     user_id: Optional[str] = None,
-) -> Tuple[List[Journal], int]:
-    stmt = (
-        select(Journal)
-        .options(selectinload(Journal.user))
-        .order_by(desc(Journal.created_at))
-    )
+    tags: Optional[List[str]] = None,
+    include_total: bool = False,
+) -> Page[SearchHit[Journal]]:
+    """
+    Newest first, or best match first when `q` is given (full-text search
+    over title and content, with highlighted snippets). `tags` keeps only
+    entries carrying all of them.
+    """
+    stmt = select(Journal).options(selectinload(Journal.user))
 
     if user_id:
         stmt = stmt.where(Journal.user_id == user_id)
+    tags = normalize_tags(tags)
+    if tags:
+        stmt = stmt.where(col(Journal.tags).contains(tags))
 
     if q:
-        pattern = f"%{q}%"
-        stmt = stmt.where(
-            (getattr(Journal.title, "ilike")(pattern))
-            | (getattr(Journal.content, "ilike")(pattern))
+        page = await ranked_search(
+            db,
+            stmt,
+            table="journals",
+            id_col=Journal.id,
+            created_col=Journal.created_at,
+            snippet_col=Journal.content,
+            q=q,
+            cursor=cursor,
+            limit=limit,
+        )
+        stmt = stmt.where(search_filter("journals", q))
+    else:
+        plain = await paginate(
+            db,
+            stmt,
+            created_col=Journal.created_at,
+            id_col=Journal.id,
+            cursor=cursor,
+            limit=limit,
+        )
+        page = Page(
+            items=[SearchHit(j) for j in plain.items], next_cursor=plain.next_cursor
         )
+    if include_total:
+        page.total = await cached_total(
+            db, stmt, ("journals", user_id, q, tuple(tags or ()))
+        )
+    return page
 
-    total_stmt = select(func.count()).select_from(stmt.subquery())
-    res = await db.execute(stmt.offset(skip).limit(limit))
-    items = res.scalars().all()
 
-    total_res = await db.execute(total_stmt)
-    total = total_res.scalar_one()
+async def journal_tag_counts(
+    db: AsyncSession, *, user_id: str, limit: int = 50
+) -> List[TagCount]:
+    return await tag_counts(db, scope="journals", owner_id=user_id, limit=limit)
 
-    return items, int(total)
+
+async def similar_journals(
+    db: AsyncSession,
+    *,
+    user_id: str,
+    q: Optional[str] = None,
+    journal_id: Optional[str] = None,
+    k: int = 5,
+) -> List[SearchHit[Journal]]:
+    """
+    The user's entries closest in meaning to free text `q` or to one of their
+    journals (another user's journal id gives []); `rank` is cosine similarity.
+    """
+    if journal_id:
+        # the embedding lookups are raw SQL against a uuid column
+        if canonical_uuid(journal_id) is None:
+            return []
+        matches = await journal_embeddings.similar_to_journal(
+            db, user_id, journal_id, k=k
+        )
+    elif q:
+        matches = await journal_embeddings.similar_to_text(db, user_id, q, k=k)
+    else:
+        raise ValueError("Either q or journal_id is required")
+    if not matches:
+        return []
+
+    stmt = (
+        select(Journal)
+        .options(selectinload(Journal.user))
+        .where(col(Journal.id).in_([journal_id for journal_id, _ in matches]))
+    )
+    by_id = {j.id: j for j in (await db.execute(stmt)).scalars().all()}
+    return [
+        SearchHit(by_id[journal_id], rank=score)
+        for journal_id, score in matches
+        if journal_id in by_id
+    ]
 
 
 async def update_journal(
     db: AsyncSession,
     *,
     journal_id: str,
-    user: User,
+    user: Principal,
     title: Optional[str] = None,
     content: Optional[str] = None,
     tags: Optional[List[str]] = None,
@@ -101,7 +172,7 @@ async def update_journal(
         journal.content = content
         updated = True
     if tags is not None:
-        journal.tags = ",".join([t.strip() for t in tags]) if tags else None
+        journal.tags = normalize_tags(tags)
         updated = True
     if entry_date is not None:
         journal.entry_date = entry_date
@@ -110,12 +181,13 @@ async def update_journal(
     if updated:
         db.add(journal)
         await db.commit()
-        await db.refresh(journal)
+        if title is not None or content is not None:
+            journal_embeddings.schedule(journal.id)
 
     return journal
 
 
-async def delete_journal(db: AsyncSession, *, journal_id: str, user: User) -> bool:
+async def delete_journal(db: AsyncSession, *, journal_id: str, user: Principal) -> bool:
     journal = await get_journal(db, journal_id)
     if not journal:
         return False
@@ -0,0 +1,322 @@
+import argparse
+import asyncio
+import dataclasses
+import gzip
+import json
+import os
+from typing import IO, Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.config import settings
+from app.utilities.db import async_engine
+from app.utilities.logger import logger
+from app.utilities.partitions import (
+    PARTITIONED_TABLES,
+    Month,
+    create_partition,
+    current_month,
+    default_months,
+    list_partitions,
+    partition_name,
+)
+from app.utilities.slow_queries import SKIP_OPTION
+
+log = logger(__name__)
+
+# pg_try_advisory_lock key, so one worker across all hosts maintains at a time
+_LOCK_KEY = 0x50415254  # "PART"
+# never re-run under EXPLAIN ANALYZE, which would take the lock again
+_LOCK = text("SELECT pg_try_advisory_lock(:k)").execution_options(**{SKIP_OPTION: True})
+_UNLOCK = text("SELECT pg_advisory_unlock(:k)").execution_options(**{SKIP_OPTION: True})
+RESTORED_COMMENT = "restored"
+BATCH_ROWS = 5000
+# tables whose rows reference an audio file (audio_path)
+_AUDIO_TABLES = {"eve_messages"}
+
+# Rows restored from an archive may point at rows deleted since it was
+# written; these apply the foreign keys' ON DELETE CASCADE to them, so a
+# deleted account, session or journal stays deleted.
+_ORPHAN_CLEANUP: Dict[str, List[str]] = {
+    "messages": [
+        "DELETE FROM {p} m WHERE NOT EXISTS "
+        "(SELECT 1 FROM chat_sessions s WHERE s.id = m.session_id)",
+    ],
+    "eve_messages": [
+        "DELETE FROM {p} m WHERE NOT EXISTS "
+        "(SELECT 1 FROM users u WHERE u.id = m.user_id)",
+        "DELETE FROM {p} m WHERE journal_id IS NOT NULL "
+        "AND NOT EXISTS (SELECT 1 FROM journals j WHERE j.id = m.journal_id)",
+        "DELETE FROM {p} m WHERE session_id IS NOT NULL "
+        "AND NOT EXISTS (SELECT 1 FROM eve_sessions s WHERE s.id = m.session_id)",
+    ],
+}
+
+
+@dataclasses.dataclass
+class MaintenanceReport:
+    created: List[str] = dataclasses.field(default_factory=list)
+    archived: List[str] = dataclasses.field(default_factory=list)
+
+
+class PartitionArchiveService:
+    """
+    Keeps the monthly partitions of eve_messages and messages (see
+    utilities/partitions) ahead of the clock and moves cold months out of
+    the database.
+
+    A maintenance run creates the partitions for the current month and the
+    next `months_ahead`, and for any month whose rows the default partition
+    caught. With `archive_after_months`, every month older
+    than that is written to `archive_dir/<table>/<partition>.ndjson.gz`, one
+    JSON object per row, and the partition is detached and dropped once
+    the file is safely on disk. Audio files are not archived: once their
+    rows are gone the audio sweep removes them as orphans. `restore` loads
+    such a file back as its month's partition; restored months are left
+    alone by later runs until archived again explicitly.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine = async_engine,
+        *,
+        months_ahead: int = settings.partition_months_ahead,
+        archive_after_months: int = settings.partition_archive_after_months,
+        archive_dir: str = settings.partition_archive_dir,
+    ) -> None:
+        self.engine = engine
+        self.months_ahead = max(0, months_ahead)
+        self.archive_after_months = archive_after_months
+        self.archive_dir = os.path.abspath(archive_dir)
+
+    # ---------- public API ----------
+    async def maintain_once(self) -> Optional[MaintenanceReport]:
+        """
+        One maintenance run. Returns None if another worker holds the
+        maintenance lock.
+        """
+        async with self.engine.connect() as conn:
+            locked = (await conn.execute(_LOCK, {"k": _LOCK_KEY})).scalar()
+            await conn.commit()
+            if not locked:
+                log.debug("Partition maintenance skipped: lock held elsewhere")
+                return None
+            try:
+                return await self._maintain(conn)
+            finally:
+                await conn.rollback()
+                await conn.execute(_UNLOCK, {"k": _LOCK_KEY})
+                await conn.commit()
+
+    async def run_forever(
+        self, interval_seconds: int = settings.partition_maintenance_interval_seconds
+    ) -> None:
+        """Maintain periodically until cancelled (started from the app lifespan)."""
+        while True:
+            try:
+                report = await self.maintain_once()
+                if report is not None and (report.created or report.archived):
+                    log.info(
+                        "Partition maintenance: created=%s archived=%s",
+                        report.created,
+                        report.archived,
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Partition maintenance failed")
+            await asyncio.sleep(interval_seconds)
+
+    def archive_path(self, table: str, month: Month) -> str:
+        return os.path.join(
+            self.archive_dir, table, f"{partition_name(table, month)}.ndjson.gz"
+        )
+
+    async def archive(self, table: str, month: Month) -> int:
+        """Write one month to its archive file, then drop its partition."""
+        if month >= current_month():
+            raise ValueError(f"{month} is not over yet")
+        async with self.engine.connect() as conn:
+            return await self._archive(conn, table, month)
+
+    async def restore(self, table: str, month: Month) -> int:
+        """
+        Load one archived month back as its partition. Returns the rows
+        loaded. A restored message whose audio file has been swept since
+        comes back with audio_path NULL, so only its text is restored.
+        """
+        _check_table(table)
+        path = self.archive_path(table, month)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No archive for {table} {month}: {path}")
+        loaded = 0
+
+        async def fill(name: str) -> None:
+            nonlocal loaded
+            with open(path, "rb") as raw, gzip.open(raw, "rt", encoding="utf-8") as fh:
+                while True:
+                    rows = await asyncio.to_thread(_read_lines, fh, BATCH_ROWS)
+                    if not rows:
+                        break
+                    if table in _AUDIO_TABLES:
+                        rows = await asyncio.to_thread(_without_missing_audio, rows)
+                    await conn.execute(
+                        text(
+                            f"INSERT INTO {name} SELECT * FROM "
+                            f"json_populate_recordset(NULL::{table}, CAST(:rows AS json))"
+                        ),
+                        {"rows": "[" + ",".join(rows) + "]"},
+                    )
+                    loaded += len(rows)
+            for statement in _ORPHAN_CLEANUP.get(table, []):
+                await conn.execute(text(statement.format(p=name)))
+            await conn.execute(text(f"COMMENT ON TABLE {name} IS '{RESTORED_COMMENT}'"))
+
+        async with self.engine.begin() as conn:
+            if await create_partition(conn, table, month, fill) is None:
+                raise ValueError(f"{table} already has a partition for {month}")
+            await conn.execute(text(f"ANALYZE {partition_name(table, month)}"))
+        log.info("Restored %s rows of %s %s from %s", loaded, table, month, path)
+        return loaded
+
+    # ---------- internals ----------
+    async def _maintain(self, conn: AsyncConnection) -> MaintenanceReport:
+        report = MaintenanceReport()
+        now = current_month()
+        for table in PARTITIONED_TABLES:
+            # months the default partition caught, then the ones coming up
+            months = await default_months(conn, table)
+            months += [now.plus(step) for step in range(self.months_ahead + 1)]
+            for month in months:
+                created = await create_partition(conn, table, month)
+                await conn.commit()
+                if created:
+                    report.created.append(created)
+
+        if self.archive_after_months <= 0:
+            return report
+        horizon = now.plus(-self.archive_after_months)
+        for table in PARTITIONED_TABLES:
+            for month in await list_partitions(conn, table):
+                if month >= horizon:
+                    break
+                if await self._restored(conn, table, month):
+                    continue
+                await conn.commit()
+                await self._archive(conn, table, month)
+                report.archived.append(partition_name(table, month))
+        return report
+
+    @staticmethod
+    async def _restored(conn: AsyncConnection, table: str, month: Month) -> bool:
+        comment = (
+            await conn.execute(
+                text("SELECT obj_description(to_regclass(:p), 'pg_class')"),
+                {"p": partition_name(table, month)},
+            )
+        ).scalar()
+        return comment == RESTORED_COMMENT
+
+    async def _archive(self, conn: AsyncConnection, table: str, month: Month) -> int:
+        _check_table(table)
+        name = partition_name(table, month)
+        path = self.archive_path(table, month)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial = f"{path}.partial"
+        written = 0
+        async with conn.begin():
+            # no writes while the month is exported, so the file holds every row
+            await conn.execute(text(f"LOCK TABLE {name} IN SHARE MODE"))
+            with open(partial, "wb") as raw:
+                with gzip.open(raw, "wt", encoding="utf-8") as fh:
+                    result = await conn.stream(
+                        text(f"SELECT row_to_json(t)::text FROM {name} t")
+                    )
+                    async for chunk in result.scalars().partitions(BATCH_ROWS):
+                        await asyncio.to_thread(_write_lines, fh, chunk)
+                        written += len(chunk)
+                raw.flush()
+                os.fsync(raw.fileno())
+        os.replace(partial, path)
+        # the export's cursor pins the table until its transaction ends
+        async with conn.begin():
+            # DETACH locks the parent exclusively; give up rather than queue
+            # every reader behind a long query, and retry on the next run
+            await conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+            await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            rows = (await conn.execute(text(f"SELECT count(*) FROM {name}"))).scalar()
+            if rows != written:
+                raise RuntimeError(
+                    f"{name} changed during its export ({written} rows written, "
+                    f"{rows} now); left in place"
+                )
+            await conn.execute(text(f"DROP TABLE {name}"))
+        log.info("Archived %s rows of %s %s to %s", written, table, month, path)
+        return written
+
+
+def _check_table(table: str) -> None:
+    if table not in PARTITIONED_TABLES:
+        raise ValueError(f"{table} is not a partitioned table")
+
+
+def _read_lines(fh: IO[str], limit: int) -> List[str]:
+    lines = []
+    for line in fh:
+        line = line.strip()
+        if line:
+            lines.append(line)
+            if len(lines) >= limit:
+                break
+    return lines
+
+
+def _without_missing_audio(lines: List[str]) -> List[str]:
+    out = []
+    for line in lines:
+        row = json.loads(line)
+        path = row.get("audio_path")
+        if path and not os.path.exists(path):
+            row["audio_path"] = None
+            line = json.dumps(row)
+        out.append(line)
+    return out
+
+
+def _write_lines(fh: IO[str], lines: Any) -> None:
+    fh.write("".join(f"{line}\n" for line in lines))
+
+
+async def _main(args: argparse.Namespace) -> None:
+    service = PartitionArchiveService()
+    try:
+        if args.command == "maintain":
+            print(await service.maintain_once())
+        elif args.command == "archive":
+            rows = await service.archive(args.table, Month.parse(args.month))
+            print(f"archived {rows} rows")
+        elif args.command == "restore":
+            rows = await service.restore(args.table, Month.parse(args.month))
+            print(f"restored {rows} rows")
+        else:
+            async with service.engine.connect() as conn:
+                for table in PARTITIONED_TABLES:
+                    months = await list_partitions(conn, table)
+                    print(f"{table}: {', '.join(str(m) for m in months)}")
+    finally:
+        await service.engine.dispose()
+
+
+if __name__ == "__main__":
+    # python -m app.services.partition_archive.partition_archive restore messages 2025-03
+    parser = argparse.ArgumentParser(
+        description="Monthly partitions of eve_messages and messages"
+    )
+    parser.add_argument("command", choices=["list", "maintain", "archive", "restore"])
+    parser.add_argument("table", nargs="?", choices=PARTITIONED_TABLES)
+    parser.add_argument("month", nargs="?", help="YYYY-MM")
+    args = parser.parse_args()
+    if args.command in ("archive", "restore") and not (args.table and args.month):
+        parser.error(f"{args.command} needs a table and a month")
+    asyncio.run(_main(args))
@@ -0,0 +1,181 @@
+import asyncio
+import hashlib
+import io
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col
+
+from app.config import settings
+from app.models.user import User
+from app.models.user_photo import UserPhoto
+from app.utilities.http_cache import ResponseCache
+from app.utilities.logger import logger
+
+log = logger(__name__)
+
+ORIGINAL = "original"
+# Square renditions made at upload time, by longest edge in pixels
+THUMBNAIL_SIZES: Dict[str, int] = {"small": 256, "thumb": 64}
+VARIANTS = (ORIGINAL, *THUMBNAIL_SIZES)
+
+_JPEG_QUALITY = 85
+
+# Rendered GET /api/users/{id}/photo bodies; an upload or removal drops
+# that user's entries.
+photo_cache = ResponseCache(
+    maxsize=settings.photo_cache_entries, ttl_seconds=settings.photo_cache_ttl_seconds
+)
+
+
+@dataclass(frozen=True)
+class Rendition:
+    variant: str
+    data: bytes
+    width: int
+    height: int
+    # content hash of the original; thumbnails derive theirs from it so any
+    # rendition can be matched to the user's photo_version
+    etag: str
+    content_type: str = "image/jpeg"
+
+
+def version_of(etag: str) -> str:
+    """photo_version a rendition's ETag belongs to."""
+    return etag.strip('"').split("-")[0]
+
+
+def _encode(img: Image.Image) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=_JPEG_QUALITY, optimize=True)
+    return buf.getvalue()
+
+
+def render_variants(raw: bytes) -> List[Rendition]:
+    """
+    Decode an uploaded image and produce every stored rendition. Re-encoding
+    drops EXIF (including GPS) after applying its orientation. CPU-bound:
+    call through asyncio.to_thread.
+    """
+    try:
+        img: Image.Image = Image.open(io.BytesIO(raw))
+        if img.width * img.height > settings.photo_max_pixels:
+            raise ValueError("Image dimensions are too large")
+        img.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise ValueError("Unsupported or corrupt image")
+
+    img = ImageOps.exif_transpose(img)
+    if img.mode != "RGB":
+        # flatten transparency onto white; JPEG has no alpha channel
+        rgba = img.convert("RGBA")
+        img = Image.new("RGB", rgba.size, (255, 255, 255))
+        img.paste(rgba, mask=rgba.getchannel("A"))
+
+    original = img.copy()
+    original.thumbnail((settings.photo_max_dimension, settings.photo_max_dimension))
+    data = _encode(original)
+    version = hashlib.blake2b(data, digest_size=16).hexdigest()
+    out = [Rendition(ORIGINAL, data, *original.size, etag=version)]
+    for variant, edge in THUMBNAIL_SIZES.items():
+        square = ImageOps.fit(img, (edge, edge), method=Image.Resampling.LANCZOS)
+        out.append(
+            Rendition(variant, _encode(square), edge, edge, f"{version}-{variant}")
+        )
+    return out
+
+
+async def _store(db: AsyncSession, user: User, renditions: List[Rendition]) -> None:
+    await db.execute(delete(UserPhoto).where(col(UserPhoto.user_id) == user.id))
+    for r in renditions:
+        db.add(
+            UserPhoto(
+                user_id=user.id,
+                variant=r.variant,
+                content_type=r.content_type,
+                width=r.width,
+                height=r.height,
+                size_bytes=len(r.data),
+                etag=r.etag,
+                data=r.data,
+            )
+        )
+    user.photo_version = renditions[0].etag
+    db.add(user)
+    await db.commit()
+    _invalidate(user.id)
+
+
+async def set_photo(db: AsyncSession, *, user: User, raw: bytes) -> User:
+    if len(raw) > settings.photo_max_upload_mb * 1024 * 1024:
+        raise ValueError(f"Photo exceeds {settings.photo_max_upload_mb} MB")
+    renditions = await asyncio.to_thread(render_variants, raw)
+    await _store(db, user, renditions)
+    return user
+
+
+async def delete_photo(db: AsyncSession, *, user: User) -> bool:
+    if not user.photo_version:
+        return False
+    await db.execute(delete(UserPhoto).where(col(UserPhoto.user_id) == user.id))
+    user.photo_version = None
+    db.add(user)
+    await db.commit()
+    _invalidate(user.id)
+    return True
+
+
+async def get_photo(
+    db: AsyncSession, *, user_id: str, variant: str = ORIGINAL
+) -> Optional[UserPhoto]:
+    """
+    One rendition. Photos carried over from the old users.photo column only
+    have an unprocessed original; their renditions are built on first read.
+    """
+    if variant not in VARIANTS:
+        raise ValueError(f"Unknown photo size {variant!r}")
+    res = await db.execute(
+        select(UserPhoto).where(
+            col(UserPhoto.user_id) == user_id, col(UserPhoto.variant) == variant
+        )
+    )
+    photo = res.scalar_one_or_none()
+    if photo is not None and photo.width is not None:
+        return photo
+
+    legacy = photo if variant == ORIGINAL else await _legacy_original(db, user_id)
+    if legacy is None:
+        return photo
+    user = await db.get(User, user_id)
+    if user is None:
+        return None
+    try:
+        renditions = await asyncio.to_thread(render_variants, legacy.data)
+    except ValueError:
+        log.warning("Stored photo for user %s is not a readable image", user_id)
+        return photo
+    await _store(db, user, renditions)
+    return await get_photo(db, user_id=user_id, variant=variant)
+
+
+async def _legacy_original(db: AsyncSession, user_id: str) -> Optional[UserPhoto]:
+    res = await db.execute(
+        select(UserPhoto).where(
+            col(UserPhoto.user_id) == user_id,
+            col(UserPhoto.variant) == ORIGINAL,
+            col(UserPhoto.width).is_(None),
+        )
+    )
+    return res.scalar_one_or_none()
+
+
+def cache_key(user_id: str, variant: str) -> Tuple[str, str]:
+    return (user_id, variant)
+
+
+def _invalidate(user_id: str) -> None:
+    for variant in VARIANTS:
+        photo_cache.invalidate(cache_key(user_id, variant))
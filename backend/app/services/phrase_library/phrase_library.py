@@ -0,0 +1,138 @@
+import argparse
+import asyncio
+import dataclasses
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.static_values import EVE_PHRASES
+from app.utilities.audio import PHRASE_AUDIO_DIR, AudioInfo, probe_audio_file
+from app.utilities.logger import logger
+from app.utilities.tts import GeminiTTSAdapter
+
+log = logger(__name__)
+
+DEFAULT_VOICE = "Kore"
+
+
+@dataclasses.dataclass(frozen=True)
+class PhraseAudio:
+    key: str
+    text: str
+    voice: str
+    path: str
+    info: AudioInfo
+
+
+class PhraseLibrary:
+    """
+    Audio for Eve's constant utterances (greetings, fallbacks, helpline
+    referrals), rendered once per voice and then served from disk.
+
+    Files are named by a hash of model + voice + text, so editing a phrase in
+    static_values renders a fresh file instead of serving stale audio. A
+    rendered phrase is probed once; lookups after that do no I/O.
+    """
+
+    def __init__(
+        self,
+        *,
+        phrases: Optional[Dict[str, str]] = None,
+        root: str = PHRASE_AUDIO_DIR,
+        tts: Optional[GeminiTTSAdapter] = None,
+    ) -> None:
+        self.phrases = phrases or EVE_PHRASES
+        self.root = root
+        self._tts = tts
+        self._index: Dict[Tuple[str, str], PhraseAudio] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+    def text(self, key: str) -> str:
+        return self.phrases[key]
+
+    def _path_for(self, key: str, voice: str) -> str:
+        digest = hashlib.sha1(
+            f"{settings.tts_model}|{voice}|{self.phrases[key]}".encode("utf-8")
+        ).hexdigest()[:12]
+        return os.path.join(self.root, voice, f"{key}-{digest}.wav")
+
+    def lookup(self, key: str, voice: str = DEFAULT_VOICE) -> Optional[PhraseAudio]:
+        """
+        Return the phrase if its audio is already rendered, else None.
+        Never calls TTS, so it is safe on latency-critical paths.
+        """
+        cached = self._index.get((key, voice))
+        if cached is not None:
+            return cached
+        if key not in self.phrases:
+            return None
+        path = self._path_for(key, voice)
+        if not os.path.exists(path):
+            return None
+        phrase = PhraseAudio(
+            key=key,
+            text=self.phrases[key],
+            voice=voice,
+            path=path,
+            info=probe_audio_file(path),
+        )
+        self._index[(key, voice)] = phrase
+        return phrase
+
+    async def get(self, key: str, voice: str = DEFAULT_VOICE) -> PhraseAudio:
+        """Return the phrase, rendering its audio on first use."""
+        phrase = self.lookup(key, voice)
+        if phrase is not None:
+            return phrase
+
+        lock = self._locks.setdefault((key, voice), asyncio.Lock())
+        async with lock:
+            phrase = self.lookup(key, voice)
+            if phrase is None:
+                await self._render(key, voice)
+                phrase = self.lookup(key, voice)
+        if phrase is None:
+            raise RuntimeError(f"Failed to render phrase {key!r} for voice {voice!r}")
+        return phrase
+
+    async def prerender(self, voices: List[str]) -> List[PhraseAudio]:
+        """Render every phrase for every voice (deploy-time warm-up)."""
+        return [await self.get(key, voice) for voice in voices for key in self.phrases]
+
+    async def _render(self, key: str, voice: str) -> None:
+        if self._tts is None:
+            self._tts = GeminiTTSAdapter(model=settings.tts_model)
+        target = self._path_for(key, voice)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+
+        # Render into a scratch dir and rename into place so concurrent
+        # workers never observe (or serve) a half-written file.
+        scratch = tempfile.mkdtemp(dir=self.root, prefix=".render-")
+        try:
+            result = await self._tts.synthesize_to_local(
+                self.phrases[key], scratch, voice=voice, filename_prefix=key
+            )
+            rendered = result.tts_meta.get("local_path")
+            if rendered is None:
+                log.warning("Phrase %s has nothing to speak", key)
+                return
+            os.replace(rendered, target)
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+        log.info("Rendered phrase %s for voice %s -> %s", key, voice, target)
+
+
+phrase_library = PhraseLibrary()
+
+
+if __name__ == "__main__":
+    # Deploy-time warm-up: python -m app.services.phrase_library.phrase_library --voice Kore
+    parser = argparse.ArgumentParser(description="Pre-render Eve phrase audio.")
+    parser.add_argument("--voice", action="append", default=None)
+    args = parser.parse_args()
+    rendered = asyncio.run(phrase_library.prerender(args.voice or [DEFAULT_VOICE]))
+    for p in rendered:
+        print(f"{p.voice}/{p.key}: {p.path} ({p.info.duration_seconds}s)")
@@ -1,10 +1,12 @@
 from typing import Optional, List
-from sqlalchemy import select, desc
+from sqlalchemy import delete, desc, select, update
+from sqlmodel import col
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 
 from app.models.voice_session_response import VoiceSessionResponseData
-from app.models.user import User
+from app.utilities.principal import Principal
+from app.utilities.pagination import Page, paginate
 from app.routes.voice_session_response.schema.voice_session_response import (
     VoiceSessionResponseCreateRequest,
     VoiceSessionResponseUpdateRequest,
@@ -19,7 +21,7 @@ class VoiceSessionResponseService:
         self.db = db
 
     async def create_response(
-        self, payload: VoiceSessionResponseCreateRequest, user: User
+        self, payload: VoiceSessionResponseCreateRequest, user: Principal
     ) -> VoiceSessionResponseResponse:
         """Create a new voice session response record."""
         response_data = VoiceSessionResponseData(
@@ -33,7 +35,6 @@ class VoiceSessionResponseService:
 
         self.db.add(response_data)
         await self.db.commit()
-        await self.db.refresh(response_data)
 
         return VoiceSessionResponseResponse(
             id=response_data.id,
@@ -48,7 +49,7 @@ class VoiceSessionResponseService:
         )
 
     async def get_response(
-        self, response_id: str, user: User
+        self, response_id: str, user: Principal
     ) -> Optional[VoiceSessionResponseResponse]:
         """Get a specific voice session response by ID."""
         stmt = select(VoiceSessionResponseData).where(
@@ -73,17 +74,22 @@ class VoiceSessionResponseService:
             updated_at=response_data.updated_at,
         )
 
-    async def list_responses(self, user: User) -> List[VoiceSessionResponseResponse]:
-        """List all voice session responses for a user."""
-        stmt = (
-            select(VoiceSessionResponseData)
-            .where(VoiceSessionResponseData.user_id == user.id)
-            .order_by(desc(VoiceSessionResponseData.created_at))
+    async def list_responses(
+        self, user: Principal, cursor: Optional[str] = None, limit: int = 50
+    ) -> Page[VoiceSessionResponseResponse]:
+        """List a user's voice session responses, newest first."""
+        page = await paginate(
+            self.db,
+            select(VoiceSessionResponseData).where(
+                col(VoiceSessionResponseData.user_id) == user.id
+            ),
+            created_col=VoiceSessionResponseData.created_at,
+            id_col=VoiceSessionResponseData.id,
+            cursor=cursor,
+            limit=limit,
         )
-        result = await self.db.execute(stmt)
-        responses = result.scalars().all()
 
-        return [
+        items = [
             VoiceSessionResponseResponse(
                 id=r.id,
                 user_id=r.user_id,
@@ -95,11 +101,12 @@ class VoiceSessionResponseService:
                 created_at=r.created_at,
                 updated_at=r.updated_at,
             )
-            for r in responses
+            for r in page.items
         ]
+        return Page(items=items, next_cursor=page.next_cursor)
 
     async def get_responses_by_session(
-        self, session_id: str, user: User
+        self, session_id: str, user: Principal
     ) -> List[VoiceSessionResponseResponse]:
         """Get all voice session responses for a specific session."""
         stmt = (
@@ -129,12 +136,32 @@ class VoiceSessionResponseService:
         ]
 
     async def update_response(
-        self, response_id: str, payload: VoiceSessionResponseUpdateRequest, user: User
+        self,
+        response_id: str,
+        payload: VoiceSessionResponseUpdateRequest,
+        user: Principal,
     ) -> Optional[VoiceSessionResponseResponse]:
         """Update a voice session response."""
-        stmt = select(VoiceSessionResponseData).where(
-            VoiceSessionResponseData.id == response_id,
-            VoiceSessionResponseData.user_id == user.id,
+        # Update fields if provided
+        values = {
+            field: value
+            for field, value in (
+                ("status", payload.status),
+                ("summary", payload.summary),
+                ("notes_journal_id", payload.notes_journal_id),
+                ("notes_content", payload.notes_content),
+            )
+            if value is not None
+        }
+        # ownership check, write and the updated row in one statement
+        stmt = (
+            update(VoiceSessionResponseData)
+            .where(
+                col(VoiceSessionResponseData.id) == response_id,
+                col(VoiceSessionResponseData.user_id) == user.id,
+            )
+            .values(**values, updated_at=datetime.utcnow())
+            .returning(VoiceSessionResponseData)
         )
         result = await self.db.execute(stmt)
         response_data = result.scalar_one_or_none()
@@ -142,20 +169,7 @@ class VoiceSessionResponseService:
         if not response_data:
             return None
 
-        # Update fields if provided
-        if payload.status is not None:
-            response_data.status = payload.status
-        if payload.summary is not None:
-            response_data.summary = payload.summary
-        if payload.notes_journal_id is not None:
-            response_data.notes_journal_id = payload.notes_journal_id
-        if payload.notes_content is not None:
-            response_data.notes_content = payload.notes_content
-
-        response_data.updated_at = datetime.utcnow()
-
         await self.db.commit()
-        await self.db.refresh(response_data)
 
         return VoiceSessionResponseResponse(
             id=response_data.id,
@@ -169,18 +183,16 @@ class VoiceSessionResponseService:
             updated_at=response_data.updated_at,
         )
 
-    async def delete_response(self, response_id: str, user: User) -> bool:
+    async def delete_response(self, response_id: str, user: Principal) -> bool:
         """Delete a voice session response."""
-        stmt = select(VoiceSessionResponseData).where(
-            VoiceSessionResponseData.id == response_id,
-            VoiceSessionResponseData.user_id == user.id,
+        stmt = (
+            delete(VoiceSessionResponseData)
+            .where(
+                col(VoiceSessionResponseData.id) == response_id,
+                col(VoiceSessionResponseData.user_id) == user.id,
+            )
+            .returning(col(VoiceSessionResponseData.id))
         )
-        result = await self.db.execute(stmt)
-        response_data = result.scalar_one_or_none()
-
-        if not response_data:
-            return False
-
-        await self.db.delete(response_data)
+        deleted = (await self.db.execute(stmt)).first()
         await self.db.commit()
-        return True
+        return deleted is not None
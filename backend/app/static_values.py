@@ -9,3 +9,93 @@ You can also share light, uplifting content like affirmations, relatable anecdot
 When discussing mental wellness topics, keep explanations simple, engaging, and easy to follow. Use short paragraphs and relatable examples.
 Avoid generating audio responses longer than 2 minutes.
 """
+
+# Fixed Eve utterances. Audio for these is rendered once per voice and
+# reused (see app/services/phrase_library) instead of calling TTS per turn.
+PHRASE_GREETING = "greeting"
+PHRASE_NOT_HEARD = "not_heard"
+PHRASE_HELPLINE = "helpline"
+
+EVE_PHRASES = {
+    PHRASE_GREETING: "Hey, I'm Eve. I'm here to listen, so take your time and tell me what's on your mind.",
+    PHRASE_NOT_HEARD: "Sorry, I couldn't quite hear that. Could you say it again?",
+    PHRASE_HELPLINE: (
+        "I'm really glad you told me, and I'm so sorry you're hurting this much. "
+        "You don't have to face this alone. Please reach out to someone right now: "
+        "you can call Tele-MANAS on 14416, free and open 24/7, or call 112 if you're in immediate danger. "
+        "If you're outside India, please call your local emergency number. "
+        "I'm still here with you."
+    ),
+}
+
+# Crisis language that short-circuits to the helpline phrase (see
+# app/utilities/crisis.py). Matched case-insensitively on whole words after
+# punctuation is stripped, so "can't" and "cant" are the same entry.
+CRISIS_PHRASES = [
+    # English
+    "kill myself",
+    "killing myself",
+    "end my life",
+    "ending my life",
+    "take my own life",
+    "taking my own life",
+    "want to die",
+    "wanna die",
+    "wish i was dead",
+    "wish i were dead",
+    "better off dead",
+    "better off without me",
+    "no reason to live",
+    "nothing to live for",
+    "dont want to live",
+    "dont want to be alive",
+    "cant go on anymore",
+    "suicide",
+    "suicidal",
+    "commit suicide",
+    "hurt myself",
+    "hurting myself",
+    "harm myself",
+    "self harm",
+    "cut myself",
+    "cutting myself",
+    "overdose",
+    "slit my wrists",
+    "hang myself",
+    "jump off a bridge",
+    "end it all",
+    "say goodbye forever",
+    # Hinglish
+    "marna chahta hoon",
+    "marna chahta hu",
+    "marna chahti hoon",
+    "marna chahti hu",
+    "mar jaana chahta hoon",
+    "mar jaana chahti hoon",
+    "mar jana chahta hu",
+    "mar jana chahti hu",
+    "mujhe marna hai",
+    "mar jaunga",
+    "mar jaungi",
+    "khudkushi",
+    "khud khushi",
+    "aatmahatya",
+    "atmahatya",
+    "jeene ka mann nahi",
+    "jeene ka man nahi",
+    "jeena nahi chahta",
+    "jeena nahi chahti",
+    "zindagi khatam",
+    "sab khatam kar dunga",
+    "sab khatam kar dungi",
+    "apni jaan le lunga",
+    "apni jaan le lungi",
+    "khud ko hurt",
+    "khud ko nuksan",
+    # Devanagari
+    "आत्महत्या",
+    "मरना चाहता हूँ",
+    "मरना चाहती हूँ",
+    "जीना नहीं चाहता",
+    "जीना नहीं चाहती",
+]
@@ -0,0 +1,84 @@
+import dataclasses
+import io
+import os
+import wave
+from typing import Optional
+
+from app.config import settings
+
+AUDIO_ROOT = os.path.abspath(settings.audio_dir)
+
+# Incoming user recordings (voice turns)
+USER_AUDIO_DIR = os.path.join(AUDIO_ROOT, "user")
+
+# Eve's synthesized replies
+EVE_AUDIO_DIR = os.path.join(AUDIO_ROOT, "eve")
+
+# Pre-rendered fixed phrases, shared by all users (never swept)
+PHRASE_AUDIO_DIR = os.path.join(AUDIO_ROOT, "phrases")
+
+
+@dataclasses.dataclass
+class AudioInfo:
+    """Cheap-to-compute facts about a stored audio file."""
+
+    codec: str
+    size_bytes: int
+    duration_seconds: Optional[float] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+
+
+def pcm_info(
+    pcm_len: int,
+    *,
+    sample_rate: int,
+    channels: int = 1,
+    sample_width: int = 2,
+    size_bytes: Optional[int] = None,
+) -> AudioInfo:
+    """Derive duration from raw PCM length (no decoding needed)."""
+    frame_bytes = channels * sample_width
+    return AudioInfo(
+        codec=f"pcm_s{sample_width * 8}le",
+        size_bytes=size_bytes if size_bytes is not None else pcm_len,
+        duration_seconds=round(pcm_len / (sample_rate * frame_bytes), 3),
+        sample_rate=sample_rate,
+        channels=channels,
+    )
+
+
+def probe_audio_file(path: str) -> AudioInfo:
+    """Read only the WAV header of a file on disk."""
+    with wave.open(path, "rb") as wf:
+        rate = wf.getframerate()
+        return AudioInfo(
+            codec=f"pcm_s{wf.getsampwidth() * 8}le",
+            size_bytes=os.path.getsize(path),
+            duration_seconds=round(wf.getnframes() / rate, 3),
+            sample_rate=rate,
+            channels=wf.getnchannels(),
+        )
+
+
+def probe_audio_bytes(data: bytes, ext: Optional[str] = None) -> AudioInfo:
+    """
+    Describe an uploaded recording. WAV headers are parsed directly; for
+    compressed containers (webm, mp3, ...) only codec and size are known
+    without decoding, so duration is left empty.
+    """
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        try:
+            with wave.open(io.BytesIO(data), "rb") as wf:
+                rate = wf.getframerate()
+                return AudioInfo(
+                    codec=f"pcm_s{wf.getsampwidth() * 8}le",
+                    size_bytes=len(data),
+                    duration_seconds=round(wf.getnframes() / rate, 3),
+                    sample_rate=rate,
+                    channels=wf.getnchannels(),
+                )
+        except (wave.Error, EOFError, ZeroDivisionError):
+            pass
+    codec = (ext or "").lstrip(".").lower() or "unknown"
+    return AudioInfo(codec=codec, size_bytes=len(data))
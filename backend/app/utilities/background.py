@@ -0,0 +1,27 @@
+import asyncio
+import contextvars
+from typing import Any, Coroutine, Set
+
+from app.utilities.logger import logger
+
+log = logger(__name__)
+
+# Strong references to in-flight tasks; the event loop only keeps weak ones,
+# so an un-referenced fire-and-forget task can be garbage collected mid-run.
+_tasks: Set["asyncio.Task[Any]"] = set()
+
+
+def _finished(task: "asyncio.Task[Any]") -> None:
+    _tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        log.error("Background task %s failed: %s", task.get_name(), task.exception())
+
+
+def spawn(coro: Coroutine[Any, Any, Any], *, name: str) -> "asyncio.Task[Any]":
+    """Run `coro` after the current request returns; failures are logged."""
+    # a fresh context: the work is not part of the request, and its queries
+    # must not be charged to it (utilities/query_stats)
+    task = asyncio.create_task(coro, name=name, context=contextvars.Context())
+    _tasks.add(task)
+    task.add_done_callback(_finished)
+    return task
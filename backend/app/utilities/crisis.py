@@ -0,0 +1,129 @@
+import re
+import string
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from app.static_values import CRISIS_PHRASES
+
+# Common punctuation becomes a word break and apostrophes are dropped
+# ("can't" -> "cant"); str.translate does this in C, several times faster
+# than a regex over the whole message.
+_PUNCTUATION = str.maketrans(
+    {
+        **{ch: " " for ch in string.punctuation + "“”«»…—–।॥¿¡·•"},
+        **{ch: None for ch in "'’`"},
+    }
+)
+# Slow path for the rare token that still holds a symbol (emoji, odd
+# punctuation). \w misses Devanagari vowel signs and viramas, hence the range.
+_WORD = re.compile(r"(?:[^\W_]|[ऀ-ॣ०-ॿ])+")
+
+
+def crisis_tokens(text: str) -> List[str]:
+    """Case-folded words of `text`, punctuation and symbols removed."""
+    tokens: List[str] = []
+    for token in text.casefold().translate(_PUNCTUATION).split():
+        if token.isalnum():
+            tokens.append(token)
+        else:
+            tokens.extend(_WORD.findall(token))
+    return tokens
+
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher over symbol sequences: one pass over the input
+    finds every occurrence of every pattern, however many patterns there are.
+
+    Failure links are compiled into a full transition table at build time,
+    so matching costs a single dict lookup per input symbol.
+    """
+
+    def __init__(self, patterns: Iterable[Sequence[Hashable]]) -> None:
+        self.patterns: List[Tuple[Hashable, ...]] = []
+        self._delta: List[Dict[Hashable, int]] = [{}]
+        self._fail: List[int] = [0]
+        # index of the longest pattern ending at each state, -1 for none
+        self._out: List[int] = [-1]
+
+        for pattern in patterns:
+            key = tuple(pattern)
+            if key and key not in self.patterns:
+                self._add(key)
+        self._compile()
+
+    def _add(self, pattern: Tuple[Hashable, ...]) -> None:
+        state = 0
+        for symbol in pattern:
+            nxt = self._delta[state].get(symbol)
+            if nxt is None:
+                nxt = len(self._delta)
+                self._delta[state][symbol] = nxt
+                self._delta.append({})
+                self._fail.append(0)
+                self._out.append(-1)
+            state = nxt
+        self._out[state] = len(self.patterns)
+        self.patterns.append(pattern)
+
+    def _compile(self) -> None:
+        # Breadth-first, so a state's failure target is complete before the
+        # state inherits its transitions and output.
+        queue = list(self._delta[0].values())
+        for state in queue:
+            fallback = self._fail[state]
+            for symbol, nxt in list(self._delta[state].items()):
+                queue.append(nxt)
+                self._fail[nxt] = self._delta[fallback].get(symbol, 0)
+            if self._out[state] < 0:
+                self._out[state] = self._out[fallback]
+            for symbol, nxt in self._delta[fallback].items():
+                self._delta[state].setdefault(symbol, nxt)
+
+    def first(self, symbols: Iterable[Hashable]) -> Optional[Tuple[int, int]]:
+        """(end offset, pattern index) of the first match, or None."""
+        delta, out = self._delta, self._out
+        state = 0
+        for i, symbol in enumerate(symbols):
+            state = delta[state].get(symbol, 0)
+            if out[state] >= 0:
+                return i, out[state]
+        return None
+
+    def find_all(self, symbols: Iterable[Hashable]) -> List[Tuple[int, int]]:
+        """Every (end offset, pattern index) match, including overlaps."""
+        delta, fail, out = self._delta, self._fail, self._out
+        hits: List[Tuple[int, int]] = []
+        state = 0
+        for i, symbol in enumerate(symbols):
+            state = delta[state].get(symbol, 0)
+            probe = state
+            while out[probe] >= 0:
+                if not hits or hits[-1] != (i, out[probe]):
+                    hits.append((i, out[probe]))
+                probe = fail[probe]
+        return hits
+
+
+class CrisisDetector:
+    """
+    Flags self-harm / suicidal language in user text before it reaches the
+    LLM, so the caller can answer with the helpline phrase immediately.
+
+    Phrases match on whole words ("kill myself" will not fire on "skill
+    myself"). This is a fast pre-filter, not a classifier; the full LLM
+    reply still follows.
+    """
+
+    def __init__(self, phrases: Iterable[str] = CRISIS_PHRASES) -> None:
+        self.phrases = [p for p in phrases if crisis_tokens(p)]
+        self._matcher = AhoCorasick(crisis_tokens(p) for p in self.phrases)
+
+    def match(self, text: Optional[str]) -> Optional[str]:
+        """The first crisis phrase found in `text`, or None."""
+        if not text:
+            return None
+        hit = self._matcher.first(crisis_tokens(text))
+        return " ".join(map(str, self._matcher.patterns[hit[1]])) if hit else None
+
+
+crisis_detector = CrisisDetector()
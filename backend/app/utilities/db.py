@@ -1,5 +1,10 @@
-from typing import AsyncGenerator, Optional, Any
+from collections import deque
+from typing import Any, AsyncGenerator, Deque, Dict, Optional, Type
+from uuid import uuid4
+import asyncio
+import os
 import re
+import time
 
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -7,9 +12,8 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy import create_engine, Engine
-from sqlalchemy.pool import NullPool
-from sqlmodel import SQLModel
+from sqlalchemy import create_engine, Engine, event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, NullPool
 
 from app.config import settings
 from app.utilities.logger import logger
@@ -35,12 +39,162 @@ def _make_async_uri(db_uri: str) -> str:
 _async_db_uri = _make_async_uri(settings.db_uri)
 log.debug("Async DB URI: %s", re.sub(r"://.*?:.*?@", "://<redacted>@", _async_db_uri))
 
-async_engine: AsyncEngine = create_async_engine(
-    _async_db_uri,
-    echo=False,
-    pool_pre_ping=True,
+
+class PoolStats:
+    """
+    Connection pool counters for this worker. Checkout waits are timed in
+    InstrumentedPool; the rest comes from pool events. Totals are since
+    startup; percentiles cover the last WAIT_SAMPLES checkouts.
+    """
+
+    WAIT_SAMPLES = 1024
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.disconnects = 0
+        self.peak_checked_out = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self._waits: Deque[float] = deque(maxlen=self.WAIT_SAMPLES)
+
+    def record_wait(self, ms: float) -> None:
+        self.checkouts += 1
+        self.wait_total_ms += ms
+        self.wait_max_ms = max(self.wait_max_ms, ms)
+        self._waits.append(ms)
+
+    def snapshot(self, engine: AsyncEngine) -> Dict[str, Any]:
+        pool = engine.sync_engine.pool
+        waits = sorted(self._waits)
+        size = getattr(pool, "size", lambda: 0)()
+        max_overflow = getattr(pool, "_max_overflow", 0)
+        return {
+            "pid": os.getpid(),
+            "web_concurrency": os.getenv("WEB_CONCURRENCY"),
+            "pool_size": size,
+            "max_overflow": max_overflow,
+            "max_connections": size + max(max_overflow, 0),
+            "checked_out": getattr(pool, "checkedout", lambda: 0)(),
+            "checked_in": getattr(pool, "checkedin", lambda: 0)(),
+            # SQLAlchemy counts unopened pool_size slots as negative overflow
+            "overflow": max(0, getattr(pool, "overflow", lambda: 0)()),
+            "peak_checked_out": self.peak_checked_out,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "wait_avg_ms": (
+                round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0
+            ),
+            "wait_p95_ms": (
+                round(waits[int(0.95 * (len(waits) - 1))], 3) if waits else 0.0
+            ),
+            "wait_max_ms": round(self.wait_max_ms, 3),
+        }
+
+
+pool_stats = PoolStats()
+replica_pool_stats = PoolStats()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times how long each checkout waited."""
+
+    stats = pool_stats
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+            self.stats.peak_checked_out = max(
+                self.stats.peak_checked_out, self.checkedout()
+            )
+            return record
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.record_wait((time.perf_counter() - start) * 1000)
+
+
+class ReplicaPool(InstrumentedPool):
+    stats = replica_pool_stats
+
+
+def _connect_args(db_uri: str) -> Dict[str, Any]:
+    if "+asyncpg" not in db_uri:
+        return {}
+    args: Dict[str, Any] = {"timeout": settings.db_connect_timeout_seconds}
+    if settings.db_command_timeout_seconds > 0:
+        args["command_timeout"] = settings.db_command_timeout_seconds
+    if settings.db_pgbouncer:
+        # Transaction pooling hands each transaction a different server
+        # connection, so named prepared statements cannot be reused.
+        args["statement_cache_size"] = 0
+        args["prepared_statement_cache_size"] = 0
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    else:
+        args["statement_cache_size"] = settings.db_statement_cache_size
+        args["prepared_statement_cache_size"] = settings.db_statement_cache_size
+    return args
+
+
+def _make_engine(db_uri: str, poolclass: Type[InstrumentedPool]) -> AsyncEngine:
+    engine = create_async_engine(
+        db_uri,
+        echo=False,
+        poolclass=poolclass,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=_connect_args(db_uri),
+    )
+    stats = poolclass.stats
+
+    # Instead of pre-ping's round trip per checkout: pool_recycle retires
+    # connections before server or PgBouncer idle timeouts close them, a
+    # connection whose socket asyncpg has already seen close is swapped at
+    # checkout for free, and a disconnect error mid-query invalidates the
+    # whole pool so the next checkout reconnects.
+    @event.listens_for(engine.sync_engine, "checkout")
+    def _drop_closed(dbapi_conn: Any, record: ConnectionPoolEntry, proxy: Any) -> None:
+        driver = record.driver_connection
+        if driver is not None and getattr(driver, "is_closed", lambda: False)():
+            stats.disconnects += 1
+            raise exc.DisconnectionError("connection closed while idle in the pool")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _count_connect(dbapi_conn: Any, record: ConnectionPoolEntry) -> None:
+        stats.connects += 1
+
+    return engine
+
+
+async_engine: AsyncEngine = _make_engine(_async_db_uri, InstrumentedPool)
+
+# Optional read replica; only get_read_db (utilities/replica) reads from it.
+replica_engine: Optional[AsyncEngine] = (
+    _make_engine(_make_async_uri(settings.db_replica_uri), ReplicaPool)
+    if settings.db_replica_uri
+    else None
 )
 
+
+async def log_pool_stats(
+    interval_seconds: float = settings.db_pool_stats_interval_seconds,
+) -> None:
+    """Log this worker's pool snapshot periodically (started from the lifespan)."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        log.info("DB pool %s", pool_stats.snapshot(async_engine))
+        if replica_engine is not None:
+            log.info("DB replica pool %s", replica_pool_stats.snapshot(replica_engine))
+
+
 async_session: async_sessionmaker[AsyncSession] = async_sessionmaker(
     bind=async_engine,
     expire_on_commit=False,
@@ -66,21 +220,6 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
-async def init_models(engine: Optional[AsyncEngine] = None) -> None:
-    """
-    Create tables for all SQLModel models.
-    Call at app startup if you want SQLAlchemy to create tables automatically.
-    """
-    eng = engine or async_engine
-    async with eng.begin() as conn:
-        # Use checkfirst=True to avoid "table already exists" errors
-        def create_tables(connection: Any) -> None:
-            SQLModel.metadata.create_all(connection, checkfirst=True)
-
-        await conn.run_sync(create_tables)
-    log.info("Database tables created (if they did not exist).")
-
-
 def get_sync_engine(db_uri: Optional[str] = None) -> Engine:
     """
     Return a synchronous SQLAlchemy Engine. Useful for Alembic or scripts that are sync-only.
@@ -0,0 +1,130 @@
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+
+CACHE_CONTROL = "public, no-cache"
+
+
+@dataclass
+class CachedResponse:
+    """A rendered body plus the validators sent with it."""
+
+    body: bytes
+    last_modified: datetime
+    headers: Dict[str, str] = field(default_factory=dict)
+    etag: str = ""
+    media_type: str = "application/json"
+
+    def __post_init__(self) -> None:
+        if not self.etag:
+            # strong validator: any byte difference in the body changes it
+            self.etag = (
+                '"' + hashlib.blake2b(self.body, digest_size=16).hexdigest() + '"'
+            )
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison, so a W/ prefix is ignored
+    candidates = [c.strip() for c in header.split(",")]
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
+
+
+def is_not_modified(request: Request, cached: CachedResponse) -> bool:
+    """
+    True if the client's copy is current. If-None-Match wins over
+    If-Modified-Since when both are sent (RFC 9110 13.2.2).
+    """
+    inm = request.headers.get("if-none-match")
+    if inm is not None:
+        return _etag_matches(inm, cached.etag)
+    ims = request.headers.get("if-modified-since")
+    if ims is not None:
+        try:
+            since = parsedate_to_datetime(ims)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return cached.last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def cached_response(
+    request: Request, cached: CachedResponse, cache_control: str = CACHE_CONTROL
+) -> Response:
+    """200 with the cached body, or a bodiless 304 if the client is current."""
+    headers = {
+        "ETag": cached.etag,
+        "Last-Modified": format_datetime(cached.last_modified, usegmt=True),
+        "Cache-Control": cache_control,
+    }
+    if is_not_modified(request, cached):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=cached.body,
+        media_type=cached.media_type,
+        headers={**cached.headers, **headers},
+    )
+
+
+class ResponseCache:
+    """
+    Bounded LRU of rendered responses with a TTL, for public read endpoints.
+
+    Writers call invalidate()/clear(), which also bump `generation`; readers
+    capture the generation before querying and pass it to put(), so a page
+    rendered from pre-write rows is never stored after the write cleared it.
+    The cache is per process: other workers see a write once their entries
+    expire, which is what the TTL bounds.
+    """
+
+    def __init__(self, *, maxsize: int, ttl_seconds: float) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0
+        # wall-clock time of the last invalidation; Last-Modified never
+        # predates it, so deletions also move the validator forward
+        self.changed_at = datetime.now(timezone.utc)
+        self._entries: "OrderedDict[Hashable, Tuple[float, CachedResponse]]" = (
+            OrderedDict()
+        )
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        hit = self._entries.get(key)
+        if hit is None:
+            return None
+        expires_at, cached = hit
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return cached
+
+    def put(self, key: Hashable, cached: CachedResponse, generation: int) -> None:
+        if self.maxsize <= 0 or generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, cached)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def last_modified(self, stamps: Iterable[Optional[datetime]]) -> datetime:
+        return max([self.changed_at, *(s for s in stamps if s is not None)])
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+        self._touch()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._touch()
+
+    def _touch(self) -> None:
+        self.generation += 1
+        self.changed_at = datetime.now(timezone.utc)
@@ -0,0 +1,80 @@
+import os
+import threading
+import time
+import uuid
+from typing import Any, Optional
+
+from sqlalchemy import Uuid
+from sqlalchemy.engine import Dialect
+from sqlalchemy.types import TypeDecorator
+
+_RAND_A_MASK = (1 << 12) - 1
+_RAND_B_MASK = (1 << 62) - 1
+
+
+_lock = threading.Lock()
+_last = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    UUIDv7 (RFC 9562): a 48-bit Unix millisecond timestamp followed by 74
+    random bits. Keys made later sort later, so inserts land on the right
+    edge of the primary-key B-tree instead of on a random page, and the
+    newest rows share a few hot pages.
+
+    Within this process each one is also greater than the last (the random
+    bits are incremented instead when the clock has not moved on), so
+    inserts from one worker always append to the rightmost leaf.
+    """
+    ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (ms & ((1 << 48) - 1)) << 80
+        | 0x7 << 76
+        | ((rand >> 62) & _RAND_A_MASK) << 64
+        | 0b10 << 62
+        | (rand & _RAND_B_MASK)
+    )
+    global _last
+    with _lock:
+        if value <= _last:
+            if _last & _RAND_B_MASK != _RAND_B_MASK:
+                value = _last + 1  # stays within the low random bits
+            else:
+                # low bits used up within one millisecond: borrow the next
+                value = ((_last >> 80) + 1) << 80 | 0x7 << 76 | 0b10 << 62
+        _last = value
+    return uuid.UUID(int=value)
+
+
+def gen_uuid() -> str:
+    """New primary key, as the canonical string the models and API use."""
+    return str(uuid7())
+
+
+def canonical_uuid(value: Any) -> Optional[str]:
+    """`value` as a lower-case hyphenated UUID string, or None if it is not one."""
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return None
+
+
+class UUIDString(TypeDecorator[str]):
+    """
+    Native `uuid` column (16 bytes) that the application sees as `str`, the
+    type ids have always had in models, tokens and JSON.
+
+    A value that is not a UUID is bound as NULL: it can match no row, so a
+    lookup such as GET /api/journals/nope stays a 404 rather than a driver
+    error. Writing one to a nullable reference would store NULL instead of
+    failing its foreign key, so ids taken from a request are looked up
+    (which also checks ownership) before they are written.
+    """
+
+    impl = Uuid(as_uuid=False)
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: Dialect) -> Optional[str]:
+        return None if value is None else canonical_uuid(value)
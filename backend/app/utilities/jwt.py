@@ -8,8 +8,6 @@ JWT_SECRET = os.environ.get("JWT_SECRET", "@123#")
 JWT_ALGORITHM = os.environ.get("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_HOURS = int(os.environ.get("JWT_ACCESS_TOKEN_EXPIRE_HOURS", "24"))
 
-BLACKLIST = set()
-
 
 def _make_jti() -> str:
     import uuid
@@ -38,14 +36,7 @@ def create_access_token(identity: str) -> str:
 def decode_token(token: str) -> Dict[str, Any]:
     """
     Decode and verify token. Raises jwt exceptions on invalid/expired token.
-    Also checks blacklist.
+    Revocation (logout) is checked separately, see utilities/revocation.
     """
-    payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-    jti = payload.get("jti")
-    if jti in BLACKLIST:
-        raise jwt.InvalidTokenError("Token revoked")
-    return payload
-
+    return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
 
-def revoke_jti(jti: str) -> None:
-    BLACKLIST.add(jti)
@@ -0,0 +1,202 @@
+import argparse
+import asyncio
+import importlib
+import pkgutil
+import re
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.utilities.db import async_engine
+from app.utilities.logger import logger
+from app.utilities.slow_queries import SKIP_OPTION
+
+log = logger(__name__)
+
+MIGRATIONS_PACKAGE = "app.migrations"
+VERSION_TABLE = "schema_migrations"
+# pg_advisory_lock key held while migrating, so two runners never interleave
+_LOCK_KEY = 0x48454152  # "HEAR"
+# kept out of the slow query log: waiting for the lock is not a slow query
+_LOCK = text("SELECT pg_advisory_lock(:k)").execution_options(**{SKIP_OPTION: True})
+_UNLOCK = text("SELECT pg_advisory_unlock(:k)").execution_options(**{SKIP_OPTION: True})
+_MODULE_NAME = re.compile(r"^m(\d{4})_(\w+)$")
+
+UpgradeFn = Callable[[AsyncConnection], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: UpgradeFn
+    # False for steps Postgres refuses inside a transaction, such as
+    # CREATE INDEX CONCURRENTLY; they run in autocommit mode instead.
+    transactional: bool = True
+
+
+def discover() -> List[Migration]:
+    """
+    Every `app/migrations/mNNNN_<name>.py` module, in version order. Each
+    defines `async def upgrade(conn)` and may set `TRANSACTIONAL = False`.
+    """
+    package = importlib.import_module(MIGRATIONS_PACKAGE)
+    found: List[Migration] = []
+    for info in pkgutil.iter_modules(package.__path__):
+        match = _MODULE_NAME.match(info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{MIGRATIONS_PACKAGE}.{info.name}")
+        found.append(
+            Migration(
+                version=int(match.group(1)),
+                name=match.group(2),
+                upgrade=module.upgrade,
+                transactional=getattr(module, "TRANSACTIONAL", True),
+            )
+        )
+    found.sort(key=lambda m: m.version)
+    for previous, current in zip(found, found[1:]):
+        if previous.version == current.version:
+            raise RuntimeError(f"Duplicate migration version {current.version}")
+    return found
+
+
+def latest_version() -> int:
+    migrations = discover()
+    return migrations[-1].version if migrations else 0
+
+
+async def current_version(conn: AsyncConnection) -> Optional[int]:
+    """Newest applied version, or None if migrations never ran here."""
+    exists = (
+        await conn.execute(text("SELECT to_regclass(:t)"), {"t": VERSION_TABLE})
+    ).scalar()
+    if exists is None:
+        return None
+    return (
+        await conn.execute(text(f"SELECT max(version) FROM {VERSION_TABLE}"))
+    ).scalar()
+
+
+async def upgrade(
+    engine: Optional[AsyncEngine] = None, target: Optional[int] = None
+) -> List[int]:
+    """
+    Apply pending migrations up to `target` (default: all) and return the
+    versions applied. Each one commits together with its schema_migrations
+    row, so a failure leaves the database at the previous version.
+    """
+    eng = engine or async_engine
+    migrations = [m for m in discover() if target is None or m.version <= target]
+    applied: List[int] = []
+    async with eng.connect() as conn:
+        await conn.execute(_LOCK, {"k": _LOCK_KEY})
+        await conn.commit()
+        try:
+            await conn.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+                    "version INTEGER PRIMARY KEY, "
+                    "name VARCHAR(128) NOT NULL, "
+                    "applied_at TIMESTAMPTZ NOT NULL DEFAULT now(), "
+                    "duration_ms INTEGER NOT NULL)"
+                )
+            )
+            done = set(
+                (await conn.execute(text(f"SELECT version FROM {VERSION_TABLE}")))
+                .scalars()
+                .all()
+            )
+            await conn.commit()
+
+            for migration in migrations:
+                if migration.version in done:
+                    continue
+                log.info(
+                    "Applying migration %04d_%s", migration.version, migration.name
+                )
+                start = time.perf_counter()
+                if migration.transactional:
+                    await migration.upgrade(conn)
+                else:
+                    async with eng.connect() as raw:
+                        auto = await raw.execution_options(isolation_level="AUTOCOMMIT")
+                        await migration.upgrade(auto)
+                await conn.execute(
+                    text(
+                        f"INSERT INTO {VERSION_TABLE} (version, name, duration_ms) "
+                        "VALUES (:version, :name, :ms)"
+                    ),
+                    {
+                        "version": migration.version,
+                        "name": migration.name,
+                        "ms": int((time.perf_counter() - start) * 1000),
+                    },
+                )
+                await conn.commit()
+                applied.append(migration.version)
+        finally:
+            await conn.rollback()
+            await conn.execute(_UNLOCK, {"k": _LOCK_KEY})
+            await conn.commit()
+    return applied
+
+
+async def check_schema(engine: Optional[AsyncEngine] = None) -> int:
+    """
+    Startup check: one query, no DDL. Refuses to start against a database
+    older than this build; a newer one is allowed, as during a rolling
+    deploy where the next release has already migrated.
+    """
+    eng = engine or async_engine
+    async with eng.connect() as conn:
+        current = await current_version(conn)
+    latest = latest_version()
+    if current is None or current < latest:
+        raise RuntimeError(
+            f"Database schema is at version {current or 0}, this build needs "
+            f"{latest}; run `python -m app.utilities.migrations upgrade` first"
+        )
+    if current > latest:
+        log.warning(
+            "Database schema version %s is newer than this build (%s)",
+            current,
+            latest,
+        )
+    return current
+
+
+async def _main(command: str, target: Optional[int], seed: bool) -> None:
+    if command == "upgrade":
+        applied = await upgrade(target=target)
+        print(f"applied {len(applied)} migration(s): {applied}")
+        if seed:
+            # Imported here: the User mapper needs every model registered.
+            import app.main  # noqa: F401
+            from app.services.auth.auth import create_default_admin_if_missing
+            from app.utilities.db import async_session
+
+            async with async_session() as session:
+                await create_default_admin_if_missing(session)
+    async with async_engine.connect() as conn:
+        current = await current_version(conn)
+    print(f"schema version {current or 0} (latest {latest_version()})")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    # python -m app.utilities.migrations upgrade   (one-shot / init container)
+    parser = argparse.ArgumentParser(description="Database schema migrations.")
+    parser.add_argument("command", choices=["upgrade", "current"], nargs="?")
+    parser.add_argument("--to", type=int, default=None, help="stop at this version")
+    parser.add_argument(
+        "--no-seed",
+        action="store_true",
+        help="skip creating the default admin after upgrading",
+    )
+    args = parser.parse_args()
+    asyncio.run(_main(args.command or "upgrade", args.to, not args.no_seed))
@@ -0,0 +1,132 @@
+import base64
+import binascii
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar, Union
+
+from fastapi import Response
+from sqlalchemy import asc, desc, func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+T = TypeVar("T")
+CursorId = Union[str, int]
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+    def headers(self) -> Dict[str, str]:
+        out = {}
+        if self.next_cursor:
+            out[NEXT_CURSOR_HEADER] = self.next_cursor
+        if self.total is not None:
+            out[TOTAL_COUNT_HEADER] = str(self.total)
+        return out
+
+    def set_headers(self, response: Response) -> None:
+        """Expose paging state on list endpoints whose body is a bare array."""
+        response.headers.update(self.headers())
+
+
+def encode_key(*values: Any) -> str:
+    """Opaque, URL-safe cursor for an arbitrary JSON-able sort key."""
+    raw = json.dumps(list(values), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_key(cursor: str, size: int) -> List[Any]:
+    """Inverse of encode_key; raises ValueError for anything malformed."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def encode_cursor(created_at: datetime, ident: CursorId) -> str:
+    return encode_key(created_at.isoformat(), ident)
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, CursorId]:
+    created_at, ident = decode_key(cursor, 2)
+    if not isinstance(created_at, str) or not isinstance(ident, (str, int)):
+        raise ValueError("Invalid cursor")
+    try:
+        return datetime.fromisoformat(created_at), ident
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select[Any],
+    *,
+    created_col: Any,
+    id_col: Any,
+    cursor: Optional[str] = None,
+    limit: int = 10,
+    descending: bool = True,
+) -> Page[Any]:
+    """
+    Keyset pagination on (created_at, id): each page seeks past the last row
+    of the previous one, so page 100 costs the same as page 1. `stmt` must
+    select a single entity and carry no ORDER BY of its own.
+    """
+    if cursor:
+        created_at, ident = decode_cursor(cursor)
+        key = tuple_(created_col, id_col)
+        after = tuple_(literal(created_at), literal(ident, id_col.type))
+        stmt = stmt.where(key < after if descending else key > after)
+
+    order = desc if descending else asc
+    stmt = stmt.order_by(order(created_col), order(id_col)).limit(limit + 1)
+    rows = list((await db.execute(stmt)).scalars().all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            getattr(last, created_col.key), getattr(last, id_col.key)
+        )
+    return Page(items=rows, next_cursor=next_cursor)
+
+
+# (expires_at, total) per caller-chosen key
+_totals: Dict[Hashable, Tuple[float, int]] = {}
+_TOTALS_MAX_KEYS = 4096
+
+
+async def cached_total(db: AsyncSession, stmt: Select[Any], key: Hashable) -> int:
+    """
+    count(*) over `stmt`, reused for PAGINATION_TOTAL_TTL_SECONDS. Totals are
+    only computed when a client asks for them, and a stale-by-seconds count
+    is fine for "N entries" labels.
+    """
+    now = time.monotonic()
+    hit = _totals.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+
+    total = int(
+        (
+            await db.execute(select(func.count()).select_from(stmt.subquery()))
+        ).scalar_one()
+    )
+    if len(_totals) >= _TOTALS_MAX_KEYS:
+        _totals.clear()
+    _totals[key] = (now + settings.pagination_total_ttl_seconds, total)
+    return total
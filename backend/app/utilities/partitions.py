@@ -0,0 +1,170 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, List, Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# Append-only tables range-partitioned by month on created_at (see
+# migrations/m0005). Rows outside every monthly partition land in
+# <table>_default until maintenance gives their month a partition.
+PARTITIONED_TABLES: List[str] = ["eve_messages", "messages"]
+
+# Reads of one session's or journal's messages are bounded below by the
+# month it was created in (see month_floor). Some of those timestamps come
+# from app hosts and some from the database clock; the bound is taken this
+# much earlier so clock skew cannot hide a message.
+_CLOCK_SLACK = timedelta(hours=1)
+
+
+@dataclass(frozen=True, order=True)
+class Month:
+    year: int
+    month: int
+
+    @classmethod
+    def of(cls, value: datetime) -> "Month":
+        value = value.astimezone(timezone.utc) if value.tzinfo else value
+        return cls(value.year, value.month)
+
+    @classmethod
+    def parse(cls, value: str) -> "Month":
+        """'2025-03' -> Month(2025, 3)"""
+        parsed = datetime.strptime(value, "%Y-%m")
+        return cls(parsed.year, parsed.month)
+
+    def plus(self, months: int) -> "Month":
+        index = self.year * 12 + self.month - 1 + months
+        return Month(index // 12, index % 12 + 1)
+
+    @property
+    def start(self) -> datetime:
+        return datetime(self.year, self.month, 1, tzinfo=timezone.utc)
+
+    @property
+    def end(self) -> datetime:
+        return self.plus(1).start
+
+    def __str__(self) -> str:
+        return f"{self.year:04d}-{self.month:02d}"
+
+
+def month_floor(created_at: Any) -> Any:
+    """
+    Lower bound for the messages of a session or journal created at
+    `created_at`, a datetime or a SQL expression: the start of its month.
+    `Message.created_at >= month_floor(...)` lets Postgres skip every
+    earlier partition, while the planner still sees whole partitions and
+    estimates their rows well enough to read the index in order.
+    """
+    if isinstance(created_at, datetime):
+        return Month.of(created_at - _CLOCK_SLACK).start
+    return func.date_trunc("month", created_at - _CLOCK_SLACK, "UTC")
+
+
+def partition_name(table: str, month: Month) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def default_partition(table: str) -> str:
+    return f"{table}_default"
+
+
+def current_month() -> Month:
+    return Month.of(datetime.now(timezone.utc))
+
+
+async def is_partitioned(conn: AsyncConnection, table: str) -> bool:
+    kind = (
+        await conn.execute(
+            text("SELECT relkind::text FROM pg_class WHERE oid = to_regclass(:t)"),
+            {"t": table},
+        )
+    ).scalar()
+    return kind == "p"
+
+
+async def list_partitions(conn: AsyncConnection, table: str) -> List[Month]:
+    """Months that have a partition attached to `table`, oldest first."""
+    names = (
+        (
+            await conn.execute(
+                text(
+                    "SELECT c.relname FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = to_regclass(:t)"
+                ),
+                {"t": table},
+            )
+        )
+        .scalars()
+        .all()
+    )
+    prefix = f"{table}_y"
+    months = []
+    for name in names:
+        if name.startswith(prefix):
+            months.append(Month(int(name[-7:-3]), int(name[-2:])))
+    return sorted(months)
+
+
+async def default_months(conn: AsyncConnection, table: str) -> List[Month]:
+    """Months with rows in `table`'s default partition, oldest first."""
+    starts = (
+        await conn.execute(
+            text(
+                "SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC') "
+                f"FROM {default_partition(table)} ORDER BY 1"
+            )
+        )
+    ).scalars()
+    return [Month.of(start) for start in starts]
+
+
+async def create_partition(
+    conn: AsyncConnection,
+    table: str,
+    month: Month,
+    fill: Optional[Callable[[str], Awaitable[None]]] = None,
+) -> Optional[str]:
+    """
+    Attach a partition for `month` unless it has one, moving any of its
+    rows out of the default partition first (Postgres refuses to attach a
+    range the default partition still holds rows for). `fill(name)` can
+    load the new table before it is attached. Returns the new partition's
+    name, or None if it already existed.
+    """
+    name = partition_name(table, month)
+    if (
+        await conn.execute(text("SELECT to_regclass(:n)"), {"n": name})
+    ).scalar() is not None:
+        return None
+    bounds = {"lo": month.start, "hi": month.end}
+    await conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)"))
+    if fill is not None:
+        await fill(name)
+    await conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {default_partition(table)} "
+            "WHERE created_at >= :lo AND created_at < :hi RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    # indexes and the primary key come from the parent's on ATTACH
+    await conn.execute(
+        text(
+            f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES "
+            f"FROM ('{month.start.isoformat()}') TO ('{month.end.isoformat()}')"
+        )
+    )
+    return name
+
+
+def month_range(first: Month, last: Month) -> List[Month]:
+    months = []
+    month = first
+    while month <= last:
+        months.append(month)
+        month = month.plus(1)
+    return months
@@ -0,0 +1,89 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.config import settings
+
+# Pinning min = max = default rounds makes needs_update() flag any hash made
+# with a different BCRYPT_ROUNDS, so logins upgrade (or downgrade) it.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
+
+
+def hash_password_sync(raw_password: str) -> str:
+    return pwd_context.hash(raw_password)
+
+
+def verify_password_sync(
+    raw_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """(matches, replacement hash if the stored one uses stale parameters)"""
+    return pwd_context.verify_and_update(raw_password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop. Each hash costs 100-300 ms of CPU, so
+    calling it inline stalls every other request on the worker.
+
+    "thread" is enough for the bcrypt package, which releases the GIL while
+    hashing; "process" sidesteps the GIL for backends that do not. At most
+    PASSWORD_HASH_WORKERS hashes run at once; further callers wait on the
+    semaphore instead of piling into the executor queue.
+    """
+
+    def __init__(self, *, mode: str, workers: int) -> None:
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown password hash executor {mode!r}")
+        self.mode = mode
+        self.workers = max(1, workers)
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _ensure(self) -> Tuple[Executor, asyncio.Semaphore]:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt"
+                )
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        return self._executor, self._slots
+
+    async def hash(self, raw_password: str) -> str:
+        executor, slots = self._ensure()
+        async with slots:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, hash_password_sync, raw_password
+            )
+
+    async def verify(
+        self, raw_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        if not hashed_password:
+            return False, None
+        executor, slots = self._ensure()
+        async with slots:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, verify_password_sync, raw_password, hashed_password
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._slots = None
+
+
+password_hasher = PasswordHasher(
+    mode=settings.password_hash_executor, workers=settings.password_hash_workers
+)
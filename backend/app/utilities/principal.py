@@ -0,0 +1,183 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.config import settings
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Immutable snapshot of the authenticated user, enough for ownership and
+    admin checks and for author names. Routes that modify the user itself
+    load the ORM row instead (get_current_user_record).
+    """
+
+    id: str
+    email: str
+    name: Optional[str]
+    username: Optional[str]
+    is_admin: bool
+    photo_version: Optional[str]
+    created_at: Optional[datetime]
+    jti: Optional[str] = None
+    token_expires_at: Optional[datetime] = None
+
+    @classmethod
+    def from_user(
+        cls,
+        user: User,
+        jti: Optional[str] = None,
+        token_expires_at: Optional[datetime] = None,
+    ) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            username=user.username,
+            is_admin=user.is_admin,
+            photo_version=user.photo_version,
+            created_at=user.created_at,
+            jti=jti,
+            token_expires_at=token_expires_at,
+        )
+
+    @property
+    def photo_url(self) -> Optional[str]:
+        if not self.photo_version:
+            return None
+        return f"/api/users/{self.id}/photo?v={self.photo_version}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "username": self.username,
+            "email": self.email,
+            "is_admin": self.is_admin,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "photo_url": self.photo_url,
+        }
+
+
+class PrincipalCache:
+    """
+    Verified bearer token -> Principal, so repeat requests on the same token
+    skip JWT verification and the users lookup. Bounded LRU; an entry lives
+    for PRINCIPAL_CACHE_TTL_SECONDS or until the token expires, whichever
+    is sooner.
+
+    Entries are indexed by jti (logout) and user id (profile or role
+    changes) for explicit invalidation. As in ResponseCache, readers pass
+    the `generation` seen before their users lookup to put(), so a snapshot
+    read before an invalidation is never stored after it. The cache is per
+    process, so the TTL bounds how long another worker can serve a stale
+    snapshot.
+    """
+
+    def __init__(self, *, maxsize: int, ttl_seconds: float) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self._by_jti: Dict[str, str] = {}
+        self._by_user: Dict[str, Set[str]] = {}
+
+    def get(self, token: str) -> Optional[Principal]:
+        hit = self._entries.get(token)
+        if hit is None:
+            return None
+        expires_at, principal = hit
+        if expires_at <= time.monotonic():
+            self._drop(token)
+            return None
+        self._entries.move_to_end(token)
+        return principal
+
+    def put(
+        self,
+        token: str,
+        principal: Principal,
+        generation: int,
+        token_exp: Any = None,
+    ) -> None:
+        if self.maxsize <= 0 or generation != self.generation:
+            return
+        ttl = self.ttl_seconds
+        if isinstance(token_exp, (int, float)):
+            ttl = min(ttl, token_exp - time.time())
+        if ttl <= 0:
+            return
+        self._drop(token)
+        self._entries[token] = (time.monotonic() + ttl, principal)
+        if principal.jti:
+            self._by_jti[principal.jti] = token
+        self._by_user.setdefault(principal.id, set()).add(token)
+        while len(self._entries) > self.maxsize:
+            self._drop(next(iter(self._entries)))
+
+    def invalidate_jti(self, jti: str) -> None:
+        self.generation += 1
+        token = self._by_jti.get(jti)
+        if token is not None:
+            self._drop(token)
+
+    def invalidate_user(self, user_id: str) -> None:
+        self.generation += 1
+        for token in list(self._by_user.get(user_id, ())):
+            self._drop(token)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+        self._by_jti.clear()
+        self._by_user.clear()
+
+    def _drop(self, token: str) -> None:
+        hit = self._entries.pop(token, None)
+        if hit is None:
+            return
+        principal = hit[1]
+        if principal.jti and self._by_jti.get(principal.jti) == token:
+            del self._by_jti[principal.jti]
+        tokens = self._by_user.get(principal.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._by_user[principal.id]
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.principal_cache_entries,
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+)
+
+# Any committed change to a users row drops that user's cached principals.
+# This runs after commit, not at flush: until then other sessions can still
+# read, and re-cache, the old row.
+_CHANGED_USERS = "principal_cache_changed_users"
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper: Any, connection: Any, target: User) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_CHANGED_USERS, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    for user_id in session.info.pop(_CHANGED_USERS, ()):
+        principal_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_changed_users(session: Session, previous_transaction: Any) -> None:
+    session.info.pop(_CHANGED_USERS, None)
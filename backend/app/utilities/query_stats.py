@@ -0,0 +1,138 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, List, MutableMapping, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.utilities.db import async_engine, replica_engine
+from app.utilities.slow_queries import SKIP_OPTION, slow_queries
+
+QUERY_STATS_HEADER = "X-DB-Queries"
+
+
+@dataclass
+class QueryStats:
+    """SQL statements issued while tracking was active (one request, usually)."""
+
+    statements: int = 0
+    total_ms: float = 0.0
+    # statement text (bind parameters stay placeholders) -> executions
+    fingerprints: "Counter[str]" = field(default_factory=Counter)
+    # the request's ASGI scope, for route attribution
+    scope: Optional[MutableMapping[str, Any]] = field(default=None, repr=False)
+
+    @property
+    def route(self) -> Optional[str]:
+        """e.g. `GET /api/journals/{journal_id}`, once the request is routed."""
+        if self.scope is None:
+            return None
+        path = getattr(self.scope.get("route"), "path", None) or self.scope.get("path")
+        return f"{self.scope.get('method')} {path}"
+
+    def repeated(
+        self, threshold: int = settings.query_repeat_threshold
+    ) -> List[Tuple[str, int]]:
+        """Statements run `threshold` or more times: likely N+1 lazy loads."""
+        if threshold <= 0:
+            return []
+        return [
+            (sql, n) for sql, n in self.fingerprints.most_common() if n >= threshold
+        ]
+
+    def header(self) -> str:
+        """X-DB-Queries value, e.g. `4;dur=2.7` (statements; milliseconds)."""
+        return f"{self.statements};dur={self.total_ms:.1f}"
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+# finished per-request stats go to these callbacks (benchmarks/query_budget)
+_recorders: List[Callable[[str, str, QueryStats], None]] = []
+
+
+@contextmanager
+def track_queries(
+    scope: Optional[MutableMapping[str, Any]] = None,
+) -> Iterator[QueryStats]:
+    """
+    Count statements run in this context and in tasks it starts. Nested
+    tracking counts toward the innermost block only.
+    """
+    stats = QueryStats(scope=scope)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def record_request(method: str, path: str, stats: QueryStats) -> None:
+    for recorder in _recorders:
+        recorder(method, path, stats)
+
+
+def _before(
+    conn: Any, cursor: Any, statement: str, params: Any, context: Any, many: bool
+) -> None:
+    conn.info.setdefault("query_stats_start", []).append(time.perf_counter())
+
+
+def _finished(conn: Any, statement: str, params: Any, many: bool, options: Any) -> None:
+    starts = conn.info.get("query_stats_start")
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000 if starts else 0.0
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.total_ms += elapsed_ms
+        stats.fingerprints[statement] += 1
+    if 0 < slow_queries.threshold_ms <= elapsed_ms and not options.get(SKIP_OPTION):
+        slow_queries.record(
+            conn.engine,
+            statement,
+            params,
+            many,
+            elapsed_ms,
+            stats.route if stats is not None else None,
+        )
+
+
+def _after(
+    conn: Any, cursor: Any, statement: str, params: Any, context: Any, many: bool
+) -> None:
+    # the connection's options merged with the statement's own
+    _finished(conn, statement, params, many, context.execution_options)
+
+
+def _error(context: Any) -> None:
+    # failed statements count too; after_cursor_execute never fires for them
+    if context.connection is not None and context.statement is not None:
+        execution = context.execution_context
+        _finished(
+            context.connection,
+            context.statement,
+            context.parameters,
+            bool(execution and execution.executemany),
+            (
+                execution.execution_options
+                if execution
+                else context.connection.get_execution_options()
+            ),
+        )
+
+
+def instrument(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before):
+        event.listen(sync_engine, "before_cursor_execute", _before)
+        event.listen(sync_engine, "after_cursor_execute", _after)
+        event.listen(sync_engine, "handle_error", _error)
+    slow_queries.watch(engine)
+
+
+instrument(async_engine)
+if replica_engine is not None:
+    instrument(replica_engine)
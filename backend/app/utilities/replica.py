@@ -0,0 +1,188 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from fastapi import Header
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.utilities.db import async_session, replica_engine, replica_pool_stats
+from app.utilities.logger import logger
+
+log = logger(__name__)
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Seconds the standby is behind; 0 when it has replayed everything it
+# received (an idle primary would otherwise look like growing lag), and
+# 0 when the URI points at a primary, as in local two-instance setups.
+_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery()
+          OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE coalesce(
+            extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+class ReadRouter:
+    """
+    Picks the database for get_read_db sessions. Reads go to the replica
+    unless:
+
+    - no replica is configured;
+    - the client (its Authorization header) wrote through this worker in
+      the last DB_READ_YOUR_WRITES_SECONDS, so it sees its own writes;
+    - the replica lags more than DB_REPLICA_MAX_LAG_SECONDS, as last
+      measured by check();
+    - connecting to the replica failed in the last DB_REPLICA_RETRY_SECONDS.
+
+    Stickiness is per worker; a client's next request may land on another
+    one, where the lag ceiling bounds how stale its read can be.
+    """
+
+    def __init__(
+        self,
+        replica: Optional[async_sessionmaker[AsyncSession]],
+        *,
+        sticky_seconds: float,
+        max_lag_seconds: float,
+        retry_seconds: float,
+        max_clients: int = 10000,
+    ) -> None:
+        self.replica = replica
+        self.sticky_seconds = sticky_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.retry_seconds = retry_seconds
+        self.max_clients = max_clients
+        self.lag_seconds: Optional[float] = None
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.failures = 0
+        self._down_until = 0.0
+        self._sticky: "OrderedDict[str, float]" = OrderedDict()
+
+    def note_write(self, client: Optional[str]) -> None:
+        if self.replica is None or not client or self.sticky_seconds <= 0:
+            return
+        self._sticky[client] = time.monotonic() + self.sticky_seconds
+        self._sticky.move_to_end(client)
+        while len(self._sticky) > self.max_clients:
+            self._sticky.popitem(last=False)
+
+    def use_replica(self, client: Optional[str]) -> bool:
+        if self.replica is None:
+            return False
+        now = time.monotonic()
+        if now < self._down_until:
+            return False
+        if self.lag_seconds is not None and self.lag_seconds > self.max_lag_seconds:
+            return False
+        if client:
+            until = self._sticky.get(client)
+            if until is not None:
+                if now < until:
+                    return False
+                del self._sticky[client]
+        return True
+
+    def mark_down(self, exc: BaseException) -> None:
+        self.failures += 1
+        self._down_until = time.monotonic() + self.retry_seconds
+        log.warning(
+            "Read replica unavailable (%s); reading from the primary for %ss",
+            exc,
+            self.retry_seconds,
+        )
+
+    async def open(self, client: Optional[str]) -> AsyncSession:
+        """
+        A session in a READ ONLY transaction on the chosen database. The
+        replica connection is taken eagerly so a failure can still fall
+        back to the primary.
+        """
+        if self.use_replica(client) and self.replica is not None:
+            session = self.replica()
+            try:
+                await session.connection(
+                    execution_options={"postgresql_readonly": True}
+                )
+                self.replica_reads += 1
+                return session
+            except Exception as exc:
+                await session.close()
+                self.mark_down(exc)
+        session = async_session()
+        await session.connection(execution_options={"postgresql_readonly": True})
+        self.primary_reads += 1
+        return session
+
+    async def check(self) -> None:
+        """Measure replication lag; also how a failed replica comes back."""
+        if self.replica is None:
+            return
+        try:
+            async with self.replica() as session:
+                lag = (await session.execute(text(_LAG_SQL))).scalar()
+        except Exception as exc:
+            self.lag_seconds = None
+            self.mark_down(exc)
+            return
+        self.lag_seconds = float(lag or 0)
+        self._down_until = 0.0
+
+    async def run_forever(
+        self, interval_seconds: float = settings.db_replica_check_interval_seconds
+    ) -> None:
+        """Check the replica periodically until cancelled (started from the lifespan)."""
+        while True:
+            await self.check()
+            await asyncio.sleep(interval_seconds)
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        if replica_engine is None:
+            return None
+        return {
+            "available": time.monotonic() >= self._down_until,
+            "lag_seconds": self.lag_seconds,
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "failures": self.failures,
+            "sticky_clients": len(self._sticky),
+            "pool": replica_pool_stats.snapshot(replica_engine),
+        }
+
+
+read_router = ReadRouter(
+    (
+        async_sessionmaker(
+            bind=replica_engine, expire_on_commit=False, class_=AsyncSession
+        )
+        if replica_engine is not None
+        else None
+    ),
+    sticky_seconds=settings.db_read_your_writes_seconds,
+    max_lag_seconds=settings.db_replica_max_lag_seconds,
+    retry_seconds=settings.db_replica_retry_seconds,
+)
+
+
+async def get_read_db(
+    authorization: Optional[str] = Header(None),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    FastAPI dependency for read-only routes: like get_db, but served by the
+    read replica when one is configured and fresh enough for this client.
+    Writes through this session fail (READ ONLY transaction).
+    """
+    session = await read_router.open(authorization)
+    try:
+        yield session
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
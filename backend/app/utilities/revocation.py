@@ -0,0 +1,316 @@
+import asyncio
+import hashlib
+import math
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Protocol, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import col
+
+from app.config import settings
+from app.models.revoked_token import RevokedToken
+from app.utilities.db import async_session
+from app.utilities.jwt import ACCESS_TOKEN_EXPIRE_HOURS
+from app.utilities.logger import logger
+
+log = logger(__name__)
+
+# Revocations committed out of order can carry a revoked_at just below the
+# newest one already synced, so each sync re-reads this much history.
+_SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def user_key(user_id: str) -> str:
+    """
+    The entry that revokes every token of one user, stored alongside the
+    jtis (hyphenated UUIDs, so the two never collide).
+    """
+    return "u:" + uuid.UUID(user_id).hex
+
+
+class BloomFilter:
+    """
+    Fixed-size set of strings with no false negatives: `key in bloom` is
+    False only for keys that were never added. The bit count and number of
+    hashes are derived from the expected capacity and false positive rate.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key)
+        )
+
+
+class RevocationStore(Protocol):
+    """Shared record of revoked jtis, each kept until its token expires."""
+
+    async def add(self, jti: str, expires_at: datetime) -> None: ...
+
+    async def contains(self, jti: str) -> bool: ...
+
+    async def revoked_since(
+        self, since: Optional[datetime]
+    ) -> List[Tuple[str, datetime]]:
+        """(jti, revoked_at) of unexpired revocations after `since` (all if None)."""
+        ...
+
+    async def purge_expired(self) -> int: ...
+
+
+class DatabaseRevocationStore:
+    """The revoked_tokens table; shared by every worker and replica."""
+
+    async def add(self, jti: str, expires_at: datetime) -> None:
+        stmt = (
+            insert(RevokedToken)
+            .values(jti=jti, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=["jti"])
+        )
+        async with async_session() as db:
+            await db.execute(stmt)
+            await db.commit()
+
+    async def contains(self, jti: str) -> bool:
+        stmt = select(col(RevokedToken.jti)).where(
+            col(RevokedToken.jti) == jti, col(RevokedToken.expires_at) > func.now()
+        )
+        async with async_session() as db:
+            return (await db.execute(stmt)).first() is not None
+
+    async def revoked_since(
+        self, since: Optional[datetime]
+    ) -> List[Tuple[str, datetime]]:
+        stmt = select(col(RevokedToken.jti), col(RevokedToken.revoked_at)).where(
+            col(RevokedToken.expires_at) > func.now()
+        )
+        if since is not None:
+            stmt = stmt.where(col(RevokedToken.revoked_at) > since)
+        async with async_session() as db:
+            return [(jti, at) for jti, at in (await db.execute(stmt)).all()]
+
+    async def purge_expired(self) -> int:
+        stmt = (
+            delete(RevokedToken)
+            .where(col(RevokedToken.expires_at) <= func.now())
+            .execution_options(synchronize_session=False)
+        )
+        async with async_session() as db:
+            result = await db.execute(stmt)
+            await db.commit()
+        return result.rowcount or 0  # type: ignore[attr-defined]
+
+
+class MemoryRevocationStore:
+    """In-process stand-in for development and single-worker runs."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Tuple[datetime, datetime]] = {}
+
+    async def add(self, jti: str, expires_at: datetime) -> None:
+        self._entries.setdefault(jti, (expires_at, datetime.now(timezone.utc)))
+
+    async def contains(self, jti: str) -> bool:
+        hit = self._entries.get(jti)
+        return hit is not None and hit[0] > datetime.now(timezone.utc)
+
+    async def revoked_since(
+        self, since: Optional[datetime]
+    ) -> List[Tuple[str, datetime]]:
+        now = datetime.now(timezone.utc)
+        return [
+            (jti, revoked_at)
+            for jti, (expires_at, revoked_at) in self._entries.items()
+            if expires_at > now and (since is None or revoked_at > since)
+        ]
+
+    async def purge_expired(self) -> int:
+        now = datetime.now(timezone.utc)
+        expired = [jti for jti, (exp, _) in self._entries.items() if exp <= now]
+        for jti in expired:
+            del self._entries[jti]
+        return len(expired)
+
+
+class RevocationList:
+    """
+    Per-process front for the shared RevocationStore.
+
+    A Bloom filter of every unexpired revoked jti answers "not revoked"
+    without leaving the process, which is the answer for nearly every
+    request. Only a Bloom hit (a revoked token or a false positive) asks
+    the store, and the answer is remembered in a bounded LRU so the same
+    false positive does not cost a round trip again.
+
+    Each worker pulls revocations made elsewhere every
+    REVOCATION_SYNC_INTERVAL_SECONDS, so a logout is honored by this
+    worker at once and by every other one within that interval. The
+    filter cannot forget, so it is rebuilt from the store (after purging
+    expired rows) every REVOCATION_REBUILD_INTERVAL_SECONDS, or sooner if
+    it fills past capacity.
+
+    Revoking a user (an account being deleted) stores one entry under
+    user_key() instead of a jti per token, and get_current_user checks it
+    on principal cache hits too, so every worker stops honoring the
+    account's tokens within the same interval.
+
+    As in PrincipalCache, a lookup records `generation` before asking the
+    store and a sync that brings new jtis bumps it, so a "not revoked"
+    answer read before a revocation arrived is never remembered after it.
+    """
+
+    def __init__(
+        self,
+        store: RevocationStore,
+        *,
+        capacity: int,
+        error_rate: float,
+        checked_entries: int,
+    ) -> None:
+        self.store = store
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.checked_entries = checked_entries
+        self.generation = 0
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._checked: "OrderedDict[str, bool]" = OrderedDict()
+        self._watermark: Optional[datetime] = None
+        self._rebuilt_at = 0.0
+
+    async def is_revoked(self, jti: Optional[str]) -> bool:
+        if not jti or jti not in self._bloom:
+            return False
+        hit = self._checked.get(jti)
+        if hit is not None:
+            self._checked.move_to_end(jti)
+            return hit
+        generation = self.generation
+        revoked = await self.store.contains(jti)
+        if generation == self.generation or revoked:
+            self._remember(jti, revoked)
+        return revoked
+
+    async def revoke(self, jti: str, expires_at: datetime) -> None:
+        await self.store.add(jti, expires_at)
+        self._bloom.add(jti)
+        self.generation += 1
+        self._remember(jti, True)
+
+    async def revoke_user(self, user_id: str) -> None:
+        """Revoke every token issued to `user_id` so far, kept until the last one expires."""
+        expires_at = datetime.now(timezone.utc) + timedelta(
+            hours=ACCESS_TOKEN_EXPIRE_HOURS
+        )
+        await self.revoke(user_key(user_id), expires_at)
+
+    async def is_user_revoked(self, user_id: str) -> bool:
+        return await self.is_revoked(user_key(user_id))
+
+    async def sync(self) -> int:
+        """Fold in revocations made by other workers; returns how many were new."""
+        since = self._watermark - _SYNC_OVERLAP if self._watermark else None
+        rows = await self.store.revoked_since(since)
+        fresh = 0
+        for jti, revoked_at in rows:
+            if self._watermark is None or revoked_at > self._watermark:
+                self._watermark = revoked_at
+            if jti in self._bloom:
+                # already synced, revoked here, or a false positive that
+                # was looked up before this revocation happened
+                if self._checked.get(jti) is not False:
+                    continue
+            else:
+                self._bloom.add(jti)
+            self._checked.pop(jti, None)
+            fresh += 1
+        if fresh:
+            self.generation += 1
+        return fresh
+
+    async def rebuild(self) -> None:
+        """Purge expired revocations and reload the filter from the store."""
+        purged = await self.store.purge_expired()
+        rows = await self.store.revoked_since(None)
+        bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+        watermark = None
+        for jti, revoked_at in rows:
+            bloom.add(jti)
+            if watermark is None or revoked_at > watermark:
+                watermark = revoked_at
+        # revocations made here while the reload was in flight
+        for jti, revoked in self._checked.items():
+            if revoked:
+                bloom.add(jti)
+        self._bloom = bloom
+        self._watermark = watermark
+        self._checked = OrderedDict((j, r) for j, r in self._checked.items() if r)
+        self.generation += 1
+        self._rebuilt_at = time.monotonic()
+        log.info("Revocation list rebuilt: %s active, %s purged", len(rows), purged)
+
+    async def run_forever(
+        self,
+        interval_seconds: float = settings.revocation_sync_interval_seconds,
+        rebuild_seconds: float = settings.revocation_rebuild_interval_seconds,
+    ) -> None:
+        """Sync periodically until cancelled (started from the app lifespan)."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                stale = time.monotonic() - self._rebuilt_at >= rebuild_seconds
+                if stale or self._bloom.count > self._bloom.capacity:
+                    await self.rebuild()
+                else:
+                    await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Revocation list sync failed")
+
+    def _remember(self, jti: str, revoked: bool) -> None:
+        if self.checked_entries <= 0:
+            return
+        self._checked[jti] = revoked
+        self._checked.move_to_end(jti)
+        while len(self._checked) > self.checked_entries:
+            self._checked.popitem(last=False)
+
+
+def _make_store(kind: str) -> RevocationStore:
+    if kind == "database":
+        return DatabaseRevocationStore()
+    if kind == "memory":
+        return MemoryRevocationStore()
+    raise ValueError(f"Unknown revocation store {kind!r}")
+
+
+revocations = RevocationList(
+    _make_store(settings.revocation_store),
+    capacity=settings.revocation_bloom_capacity,
+    error_rate=settings.revocation_bloom_error_rate,
+    checked_entries=settings.revocation_checked_entries,
+)
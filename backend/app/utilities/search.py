@@ -0,0 +1,140 @@
+import html
+from dataclasses import dataclass
+from typing import Any, Generic, List, Optional, TypeVar
+
+from sqlalchemy import desc, func, literal, literal_column, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement, Select
+
+from app.config import settings
+from app.utilities.pagination import Page, decode_key, encode_key
+
+# Text search configuration baked into the generated columns; changing it
+# means re-creating them.
+SEARCH_CONFIG = "english"
+
+# ts_headline marks matches with control characters, which are swapped for
+# <mark> only after the snippet has been HTML-escaped.
+_START, _STOP = "\x02", "\x03"
+_HEADLINE_OPTIONS = (
+    f"StartSel={_START}, StopSel={_STOP}, "
+    'MaxFragments=2, MaxWords=30, MinWords=12, FragmentDelimiter=" … "'
+)
+
+T = TypeVar("T")
+
+
+def search_vector_ddl(table: str) -> List[str]:
+    """
+    Idempotent DDL for a weighted title/content tsvector kept up to date by
+    Postgres itself, plus the GIN index that makes `@@` an index lookup.
+    """
+    vector = (
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(content, '')), 'B')"
+    )
+    return [
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({vector}) STORED",
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector "
+        f"ON {table} USING GIN (search_vector)",
+    ]
+
+
+def _config() -> ColumnElement[Any]:
+    return literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+
+
+def _vector(table: str) -> ColumnElement[Any]:
+    # Not mapped on the models, so ORM loads never pull the tsvector.
+    return literal_column(f"{table}.search_vector")
+
+
+def _query(q: str) -> ColumnElement[Any]:
+    # websearch syntax: "quoted phrases", OR, -excluded; never a syntax error
+    return func.websearch_to_tsquery(_config(), q)
+
+
+def search_filter(table: str, q: str) -> ColumnElement[bool]:
+    return _vector(table).op("@@")(_query(q))
+
+
+def render_snippet(raw: Optional[str]) -> Optional[str]:
+    if raw is None:
+        return None
+    return html.escape(raw).replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+@dataclass
+class SearchHit(Generic[T]):
+    item: T
+    rank: Optional[float] = None
+    # HTML-escaped excerpt with matches wrapped in <mark>
+    snippet: Optional[str] = None
+
+
+async def ranked_search(
+    db: AsyncSession,
+    stmt: Select[Any],
+    *,
+    table: str,
+    id_col: Any,
+    created_col: Any,
+    snippet_col: Any,
+    q: str,
+    cursor: Optional[str] = None,
+    limit: int = 10,
+) -> Page[SearchHit[Any]]:
+    """
+    Full-text matches for `q`, best first. Pages seek on (rank, id) like the
+    created_at keyset in paginate(); snippets are built only for the rows
+    on the returned page.
+
+    Only the SEARCH_RANK_WINDOW most recent matches are ranked: ts_rank has
+    to read every candidate's tsvector, so ranking all matches of a common
+    word would cost as much as the ilike scan this replaces.
+    """
+    # asyncpg prepares statements, and after five runs Postgres may switch to
+    # a generic plan that ignores how common the searched words are.
+    await db.execute(text("SET LOCAL plan_cache_mode = force_custom_plan"))
+
+    query = _query(q)
+    rank = func.ts_rank(_vector(table), query)
+    window = (
+        stmt.with_only_columns(id_col)
+        .where(search_filter(table, q))
+        .order_by(desc(created_col))
+        .limit(settings.search_rank_window)
+    )
+    stmt = stmt.add_columns(rank).where(id_col.in_(window))
+    if cursor:
+        last_rank, ident = decode_key(cursor, 2)
+        if not isinstance(last_rank, (int, float)):
+            raise ValueError("Invalid cursor")
+        stmt = stmt.where(
+            tuple_(rank, id_col)
+            < tuple_(literal(float(last_rank)), literal(ident, id_col.type))
+        )
+    stmt = stmt.order_by(desc(rank), desc(id_col)).limit(limit + 1)
+    rows = list((await db.execute(stmt)).all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        item, item_rank = rows[-1]
+        next_cursor = encode_key(item_rank, getattr(item, id_col.key))
+
+    snippets = {}
+    if rows:
+        ids = [getattr(item, id_col.key) for item, _ in rows]
+        headline = func.ts_headline(_config(), snippet_col, query, _HEADLINE_OPTIONS)
+        res = await db.execute(select(id_col, headline).where(id_col.in_(ids)))
+        snippets = {ident: render_snippet(raw) for ident, raw in res.all()}
+
+    return Page(
+        items=[
+            SearchHit(item, rank=r, snippet=snippets.get(getattr(item, id_col.key)))
+            for item, r in rows
+        ],
+        next_cursor=next_cursor,
+    )
@@ -0,0 +1,220 @@
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.utilities.background import spawn
+from app.utilities.logger import logger
+
+log = logger(__name__)
+
+# execution option that keeps a connection's or a statement's runs out of
+# the log (and so from being re-run under EXPLAIN)
+SKIP_OPTION = "slow_query_log_skip"
+_EXPLAINABLE = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+# A name followed by "(" is a function call unless it is one of these. Any
+# function may have side effects EXPLAIN ANALYZE would repeat and a
+# read-only transaction does not stop: pg_try_advisory_lock() takes a
+# session lock that outlives the rollback, nextval() advances a sequence.
+_CALL = re.compile(r"\b([A-Za-z_][\w.]*)\s*\(")
+_NOT_CALLS = set(
+    "ALL AND ANY ARRAY AS BY CAST EXISTS FILTER FROM IN JOIN LATERAL NOT ON "
+    "OR OVER SELECT SOME THEN USING VALUES WHEN WHERE WITHIN".split()
+)
+_LOCKING = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE|KEY\s+SHARE)\b", re.I)
+
+_NORMALIZE = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),  # string literals
+    (re.compile(r"\$\d+(?:::[\w\[\]]+)?"), "?"),  # asyncpg placeholders + casts
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),  # numeric literals
+    (re.compile(r"\s+"), " "),
+    (re.compile(r"\(\?(?:, \?)+\)"), "(?, ...)"),  # IN lists, VALUES rows
+    (re.compile(r"(\([^()]*\))(?:, \1)+"), r"\1, ..."),  # multi-row VALUES
+]
+
+
+def fingerprint(statement: str) -> str:
+    """The statement with literals and placeholders folded, for grouping."""
+    sql = statement
+    for pattern, replacement in _NORMALIZE:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def reads_plain_tables(statement: str) -> bool:
+    """
+    A SELECT that calls no function and locks no rows, so running it again
+    under EXPLAIN ANALYZE only reads.
+    """
+    if statement.lstrip()[:6].upper() != "SELECT" or _LOCKING.search(statement):
+        return False
+    return all(name.upper() in _NOT_CALLS for name in _CALL.findall(statement))
+
+
+def _shape(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}[{len(value)}]"
+    if isinstance(value, (list, tuple)):
+        return f"list[{len(value)}]"
+    return type(value).__name__
+
+
+def param_shapes(params: Any, many: bool) -> List[str]:
+    """Types and sizes of the bind parameters; values are never kept."""
+    if many:
+        rows = list(params or [])
+        return [f"executemany x {len(rows)}"] + (
+            param_shapes(rows[0], False) if rows else []
+        )
+    if isinstance(params, dict):
+        return [f"{k}={_shape(v)}" for k, v in params.items()]
+    return [_shape(v) for v in params or ()]
+
+
+@dataclass
+class SlowQuery:
+    fingerprint: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    routes: "Counter[str]" = field(default_factory=Counter)
+    # bind parameter shapes of the slowest run
+    param_shapes: List[str] = field(default_factory=list)
+    first_seen: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    last_seen: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    plan: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 1),
+            "avg_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 1),
+            "routes": dict(self.routes.most_common(10)),
+            "param_shapes": self.param_shapes,
+            "first_seen": self.first_seen.isoformat(),
+            "last_seen": self.last_seen.isoformat(),
+            "plan": self.plan,
+        }
+
+
+class SlowQueryLog:
+    """
+    Statements slower than `threshold_ms`, grouped by fingerprint, for
+    this worker. Each one is logged as it happens with its route and
+    parameter shapes; report() ranks the groups by total time.
+
+    With `explain`, the first slow run of each fingerprint is re-run under
+    EXPLAIN in a background task with the same parameters: EXPLAIN
+    (ANALYZE, BUFFERS) for a SELECT that only reads tables, in a read-only
+    transaction that is rolled back, and a plain EXPLAIN for anything else
+    (writes, row locks, function calls), since ANALYZE would execute it
+    again.
+    """
+
+    def __init__(
+        self, threshold_ms: float, *, explain: bool, max_fingerprints: int
+    ) -> None:
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.max_fingerprints = max_fingerprints
+        self.engines: Dict[Engine, AsyncEngine] = {}
+        self._entries: Dict[str, SlowQuery] = {}
+
+    def watch(self, engine: AsyncEngine) -> None:
+        self.engines[engine.sync_engine] = engine
+
+    def record(
+        self,
+        engine: Engine,
+        statement: str,
+        params: Any,
+        many: bool,
+        elapsed_ms: float,
+        route: Optional[str],
+    ) -> None:
+        key = fingerprint(statement)
+        route = route or "background"
+        shapes = param_shapes(params, many)
+        log.warning(
+            "Slow query %.1fms route=%s params=%s sql=%s",
+            elapsed_ms,
+            route,
+            shapes,
+            key[:500],
+        )
+
+        entry = self._entries.get(key)
+        first = entry is None
+        if entry is None:
+            self._evict()
+            entry = self._entries[key] = SlowQuery(key)
+        entry.count += 1
+        entry.total_ms += elapsed_ms
+        entry.last_seen = datetime.now(timezone.utc)
+        entry.routes[route] += 1
+        if elapsed_ms >= entry.max_ms:
+            entry.max_ms = elapsed_ms
+            entry.param_shapes = shapes
+
+        async_engine = self.engines.get(engine)
+        explainable = key.split(" ", 1)[0].upper() in _EXPLAINABLE
+        if first and explainable and self.explain and async_engine and not many:
+            spawn(
+                self._explain(async_engine, entry, statement, params),
+                name="explain-slow-query",
+            )
+
+    def _evict(self) -> None:
+        # make room for one more, dropping the least total time
+        while self._entries and len(self._entries) >= self.max_fingerprints:
+            smallest = min(self._entries.values(), key=lambda e: e.total_ms)
+            del self._entries[smallest.fingerprint]
+
+    async def _explain(
+        self,
+        engine: AsyncEngine,
+        entry: SlowQuery,
+        statement: str,
+        params: Optional[Sequence[Any]],
+    ) -> None:
+        analyze = reads_plain_tables(statement)
+        options = "ANALYZE, BUFFERS" if analyze else "COSTS"
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(
+                postgresql_readonly=analyze, **{SKIP_OPTION: True}
+            )
+            try:
+                await conn.exec_driver_sql("SET LOCAL statement_timeout = '30s'")
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN ({options}) {statement}", tuple(params or ())
+                )
+                entry.plan = "\n".join(row[0] for row in result)
+            finally:
+                await conn.rollback()
+
+    def report(self, limit: int = 20) -> Dict[str, Any]:
+        ranked = sorted(self._entries.values(), key=lambda e: e.total_ms, reverse=True)
+        return {
+            "pid": os.getpid(),
+            "threshold_ms": self.threshold_ms,
+            "fingerprints": len(self._entries),
+            "queries": [entry.to_dict() for entry in ranked[:limit]],
+        }
+
+
+slow_queries = SlowQueryLog(
+    settings.slow_query_ms,
+    explain=settings.slow_query_explain,
+    max_fingerprints=settings.slow_query_max_fingerprints,
+)
@@ -0,0 +1,52 @@
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional
+
+from sqlalchemy import column, desc, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+MAX_TAG_LENGTH = 64
+
+# Facet counters, one row per (scope, owner, tag). Kept in step with the
+# tagged tables by the tag_counts_maintain() trigger (see the migrations),
+# so /tags never scans journals or blogs.
+# Scopes counted site-wide (blogs) use owner_id = ''.
+_tag_counts = table(
+    "tag_counts", column("scope"), column("owner_id"), column("tag"), column("count")
+)
+
+
+def normalize_tags(tags: Optional[Iterable[str]]) -> Optional[List[str]]:
+    """
+    Trimmed, lower-cased, whitespace-collapsed and de-duplicated (first
+    occurrence wins), so "Sleep", " sleep " and "SLEEP" facet together.
+    None when nothing is left.
+    """
+    if tags is None:
+        return None
+    out: List[str] = []
+    for raw in tags:
+        tag = " ".join(raw.split()).lower()[:MAX_TAG_LENGTH]
+        if tag and tag not in out:
+            out.append(tag)
+    return out or None
+
+
+@dataclass
+class TagCount:
+    tag: str
+    count: int
+
+
+async def tag_counts(
+    db: AsyncSession, *, scope: str, owner_id: str = "", limit: int = 50
+) -> List[TagCount]:
+    """Most used tags first; reads only the counter rows for one owner."""
+    c: Any = _tag_counts.c
+    stmt = (
+        select(c.tag, c.count)
+        .where(c.scope == scope, c.owner_id == owner_id, c.count > 0)
+        .order_by(desc(c.count), c.tag)
+        .limit(limit)
+    )
+    res = await db.execute(stmt)
+    return [TagCount(tag, count) for tag, count in res.all()]
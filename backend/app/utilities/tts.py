@@ -6,10 +6,12 @@ import tempfile
 import dataclasses
 import asyncio
 import base64
-from typing import Optional, Dict, Any, Callable
+from typing import Optional, Dict, Any, Callable, Tuple
 
 # Import config settings (assumes you have app/config.py exposing `settings`)
 from app.config import settings
+from app.utilities.audio import AudioInfo, pcm_info
+from app.utilities.tts_text import normalize_for_speech, prepare_tts_text
 
 # genai client for Gemini TTS
 try:
@@ -33,6 +35,7 @@ class TTSResult:
     audio_format: str
     voice: str
     tts_meta: Dict[str, Any] = dataclasses.field(default_factory=dict)
+    audio_info: Optional[AudioInfo] = None
 
 
 class ITTSAdapter(abc.ABC):
@@ -142,28 +145,14 @@ class GeminiTTSAdapter(ITTSAdapter):
         client = genai.Client(api_key=getattr(settings, "gemini_api_key"))
         return client
 
-    async def synthesize_to_gcs(
-        self,
-        text: str,
-        *,
-        voice: str = "Kore",
-        language: str = "en-IN",
-        bucket: Optional[str] = None,
-        filename_prefix: Optional[str] = None,
-        gcs_uploader: Optional[Callable[[str, str], str]] = None,
-    ) -> TTSResult:
-        """
-        Perform TTS by calling Gemini TTS model, write WAV locally, and optionally upload via gcs_uploader.
-        Returns TTSResult with gcs_path (or local path) and optional signed_url (if uploader provides).
-        """
-
+    async def _synthesize_segment(self, text: str, voice: str) -> bytes:
+        """Run one Gemini TTS call and return the raw PCM bytes."""
         # ensure client initialized (synchronous) in a thread
         if self._client is None:
             self._client = await asyncio.to_thread(self._init_client_sync)
 
         # run genai.generate_content in thread to avoid blocking event loop
         def _call_genai() -> Dict[str, Any]:
-            # Build the request config similar to your sample
             if self._client is None:
                 raise RuntimeError("TTS client not initialized")
             response = self._client.models.generate_content(
@@ -203,16 +192,74 @@ class GeminiTTSAdapter(ITTSAdapter):
 
         # inline_bytes may be bytes or base64 string; normalize to raw bytes
         if isinstance(inline_bytes, (bytes, bytearray)):
-            pcm_bytes = bytes(inline_bytes)
-        elif isinstance(inline_bytes, str):
+            return bytes(inline_bytes)
+        if isinstance(inline_bytes, str):
             # attempt base64 decode
             try:
-                pcm_bytes = base64.b64decode(inline_bytes)
+                return base64.b64decode(inline_bytes)
             except Exception:
                 # fallback: encode string directly (not ideal)
-                pcm_bytes = inline_bytes.encode("utf-8")
-        else:
-            pcm_bytes = bytes(inline_bytes)
+                return inline_bytes.encode("utf-8")
+        return bytes(inline_bytes)
+
+    async def _synthesize_pcm(
+        self, text: str, voice: str
+    ) -> Tuple[bytes, Dict[str, Any]]:
+        """
+        Normalize `text` for speech, enforce the configured length budget and
+        synthesize it. In "split" mode the segments are synthesized
+        concurrently and their PCM concatenated into a single track.
+        """
+        segments = prepare_tts_text(
+            text,
+            max_seconds=settings.tts_max_seconds,
+            words_per_minute=settings.tts_words_per_minute,
+            mode=settings.tts_overflow_mode,
+            segment_seconds=settings.tts_segment_seconds,
+        )
+        spoken_words = sum(len(seg.split()) for seg in segments)
+        text_meta = {
+            "segments": len(segments),
+            "spoken_words": spoken_words,
+            "truncated": spoken_words < len(normalize_for_speech(text).split()),
+        }
+        if not segments:
+            return b"", text_meta
+
+        pcm_parts = await asyncio.gather(
+            *(self._synthesize_segment(seg, voice) for seg in segments)
+        )
+        return b"".join(pcm_parts), text_meta
+
+    def _no_audio(self, voice: str, text_meta: Dict[str, Any]) -> TTSResult:
+        return TTSResult(
+            gcs_path=None,
+            signed_url=None,
+            duration_seconds=None,
+            audio_format="wav",
+            voice=voice,
+            tts_meta={"model": self._model, "voice": voice, **text_meta},
+        )
+
+    async def synthesize_to_gcs(
+        self,
+        text: str,
+        *,
+        voice: str = "Kore",
+        language: str = "en-IN",
+        bucket: Optional[str] = None,
+        filename_prefix: Optional[str] = None,
+        gcs_uploader: Optional[Callable[[str, str], str]] = None,
+    ) -> TTSResult:
+        """
+        Perform TTS by calling Gemini TTS model, write WAV locally, and optionally upload via gcs_uploader.
+        Returns TTSResult with gcs_path (or local path) and optional signed_url (if uploader provides).
+        If nothing in `text` is speakable no file is written and gcs_path is None.
+        """
+
+        pcm_bytes, text_meta = await self._synthesize_pcm(text, voice)
+        if not pcm_bytes:
+            return self._no_audio(voice, text_meta)
 
         # write to temp wav file
         suffix = ".wav"
@@ -232,6 +279,13 @@ class GeminiTTSAdapter(ITTSAdapter):
             with open(local_path, "wb") as wf:
                 wf.write(pcm_bytes)
 
+        audio_info = pcm_info(
+            len(pcm_bytes),
+            sample_rate=self._sample_rate,
+            sample_width=self._sample_width,
+            size_bytes=os.path.getsize(local_path),
+        )
+
         object_name = fname
         gcs_path = None
         signed_url = None
@@ -262,17 +316,18 @@ class GeminiTTSAdapter(ITTSAdapter):
             signed_url = None
             meta_error = {}
 
-        tts_meta = {"model": self._model, "voice": voice}
+        tts_meta = {"model": self._model, "voice": voice, **text_meta}
         if "meta_error" in locals():
             tts_meta.update(meta_error)
 
         return TTSResult(
             gcs_path=gcs_path,
             signed_url=signed_url,
-            duration_seconds=None,
+            duration_seconds=audio_info.duration_seconds,
             audio_format="wav",
             voice=voice,
             tts_meta=tts_meta,
+            audio_info=audio_info,
         )
 
     async def synthesize_to_local(
@@ -286,54 +341,12 @@ class GeminiTTSAdapter(ITTSAdapter):
     ) -> TTSResult:
         """
         Synthesize speech and save the audio file to a local directory.
+        If nothing in `text` is speakable no file is written and tts_meta has
+        no local_path, so the caller stores the message without audio.
         """
-        # Use the same logic as synthesize_to_gcs to get audio bytes
-        if self._client is None:
-            self._client = await asyncio.to_thread(self._init_client_sync)
-
-        def _call_genai() -> Dict[str, Any]:
-            if self._client is None:
-                raise RuntimeError("TTS client not initialized")
-            response = self._client.models.generate_content(
-                model=self._model,
-                contents=f"Say: {text}",
-                config=genai_types.GenerateContentConfig(
-                    response_modalities=["AUDIO"],
-                    speech_config=genai_types.SpeechConfig(
-                        voice_config=genai_types.VoiceConfig(
-                            prebuilt_voice_config=genai_types.PrebuiltVoiceConfig(
-                                voice_name=voice,
-                            )
-                        ),
-                    ),
-                ),
-            )
-            return {"response": response}
-
-        genai_result = await asyncio.to_thread(_call_genai)
-        response = genai_result["response"]
-        try:
-            candidate = response.candidates[0]
-            parts = candidate.content.parts
-            inline_bytes = None
-            for p in parts:
-                if hasattr(p, "inline_data") and getattr(p.inline_data, "data", None):
-                    inline_bytes = p.inline_data.data
-                    break
-            if inline_bytes is None:
-                raise ValueError("No inline audio data in Gemini response")
-        except Exception as exc:
-            raise RuntimeError(f"Failed to parse Gemini response: {exc}")
-
-        if isinstance(inline_bytes, (bytes, bytearray)):
-            pcm_bytes = bytes(inline_bytes)
-        elif isinstance(inline_bytes, str):
-            try:
-                pcm_bytes = base64.b64decode(inline_bytes)
-            except Exception:
-                pcm_bytes = inline_bytes.encode("utf-8")
-        else:
-            pcm_bytes = bytes(inline_bytes)
+        pcm_bytes, text_meta = await self._synthesize_pcm(text, voice)
+        if not pcm_bytes:
+            return self._no_audio(voice, text_meta)
 
         # Ensure output directory exists
         os.makedirs(output_dir, exist_ok=True)
@@ -353,11 +366,24 @@ class GeminiTTSAdapter(ITTSAdapter):
             with open(local_path, "wb") as wf:
                 wf.write(pcm_bytes)
 
+        audio_info = pcm_info(
+            len(pcm_bytes),
+            sample_rate=self._sample_rate,
+            sample_width=self._sample_width,
+            size_bytes=os.path.getsize(local_path),
+        )
+
         return TTSResult(
             gcs_path=None,
             signed_url=None,
-            duration_seconds=None,
+            duration_seconds=audio_info.duration_seconds,
             audio_format="wav",
             voice=voice,
-            tts_meta={"model": self._model, "voice": voice, "local_path": local_path},
+            tts_meta={
+                "model": self._model,
+                "voice": voice,
+                "local_path": local_path,
+                **text_meta,
+            },
+            audio_info=audio_info,
         )
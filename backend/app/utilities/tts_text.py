@@ -0,0 +1,154 @@
+import re
+from typing import List
+
+# LLM replies are written for reading; these rules make them cheap to speak.
+_CODE_BLOCK = re.compile(r"```.*?```", re.DOTALL)
+_INLINE_CODE = re.compile(r"`([^`]*)`")
+_LINK = re.compile(r"\[([^\]]+)\]\([^)]+\)")
+_URL = re.compile(r"https?://\S+")
+_HEADING = re.compile(r"^\s{0,3}#{1,6}\s*", re.MULTILINE)
+_BLOCKQUOTE = re.compile(r"^\s*>\s?", re.MULTILINE)
+_BULLET = re.compile(r"^\s*(?:[-*+•]|\d+[.)])\s+", re.MULTILINE)
+_RULE = re.compile(r"^\s*(?:[-*_]\s*){3,}$", re.MULTILINE)
+_EMPHASIS = re.compile(r"(\*\*|\*|~~)(?=\S)(.+?)(?<=\S)\1")
+# as in Markdown, underscores inside a word (snake_case) are not emphasis
+_UNDERSCORE_EMPHASIS = re.compile(r"(?<!\w)(__|_)(?=\S)(.+?)(?<=\S)\1(?!\w)")
+_EMOJI = re.compile(
+    "["
+    "\U0001f000-\U0001faff"  # pictographs, emoticons, symbols, flags
+    "\u2600-\u27bf"  # misc symbols, dingbats
+    "\u2b00-\u2bff"  # arrows, stars
+    "\ufe0f\u200d"  # variation selector, zero-width joiner
+    "]+"
+)
+_SPACES = re.compile(r"[ \t]+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+ABBREVIATIONS = {
+    "e.g.": "for example",
+    "i.e.": "that is",
+    "etc.": "et cetera",
+    "vs.": "versus",
+    "approx.": "approximately",
+    "Dr.": "Doctor",
+    "mins": "minutes",
+    "hrs": "hours",
+    "tbh": "to be honest",
+    "idk": "I don't know",
+    "imo": "in my opinion",
+    "btw": "by the way",
+    "ngl": "not gonna lie",
+    "&": "and",
+}
+_ABBREVIATION = re.compile(
+    r"(?<!\w)("
+    + "|".join(re.escape(k) for k in sorted(ABBREVIATIONS, key=len, reverse=True))
+    + r")(?!\w)",
+    re.IGNORECASE,
+)
+_ABBREVIATION_LOOKUP = {k.lower(): v for k, v in ABBREVIATIONS.items()}
+
+
+def normalize_for_speech(text: str) -> str:
+    """
+    Strip markdown, links and emoji and expand common abbreviations so the
+    TTS model only receives words it should actually say.
+    """
+    out = _CODE_BLOCK.sub(" ", text)
+    out = _INLINE_CODE.sub(r"\1", out)
+    out = _LINK.sub(r"\1", out)
+    out = _URL.sub("", out)
+    out = _RULE.sub("", out)
+    out = _HEADING.sub("", out)
+    out = _BLOCKQUOTE.sub("", out)
+    out = _BULLET.sub("", out)
+    out = _EMPHASIS.sub(r"\2", out)
+    out = _UNDERSCORE_EMPHASIS.sub(r"\2", out)
+    out = _EMOJI.sub("", out)
+    out = _ABBREVIATION.sub(lambda m: _ABBREVIATION_LOOKUP[m.group(1).lower()], out)
+
+    # Each non-empty line becomes its own sentence so list items don't run together.
+    lines = []
+    for line in out.splitlines():
+        line = _SPACES.sub(" ", line).strip()
+        if not line:
+            continue
+        if line[-1] not in ".!?:;,":
+            line += "."
+        lines.append(line)
+    return " ".join(lines)
+
+
+def estimate_speech_seconds(text: str, words_per_minute: int = 150) -> float:
+    """Rough spoken duration from word count."""
+    return len(text.split()) * 60.0 / words_per_minute
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s for s in _SENTENCE_END.split(text) if s]
+
+
+def _segments(sentences: List[str], max_words: int) -> List[str]:
+    """Greedily pack whole sentences into segments of at most `max_words`."""
+    segments: List[str] = []
+    current: List[str] = []
+    count = 0
+    for sentence in sentences:
+        words = sentence.split()
+        # a single over-long sentence is hard-wrapped at word boundaries
+        while len(words) > max_words:
+            if current:
+                segments.append(" ".join(current))
+                current, count = [], 0
+            segments.append(" ".join(words[:max_words]))
+            words = words[max_words:]
+        if count + len(words) > max_words and current:
+            segments.append(" ".join(current))
+            current, count = [], 0
+        if words:
+            current.append(" ".join(words))
+            count += len(words)
+    if current:
+        segments.append(" ".join(current))
+    return segments
+
+
+def prepare_tts_text(
+    text: str,
+    *,
+    max_seconds: float,
+    words_per_minute: int = 150,
+    mode: str = "truncate",
+    segment_seconds: float = 30.0,
+) -> List[str]:
+    """
+    Normalize `text` and enforce the spoken-length budget.
+
+    mode="truncate" returns a single segment cut at the last sentence boundary
+    that fits `max_seconds`. mode="split" returns segments of roughly
+    `segment_seconds` each (still capped at `max_seconds` overall) so they can
+    be synthesized concurrently. Returns [] when nothing speakable remains.
+    """
+    spoken = normalize_for_speech(text)
+    if not spoken:
+        return []
+
+    max_words = max(1, int(max_seconds * words_per_minute / 60))
+    sentences = split_sentences(spoken)
+
+    kept: List[str] = []
+    total = 0
+    for sentence in sentences:
+        n = len(sentence.split())
+        if total + n > max_words:
+            if not kept:
+                # first sentence alone is over budget: cut it at a word boundary
+                kept.append(" ".join(sentence.split()[:max_words]) + ".")
+            break
+        kept.append(sentence)
+        total += n
+
+    if mode == "split":
+        per_segment = max(1, int(segment_seconds * words_per_minute / 60))
+        return _segments(kept, per_segment)
+    return [" ".join(kept)]
@@ -0,0 +1,174 @@
+"""
+Deleting one heavy account: the ORM cascade (every child row loaded, then
+deleted by primary key) against services/account_deletion (bounded
+batches, the database cascading what is left).
+
+    cd backend && DB_URI=postgresql://... python -m benchmarks.bench_account_deletion --rows 20000
+
+Needs a migrated database. For each size (--rows, then four times as
+many) it seeds a throwaway user with that many eve messages and chat
+messages, a tenth as many journals and a chat session per 50 messages,
+and deletes it both ways. Reported per run: statements (the ORM's
+per-row DELETEs go out as one executemany, counted once), seconds and the
+peak Python memory (tracemalloc) while deleting. The ORM's peak grows with
+the account; the batched job's should stay the same from one size to the
+next.
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, List, Tuple
+
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import selectinload
+from sqlmodel import col
+
+import app.main  # noqa: F401  (registers every model for the relationships)
+from app.models.chat import ChatSession
+from app.models.user import User
+from app.services.account_deletion.account_deletion import AccountDeletionService
+from app.utilities.db import async_engine, async_session
+from app.utilities.ids import uuid7
+
+statements = 0
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _statement(*args: Any) -> None:
+    global statements
+    statements += 1
+
+
+async def seed(rows: int) -> str:
+    user_id = str(uuid7())
+    sessions = max(1, rows // 50)
+    params = {
+        "u": user_id,
+        "email": f"bench-{user_id}@example.com",
+        "n": rows,
+        "s": sessions,
+        "per_session": rows // sessions,
+        "journals": rows // 10,
+    }
+    async with async_engine.begin() as conn:
+        await conn.execute(
+            text(
+                "INSERT INTO users (id, email, hashed_password, is_admin) "
+                "VALUES (:u, :email, 'x', false)"
+            ),
+            params,
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO eve_sessions (id, user_id, system_prompt, is_active) "
+                "VALUES (gen_random_uuid(), :u, 'bench', false)"
+            ),
+            params,
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO eve_messages (id, user_id, session_id, role, text) "
+                "SELECT gen_random_uuid(), :u, s.id, 'user', repeat('x', 200) "
+                "FROM eve_sessions s, generate_series(1, :n) WHERE s.user_id = :u"
+            ),
+            params,
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO chat_sessions (user_id, title, created_at) "
+                "SELECT :u, 'bench', now() FROM generate_series(1, :s)"
+            ),
+            params,
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO messages (session_id, role, content, created_at) "
+                "SELECT s.id, 'user', repeat('x', 200), now() "
+                "FROM chat_sessions s, generate_series(1, :per_session) "
+                "WHERE s.user_id = :u"
+            ),
+            params,
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO journals (id, user_id, title, content, entry_date) "
+                "SELECT gen_random_uuid(), :u, 'bench', repeat('x', 200), now() "
+                "FROM generate_series(1, :journals)"
+            ),
+            params,
+        )
+    return user_id
+
+
+async def orm_delete(user_id: str) -> None:
+    """What deleting a User cost before: its children loaded and deleted one by one."""
+    async with async_session() as session:
+        user = (
+            await session.execute(
+                select(User)
+                .where(col(User.id) == user_id)
+                .options(
+                    selectinload(User.eve_messages),  # type: ignore[arg-type]
+                    selectinload(User.eve_sessions),  # type: ignore[arg-type]
+                    selectinload(User.journals),  # type: ignore[arg-type]
+                    selectinload(User.blogs),  # type: ignore[arg-type]
+                    selectinload(User.chat_sessions).selectinload(  # type: ignore[arg-type]
+                        ChatSession.messages  # type: ignore[arg-type]
+                    ),
+                )
+            )
+        ).scalar_one()
+        await session.delete(user)
+        await session.commit()
+
+
+async def batched_delete(user_id: str) -> None:
+    async with async_engine.begin() as conn:
+        await conn.execute(
+            text("UPDATE users SET deletion_requested_at = :t WHERE id = :u"),
+            {"t": datetime.now(timezone.utc), "u": user_id},
+        )
+    await AccountDeletionService(batch_pause_seconds=0).delete_pending()
+
+
+async def measure(
+    delete: Callable[[str], Awaitable[None]], rows: int
+) -> Tuple[int, float, int]:
+    global statements
+    user_id = await seed(rows)
+    statements = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    await delete(user_id)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statements, seconds, peak
+
+
+async def main(rows: int) -> None:
+    results: List[Tuple[str, int, int, float, int]] = []
+    for size in (rows, rows * 4):
+        for name, delete in (("orm cascade", orm_delete), ("batched", batched_delete)):
+            count, seconds, peak = await measure(delete, size)
+            results.append((name, size, count, seconds, peak))
+
+    print(
+        f"{'deletion':<14}{'rows':>10}{'statements':>12}{'seconds':>10}{'peak MB':>10}"
+    )
+    for name, size, count, seconds, peak in results:
+        print(
+            f"{name:<14}{size:>10,}{count:>12,}{seconds:>10.2f}"
+            f"{peak / 1024 / 1024:>10.1f}"
+        )
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows))
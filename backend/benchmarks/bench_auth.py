@@ -0,0 +1,78 @@
+"""
+Auth overhead per request: get_current_user with and without the principal
+cache.
+
+    cd backend && DB_URI=postgresql://... python -m benchmarks.bench_auth --requests 2000
+
+Creates the users table and one user inside a transaction that is rolled
+back at the end, then calls the real dependency with a bearer token.
+"Cold" clears the cache before each call, so every call does the JWT
+verification and a users lookup, as every request did before. "Warm" is
+the steady state for a client making repeated calls on the same token.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel
+
+import app.main  # noqa: F401  (registers every model for the User mapper)
+from app.models.user import User
+from app.routes.auth.auth import get_current_user
+from app.utilities.db import async_engine
+from app.utilities.jwt import create_access_token
+from app.utilities.principal import principal_cache
+
+
+async def timed(db: AsyncSession, header: str, n: int, cold: bool) -> List[float]:
+    runs = []
+    for _ in range(n):
+        if cold:
+            principal_cache.clear()
+            db.expunge_all()  # or db.get() answers from the identity map
+        start = time.perf_counter()
+        await get_current_user(authorization=header, db=db)
+        runs.append((time.perf_counter() - start) * 1_000_000)
+    return runs
+
+
+async def main(requests: int) -> None:
+    async with async_engine.connect() as conn:
+        trans = await conn.begin()
+        await conn.run_sync(
+            lambda sync: SQLModel.metadata.create_all(
+                sync, tables=[User.__table__], checkfirst=True  # type: ignore[attr-defined]
+            )
+        )
+        db = AsyncSession(bind=conn, expire_on_commit=False)
+        user = User(email="bench-auth@example.com", name="Bench", hashed_password="x")
+        db.add(user)
+        await db.flush()
+        header = f"Bearer {create_access_token(identity=user.id)}"
+
+        # warm-up: connection, prepared statements, code paths
+        await timed(db, header, 50, cold=True)
+
+        print(f"{'mode':<6}{'median us':>12}{'p95 us':>10}{'db queries':>12}")
+        for label, cold in (("cold", True), ("warm", False)):
+            runs = await timed(db, header, requests, cold)
+            p95 = statistics.quantiles(runs, n=20)[-1]
+            print(
+                f"{label:<6}{statistics.median(runs):>12.1f}{p95:>10.1f}"
+                f"{'1' if cold else '0':>12}"
+            )
+
+        await db.close()
+        await trans.rollback()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
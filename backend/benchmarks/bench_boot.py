@@ -0,0 +1,123 @@
+"""
+Worker startup cost: the old lifespan (create_all, the schema patches, the
+embeddings DDL and the default-admin check in every worker) vs. the
+schema-version check that replaced it.
+
+    cd backend && DB_URI=postgresql://... python -m benchmarks.bench_boot --workers 4
+
+Run against a database that `python -m app.utilities.migrations upgrade`
+has already brought up to date; that is the restart / scale-out case, and
+the old path's DDL is all no-ops there. `--workers` startups run at once,
+each on its own connection, the way gunicorn boots its workers. A probe
+reads journals meanwhile, to show how long the old path's ALTER TABLE
+locks held up queries from workers that were already serving.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import SQLModel
+
+import app.main  # noqa: F401  (registers every model)
+from app.migrations import m0001_baseline, m0002_journal_embeddings
+from app.services.auth.auth import create_default_admin_if_missing
+from app.services.embeddings.embeddings import embedding_column_type, store_for_column
+from app.utilities.db import _async_db_uri
+from app.utilities.migrations import check_schema
+
+ROUNDS = 5
+
+
+async def old_startup(engine: AsyncEngine) -> None:
+    # init_models(): create_all plus SCHEMA_PATCHES, in one transaction
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            lambda sync: SQLModel.metadata.create_all(sync, checkfirst=True)
+        )
+        for stmt in m0001_baseline.PATCHES:
+            await conn.execute(text(stmt))
+    async with AsyncSession(bind=engine, expire_on_commit=False) as session:
+        await create_default_admin_if_missing(session)
+    # journal_embeddings.init(): extension, table and index DDL
+    async with engine.begin() as conn:
+        await m0002_journal_embeddings.upgrade(conn)
+
+
+async def new_startup(engine: AsyncEngine) -> None:
+    await check_schema(engine)
+    async with engine.connect() as conn:
+        store_for_column(await embedding_column_type(conn))
+
+
+async def timed_boot(startup: Callable[[AsyncEngine], Awaitable[None]]) -> float:
+    # a fresh engine without a pool: each worker opens its own connections
+    engine = create_async_engine(_async_db_uri, poolclass=NullPool)
+    start = time.perf_counter()
+    await startup(engine)
+    elapsed = (time.perf_counter() - start) * 1000
+    await engine.dispose()
+    return elapsed
+
+
+async def probe(stop: asyncio.Event) -> List[float]:
+    engine = create_async_engine(_async_db_uri, poolclass=NullPool)
+    latencies = []
+    async with engine.connect() as conn:
+        while not stop.is_set():
+            start = time.perf_counter()
+            await conn.execute(text("SELECT id FROM journals LIMIT 1"))
+            await conn.commit()
+            latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.002)
+    await engine.dispose()
+    return latencies
+
+
+async def storm(
+    startup: Callable[[AsyncEngine], Awaitable[None]], workers: int
+) -> Tuple[List[float], float, float]:
+    """(per-worker startup ms, wall ms for all workers, worst probe ms)"""
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(stop))
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    boots = await asyncio.gather(*(timed_boot(startup) for _ in range(workers)))
+    wall = (time.perf_counter() - start) * 1000
+    stop.set()
+    latencies = await prober
+    return list(boots), wall, max(latencies)
+
+
+async def main(workers: int) -> None:
+    # warm-up, and fail early if the database has not been migrated
+    await timed_boot(new_startup)
+    await timed_boot(old_startup)
+
+    print(f"{workers} workers booting at once, {ROUNDS} rounds\n")
+    print(f"{'startup':<9}{'worker ms':>11}{'all ms':>10}{'probe max ms':>14}")
+    for label, startup in (("old", old_startup), ("new", new_startup)):
+        boots: List[float] = []
+        walls: List[float] = []
+        worst: List[float] = []
+        for _ in range(ROUNDS):
+            b, w, p = await storm(startup, workers)
+            boots += b
+            walls.append(w)
+            worst.append(p)
+        print(
+            f"{label:<9}{statistics.median(boots):>11.1f}"
+            f"{statistics.median(walls):>10.1f}{max(worst):>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.workers))
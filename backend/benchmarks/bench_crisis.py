@@ -0,0 +1,85 @@
+"""
+Throughput of the crisis-language detector on realistic message sizes.
+
+    cd backend && python -m benchmarks.bench_crisis
+
+Compares the Aho-Corasick matcher in app.utilities.crisis against a single
+compiled regex alternation over the same phrase list. Needs the app's
+settings (DB_URI, GEMINI_API_KEY) to be importable, but no database.
+"""
+
+import random
+import re
+import statistics
+import time
+from typing import Callable, List
+
+from app.static_values import CRISIS_PHRASES
+from app.utilities.crisis import CrisisDetector, crisis_tokens
+
+FILLER = (
+    "honestly today was a lot, college stuff piled up and my roommate and I "
+    "had a fight about the dishes again, yaar kuch samajh nahi aa raha, "
+    "I slept maybe four hours and skipped lunch, tried going for a walk but "
+    "it started raining, mom called and I didn't pick up, feeling kinda off "
+    "and tired of everything, ngl I just want the week to be over"
+).split()
+
+# name -> approximate characters (chat line, voice-turn transcript, journal)
+SIZES = {"chat": 80, "voice_turn": 600, "journal": 4000}
+SAMPLES = 200
+REPEATS = 5
+
+
+def make_messages(chars: int, hit_rate: float, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(SAMPLES):
+        words: List[str] = []
+        while sum(len(w) + 1 for w in words) < chars:
+            words.append(rng.choice(FILLER))
+        if rng.random() < hit_rate:
+            words.insert(rng.randrange(len(words)), rng.choice(CRISIS_PHRASES))
+        messages.append(" ".join(words))
+    return messages
+
+
+def regex_baseline() -> Callable[[str], bool]:
+    """What this would look like without the automaton: one big alternation."""
+    alternation = "|".join(
+        r"\s+".join(map(re.escape, crisis_tokens(p))) for p in CRISIS_PHRASES
+    )
+    pattern = re.compile(rf"\b(?:{alternation})\b", re.IGNORECASE)
+    return lambda text: pattern.search(text.replace("'", "")) is not None
+
+
+def bench(fn: Callable[[str], object], messages: List[str]) -> float:
+    """Median microseconds per message over REPEATS passes."""
+    runs = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for m in messages:
+            fn(m)
+        runs.append((time.perf_counter() - start) / len(messages) * 1e6)
+    return statistics.median(runs)
+
+
+def main() -> None:
+    detector = CrisisDetector()
+    baseline = regex_baseline()
+    print(f"{len(CRISIS_PHRASES)} phrases, {SAMPLES} messages per size\n")
+    print(f"{'size':<12}{'hits':>6}{'aho-corasick us':>18}{'MB/s':>8}{'regex us':>12}")
+    for name, chars in SIZES.items():
+        for hit_rate in (0.0, 0.05):
+            messages = make_messages(chars, hit_rate, seed=chars)
+            avg_len = sum(map(len, messages)) / len(messages)
+            ac = bench(detector.match, messages)
+            rx = bench(baseline, messages)
+            print(
+                f"{name:<12}{hit_rate:>6.0%}{ac:>18.1f}"
+                f"{avg_len / ac:>8.1f}{rx:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Memory of GET /api/me/export (services/data_export) as the account grows.
+
+    cd backend && DB_URI=postgresql://... python -m benchmarks.bench_data_export --rows 20000
+
+Needs a migrated database. For each size (--rows, then four times as
+many) it seeds a throwaway user with that many eve messages and chat
+messages, a tenth as many journals, and a WAV file of --audio-kb for
+every 50th eve message (written to the user audio directory), then reads
+the export stream to the end without keeping it. Reported per run: zip
+size, seconds and the peak Python memory (tracemalloc) while streaming,
+which should not grow with the account. The users and their files are
+deleted afterwards.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+from sqlalchemy import text
+
+from app.services.account_deletion.account_deletion import AccountDeletionService
+from app.services.data_export.data_export import DataExport
+from app.utilities.audio import USER_AUDIO_DIR
+from app.utilities.db import async_engine
+from app.utilities.ids import uuid7
+
+
+async def seed(rows: int, audio_kb: int) -> str:
+    user_id = str(uuid7())
+    sessions = max(1, rows // 50)
+    params = {
+        "u": user_id,
+        "email": f"bench-{user_id}@example.com",
+        "n": rows,
+        "s": sessions,
+        "per_session": rows // sessions,
+        "journals": rows // 10,
+        "audio": os.path.join(USER_AUDIO_DIR, f"bench_{user_id}_"),
+    }
+    async with async_engine.begin() as conn:
+        await conn.execute(
+            text(
+                "INSERT INTO users (id, email, hashed_password, is_admin) "
+                "VALUES (:u, :email, 'x', false)"
+            ),
+            params,
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO eve_messages (id, user_id, role, text, audio_path) "
+                "SELECT gen_random_uuid(), :u, 'user', repeat('x', 200), "
+                "CASE WHEN i % 50 = 0 THEN :audio || i || '.wav' END "
+                "FROM generate_series(1, :n) AS i"
+            ),
+            params,
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO chat_sessions (user_id, title, created_at) "
+                "SELECT :u, 'bench', now() FROM generate_series(1, :s)"
+            ),
+            params,
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO messages (session_id, role, content, created_at) "
+                "SELECT s.id, 'user', repeat('x', 200), now() "
+                "FROM chat_sessions s, generate_series(1, :per_session) "
+                "WHERE s.user_id = :u"
+            ),
+            params,
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO journals (id, user_id, title, content, entry_date) "
+                "SELECT gen_random_uuid(), :u, 'bench', repeat('x', 200), now() "
+                "FROM generate_series(1, :journals)"
+            ),
+            params,
+        )
+    os.makedirs(USER_AUDIO_DIR, exist_ok=True)
+    payload = os.urandom(audio_kb * 1024)
+    for i in range(50, rows + 1, 50):
+        with open(f"{params['audio']}{i}.wav", "wb") as fh:
+            fh.write(payload)
+    return user_id
+
+
+async def measure(user_id: str) -> Tuple[int, float, int]:
+    size = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    async for chunk in DataExport(user_id).stream():
+        size += len(chunk)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, seconds, peak
+
+
+async def main(rows: int, audio_kb: int) -> None:
+    results: List[Tuple[int, int, float, int]] = []
+    users: List[str] = []
+    try:
+        for count in (rows, rows * 4):
+            user_id = await seed(count, audio_kb)
+            users.append(user_id)
+            size, seconds, peak = await measure(user_id)
+            results.append((count, size, seconds, peak))
+    finally:
+        async with async_engine.begin() as conn:
+            await conn.execute(
+                text(
+                    "UPDATE users SET deletion_requested_at = :t "
+                    "WHERE id = ANY(CAST(:ids AS uuid[]))"
+                ),
+                {"t": datetime.now(timezone.utc), "ids": users},
+            )
+        await AccountDeletionService(batch_pause_seconds=0).delete_pending()
+
+    print(f"{'rows':>10}{'zip MB':>10}{'seconds':>10}{'peak MB':>10}")
+    for count, size, seconds, peak in results:
+        print(
+            f"{count:>10,}{size / 1024 / 1024:>10.1f}{seconds:>10.2f}"
+            f"{peak / 1024 / 1024:>10.1f}"
+        )
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--audio-kb", type=int, default=256)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.audio_kb))
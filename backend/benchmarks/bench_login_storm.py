@@ -0,0 +1,97 @@
+"""
+Latency of an unrelated route during a login storm, with bcrypt inline on
+the event loop (how login used to work) vs. on the thread or process pool.
+
+    cd backend && python -m benchmarks.bench_login_storm --logins 32
+
+Fires `--logins` concurrent password verifications, each at BCRYPT_ROUNDS
+cost like a real login, while a probe client calls GET / (the health route)
+through the ASGI app on the same event loop. Reports the probe's p50/p99
+and how long the storm took to drain. No database is needed: the users
+lookup is identical in every mode and is left out.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List, Tuple
+
+import httpx
+
+from app.config import settings
+from app.main import app
+from app.utilities.passwords import PasswordHasher, pwd_context, verify_password_sync
+
+PROBE_INTERVAL = 0.005
+
+
+async def inline_verify(raw: str, hashed: str) -> Tuple[bool, object]:
+    # the old authenticate_user(): blocking bcrypt inside the coroutine
+    return verify_password_sync(raw, hashed)
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event) -> List[float]:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(PROBE_INTERVAL)
+    return latencies
+
+
+async def run(
+    verify: Callable[[str, str], Awaitable[Tuple[bool, object]]],
+    hashed: str,
+    logins: int,
+) -> Tuple[List[float], float]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe(c, stop))
+        await asyncio.sleep(0.1)  # baseline samples before the storm
+        start = time.perf_counter()
+        await asyncio.gather(*(verify("secret1", hashed) for _ in range(logins)))
+        drained = time.perf_counter() - start
+        stop.set()
+        return await prober, drained
+
+
+def p99(values: List[float]) -> float:
+    return statistics.quantiles(values, n=100)[-1] if len(values) > 1 else values[0]
+
+
+async def main(logins: int, workers: int) -> None:
+    hashed = pwd_context.hash("secret1")
+    modes = [
+        ("inline", inline_verify, None),
+        ("thread", None, PasswordHasher(mode="thread", workers=workers)),
+        ("process", None, PasswordHasher(mode="process", workers=workers)),
+    ]
+    print(
+        f"{logins} logins, bcrypt rounds {settings.bcrypt_rounds}, "
+        f"{workers} workers\n"
+    )
+    print(
+        f"{'mode':<9}{'probe p50 ms':>14}{'probe p99 ms':>14}{'probes':>8}{'storm s':>9}"
+    )
+    for label, fn, hasher in modes:
+        verify = fn or hasher.verify  # type: ignore[union-attr]
+        if hasher is not None:
+            await hasher.verify("warm-up", hashed)
+        latencies, drained = await run(verify, hashed, logins)
+        print(
+            f"{label:<9}{statistics.median(latencies):>14.1f}{p99(latencies):>14.1f}"
+            f"{len(latencies):>8}{drained:>9.2f}"
+        )
+        if hasher is not None:
+            hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.workers))
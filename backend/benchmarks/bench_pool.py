@@ -0,0 +1,90 @@
+"""
+Per-request cost of connection pre-ping, and what the pool telemetry
+reports when more requests want a connection than the pool holds.
+
+    cd backend && DB_URI=postgresql://... python -m benchmarks.bench_pool --concurrency 32
+
+Each "request" checks out a connection, runs one primary-key-sized query
+and returns it, like a typical handler behind get_db. The same load runs
+against a pool with pool_pre_ping (the old engine) and without it (the
+default now). The concurrency is above pool size + overflow, so part of
+the latency is waiting for a connection, and pool_stats reports that wait.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+from app.utilities.db import (
+    InstrumentedPool,
+    PoolStats,
+    _async_db_uri,
+    _connect_args,
+    pool_stats,
+)
+
+REQUESTS = 4000
+
+
+async def run(pre_ping: bool, concurrency: int) -> List[float]:
+    engine = create_async_engine(
+        _async_db_uri,
+        poolclass=InstrumentedPool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_pre_ping=pre_ping,
+        connect_args=_connect_args(_async_db_uri),
+    )
+    latencies: List[float] = []
+    remaining = REQUESTS
+
+    async def client() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    # warm-up: open the pool's connections
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    PoolStats.__init__(pool_stats)
+    latencies.clear()
+    remaining = REQUESTS
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    snapshot = pool_stats.snapshot(engine)
+    await engine.dispose()
+    print(
+        f"{'on' if pre_ping else 'off':<10}{statistics.median(latencies):>10.3f}"
+        f"{statistics.quantiles(latencies, n=100)[98]:>10.3f}"
+        f"{snapshot['wait_avg_ms']:>13.3f}{snapshot['wait_p95_ms']:>13.3f}"
+        f"{snapshot['peak_checked_out']:>7}"
+    )
+    return latencies
+
+
+async def main(concurrency: int) -> None:
+    print(
+        f"{REQUESTS} requests, concurrency {concurrency}, pool "
+        f"{settings.db_pool_size}+{settings.db_max_overflow}\n"
+    )
+    print(
+        f"{'pre-ping':<10}{'p50 ms':>10}{'p99 ms':>10}"
+        f"{'wait avg ms':>13}{'wait p95 ms':>13}{'peak':>7}"
+    )
+    for pre_ping in (True, False):
+        await run(pre_ping, concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency))
@@ -0,0 +1,283 @@
+"""
+Statement budgets per endpoint: a regression check on how many SQL
+statements each route issues.
+
+    cd backend && DB_URI=postgresql://... python -m benchmarks.bench_query_budgets
+
+Needs a migrated database; it registers a throwaway user, gives it
+ROWS of each kind of entry (so a list that loads something per row costs
+more than its budget) and drives every route below through the ASGI app
+with QUERY_STATS_HEADER on, reading the count from X-DB-Queries. The
+principal cache is warmed first, so the token lookup is not counted, and
+the cached public blog routes are measured on a cache miss. The model
+call behind chat messages is stubbed and embedding refreshes are switched
+off, as in bench_round_trips.
+
+Each request is also checked by query_budget, so a statement run
+QUERY_REPEAT_THRESHOLD times in one request (a likely N+1) fails it too,
+and a failing route is listed with the statements it ran. Exits 1 if any
+route fails, so it can gate a change to a route or a query. A route now under its budget is
+pointed out so its budget can be tightened.
+"""
+
+import argparse
+import asyncio
+import sys
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.config import settings
+from app.main import app
+from app.routes.chat import chat as chat_routes
+from app.services.embeddings.embeddings import journal_embeddings
+from app.utilities.db import async_engine
+from app.utilities.query_stats import QUERY_STATS_HEADER
+from benchmarks.query_budget import query_budget_block
+
+# entries of each kind the user has while the lists are read
+ROWS = 12
+
+# route -> most statements one request may issue
+BUDGETS: Dict[str, int] = {
+    "GET /api/me": 0,
+    "POST /api/journals": 1,
+    "GET /api/journals": 2,
+    "GET /api/journals?q=": 2,
+    "GET /api/journals/tags": 1,
+    "GET /api/journals/{id}": 2,
+    "PUT /api/journals/{id}": 3,
+    "DELETE /api/journals/{id}": 3,
+    "POST /api/blogs": 1,
+    "GET /api/blogs": 2,
+    "GET /api/blogs/tags": 1,
+    "GET /api/blogs/{id}": 2,
+    "PUT /api/blogs/{id}": 3,
+    "DELETE /api/blogs/{id}": 3,
+    "POST /api/eve/journals": 1,
+    "GET /api/eve/journals": 1,
+    "GET /api/eve/journals/{id}": 1,
+    "PUT /api/eve/journals/{id}": 1,
+    "POST /api/eve/journals/{id}/messages": 2,
+    "GET /api/eve/journals/{id}/messages": 1,
+    "PUT /api/eve/messages/{id}": 1,
+    "DELETE /api/eve/messages/{id}": 1,
+    "DELETE /api/eve/journals/{id}": 2,
+    "POST /api/voice-session-responses/": 1,
+    "GET /api/voice-session-responses/": 1,
+    "GET /api/voice-session-responses/{id}": 1,
+    "GET /api/voice-session-responses/session/{id}": 1,
+    "PUT /api/voice-session-responses/{id}": 1,
+    "DELETE /api/voice-session-responses/{id}": 1,
+    "POST /api/chat/session": 1,
+    "POST /api/chat/{id}/message": 4,
+    "GET /api/chat/{id}": 2,
+    "DELETE /api/chat/{id}": 3,
+}
+
+# (route, statements, budget, what query_budget reported)
+Row = Tuple[str, int, int, Optional[str]]
+
+
+class StubProvider:
+    async def generate_response(self, prompt: str, history: List[Any]) -> str:
+        return "stub reply"
+
+
+async def statements(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    json: Optional[Dict[str, Any]] = None,
+) -> Tuple[int, Any]:
+    response = await client.request(method, url, json=json)
+    response.raise_for_status()
+    # "4;dur=2.7": statements; milliseconds
+    count = int(response.headers[QUERY_STATS_HEADER].split(";")[0])
+    return count, response.json() if response.content else None
+
+
+async def main() -> int:
+    settings.query_stats_header = True
+    journal_embeddings.schedule = lambda journal_id: None  # type: ignore[method-assign]
+    chat_routes._chat_service.provider = StubProvider()
+    async with async_engine.connect():
+        pass  # the dialect's first-connect queries are not the request's
+
+    rows: List[Row] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+        account = {"name": "Bench", "email": email, "password": "secret1"}
+        (await c.post("/api/register", json=account)).raise_for_status()
+        login = await c.post("/api/login", json=account)
+        c.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+        (await c.get("/api/me")).raise_for_status()  # warm the principal cache
+
+        async def step(label: str, method: str, url: str, body: Any = None) -> Any:
+            problem = None
+            try:
+                with query_budget_block(BUDGETS[label]):
+                    count, data = await statements(c, method, url, body)
+            except AssertionError as exc:
+                problem = str(exc)
+            rows.append((label, count, BUDGETS[label], problem))
+            return data
+
+        journal = {"title": "t", "content": "c", "tags": ["sleep", "work"]}
+        blog = {"title": "t", "content": "c", "tags": ["sleep"]}
+        voice = {"session_id": str(uuid.uuid4()), "status": "ended"}
+        for _ in range(ROWS - 1):
+            await statements(
+                c,
+                "POST",
+                "/api/journals",
+                {**journal, "entry_date": "2024-02-04T19:30:00Z"},
+            )
+            await statements(c, "POST", "/api/blogs", blog)
+            await statements(c, "POST", "/api/voice-session-responses/", voice)
+
+        await step("GET /api/me", "GET", "/api/me")
+
+        j = await step(
+            "POST /api/journals",
+            "POST",
+            "/api/journals",
+            {**journal, "entry_date": "2024-02-04T19:30:00Z"},
+        )
+        await step("GET /api/journals", "GET", "/api/journals")
+        await step("GET /api/journals?q=", "GET", "/api/journals?q=t")
+        await step("GET /api/journals/tags", "GET", "/api/journals/tags")
+        await step("GET /api/journals/{id}", "GET", f"/api/journals/{j['id']}")
+        await step(
+            "PUT /api/journals/{id}", "PUT", f"/api/journals/{j['id']}", {"title": "t2"}
+        )
+        await step("DELETE /api/journals/{id}", "DELETE", f"/api/journals/{j['id']}")
+
+        b = await step("POST /api/blogs", "POST", "/api/blogs", blog)
+        await step("GET /api/blogs", "GET", "/api/blogs")
+        await step("GET /api/blogs/tags", "GET", "/api/blogs/tags")
+        await step("GET /api/blogs/{id}", "GET", f"/api/blogs/{b['id']}")
+        await step(
+            "PUT /api/blogs/{id}", "PUT", f"/api/blogs/{b['id']}", {"title": "t2"}
+        )
+        await step("DELETE /api/blogs/{id}", "DELETE", f"/api/blogs/{b['id']}")
+
+        e = await step(
+            "POST /api/eve/journals",
+            "POST",
+            "/api/eve/journals",
+            {"title": "t", "content": "c"},
+        )
+        for _ in range(ROWS - 1):
+            await statements(
+                c,
+                "POST",
+                f"/api/eve/journals/{e['id']}/messages",
+                {"text": "hi", "role": "user"},
+            )
+        await step("GET /api/eve/journals", "GET", "/api/eve/journals")
+        await step("GET /api/eve/journals/{id}", "GET", f"/api/eve/journals/{e['id']}")
+        await step(
+            "PUT /api/eve/journals/{id}",
+            "PUT",
+            f"/api/eve/journals/{e['id']}",
+            {"title": "t2"},
+        )
+        m = await step(
+            "POST /api/eve/journals/{id}/messages",
+            "POST",
+            f"/api/eve/journals/{e['id']}/messages",
+            {"text": "hi", "role": "user"},
+        )
+        await step(
+            "GET /api/eve/journals/{id}/messages",
+            "GET",
+            f"/api/eve/journals/{e['id']}/messages",
+        )
+        await step(
+            "PUT /api/eve/messages/{id}",
+            "PUT",
+            f"/api/eve/messages/{m['id']}",
+            {"text": "hey"},
+        )
+        await step(
+            "DELETE /api/eve/messages/{id}", "DELETE", f"/api/eve/messages/{m['id']}"
+        )
+        await step(
+            "DELETE /api/eve/journals/{id}", "DELETE", f"/api/eve/journals/{e['id']}"
+        )
+
+        v = await step(
+            "POST /api/voice-session-responses/",
+            "POST",
+            "/api/voice-session-responses/",
+            voice,
+        )
+        await step(
+            "GET /api/voice-session-responses/", "GET", "/api/voice-session-responses/"
+        )
+        await step(
+            "GET /api/voice-session-responses/{id}",
+            "GET",
+            f"/api/voice-session-responses/{v['id']}",
+        )
+        await step(
+            "GET /api/voice-session-responses/session/{id}",
+            "GET",
+            f"/api/voice-session-responses/session/{voice['session_id']}",
+        )
+        await step(
+            "PUT /api/voice-session-responses/{id}",
+            "PUT",
+            f"/api/voice-session-responses/{v['id']}",
+            {"summary": "s"},
+        )
+        await step(
+            "DELETE /api/voice-session-responses/{id}",
+            "DELETE",
+            f"/api/voice-session-responses/{v['id']}",
+        )
+
+        s = await step(
+            "POST /api/chat/session", "POST", "/api/chat/session", {"title": "t"}
+        )
+        for _ in range(ROWS - 1):
+            await statements(
+                c, "POST", f"/api/chat/{s['session_id']}/message", {"text": "hello"}
+            )
+        await step(
+            "POST /api/chat/{id}/message",
+            "POST",
+            f"/api/chat/{s['session_id']}/message",
+            {"text": "hello"},
+        )
+        await step("GET /api/chat/{id}", "GET", f"/api/chat/{s['session_id']}")
+        await step("DELETE /api/chat/{id}", "DELETE", f"/api/chat/{s['session_id']}")
+    await async_engine.dispose()
+
+    failed = [problem for *_, problem in rows if problem]
+    width = max(len(label) for label, *_ in rows) + 2
+    print(f"{'route':<{width}}{'stmts':>7}{'budget':>8}")
+    for label, count, budget, problem in rows:
+        if count > budget:
+            note = "  OVER BUDGET"
+        elif problem:
+            note = "  REPEATED STATEMENT"
+        elif count < budget:
+            note = "  under budget, tighten it"
+        else:
+            note = ""
+        print(f"{label:<{width}}{count:>7}{budget:>8}{note}")
+
+    for problem in failed:
+        print(f"\n{problem}")
+    print(f"\n{len(failed)} route(s) failed" if failed else "\nall routes in budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.parse_args()
+    sys.exit(asyncio.run(main()))
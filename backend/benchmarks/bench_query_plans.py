@@ -0,0 +1,329 @@
+"""
+Plan regression check: the list queries must read an index in order,
+never scan a table and sort it.
+
+    cd backend && DB_URI=postgresql://... python -m benchmarks.bench_query_plans --rows 300000
+
+Needs a migrated database. Loads a synthetic dataset (--rows journals,
+blogs, chat messages, eve messages and voice session responses over
+--users users, the messages spread over about ten months of partitions),
+ANALYZEs it, runs each list query through the service code that serves
+it and EXPLAIN ANALYZEs every statement it issued. All of it happens in
+one transaction that is rolled back, so the database is left as it was.
+
+A plan fails when it reads rows with a Seq Scan of one of the tables
+below, has a Sort node, or reads every monthly partition of a
+partitioned table. Exits 1 if any plan failed, so it can gate a
+migration or a change to a list query.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import re
+import sys
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Tuple
+
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+import app.main  # noqa: F401  (registers every model for the relationships)
+from app.models.chat import ChatSession, Message
+from app.models.eve import EveSession
+from app.models.user import User
+from app.services.blog import blog as blog_service
+from app.services.chat.chat import ChatService
+from app.services.eve.eve import EveService
+from app.services.journal import journal as journal_service
+from app.services.voice_session_response.voice_session_response import (
+    VoiceSessionResponseService,
+)
+from app.utilities.db import async_engine
+from app.utilities.pagination import paginate
+from app.utilities.partitions import (
+    PARTITIONED_TABLES,
+    create_partition,
+    current_month,
+    list_partitions,
+    month_floor,
+    month_range,
+)
+from app.utilities.principal import Principal
+
+TABLES = [
+    "users",
+    "journals",
+    "blogs",
+    "messages",
+    "eve_messages",
+    "voice_session_responses",
+]
+BAD_NODES = {"Sort", "Incremental Sort"}
+# whole, unpaginated lists of one session: a Sort of those few rows is fine
+SORT_OK = {"eve session messages"}
+_PARTITION_SUFFIX = re.compile(r"_(y\d{4}m\d{2}|default)$")
+
+# every user gets rows/users of each, except chats: one in ten users has
+# one, so a chat is longer than a history page. Chat and eve sessions start
+# hours apart over months, and their messages follow within minutes. The
+# probed user is plan-u0. Ids are md5 hashes of 'plan-<kind><n>', cast to uuid.
+SEED = [
+    """
+    INSERT INTO users (id, email, hashed_password, is_admin, created_at)
+    SELECT md5('plan-u' || g)::uuid, 'plan-' || g || '@example.com', 'x',
+           g % 100 = 0, now() - g * interval '1 minute'
+    FROM generate_series(0, :users - 1) g
+    """,
+    """
+    INSERT INTO journals (id, user_id, title, content, entry_date, created_at)
+    SELECT md5('plan-j' || g)::uuid, md5('plan-u' || (g % :users))::uuid,
+           'entry ' || g, 'text', now(), now() - g * interval '1 second'
+    FROM generate_series(0, :rows - 1) g
+    """,
+    """
+    INSERT INTO blogs (id, user_id, title, content, created_at)
+    SELECT md5('plan-b' || g)::uuid, md5('plan-u' || (g % :users))::uuid,
+           'post ' || g, 'text', now() - g * interval '1 second'
+    FROM generate_series(0, :rows - 1) g
+    """,
+    """
+    INSERT INTO chat_sessions (user_id, title, created_at)
+    SELECT md5('plan-u' || g)::uuid, 'plan',
+           now() - g * 300 / :users * interval '1 day'
+    FROM generate_series(0, :users - 1, 10) g
+    """,
+    """
+    INSERT INTO messages (session_id, role, content, created_at)
+    SELECT s.id, 'user', 'hello', s.created_at + g / (:users / 10) * interval '1 second'
+    FROM generate_series(0, :rows - 1) g
+    JOIN (SELECT id, created_at, row_number() OVER (ORDER BY id) - 1 AS n
+          FROM chat_sessions WHERE title = 'plan') s ON s.n = g % (:users / 10)
+    """,
+    """
+    INSERT INTO voice_session_responses (id, user_id, session_id, status, created_at)
+    SELECT md5('plan-v' || g)::uuid, md5('plan-u' || (g % :users))::uuid,
+           'plan-s' || (g / 4), 'ended', now() - g * interval '1 second'
+    FROM generate_series(0, :rows - 1) g
+    """,
+    """
+    INSERT INTO eve_sessions (id, user_id, system_prompt, is_active, created_at)
+    SELECT md5('plan-e' || g)::uuid, md5('plan-u' || (g % :users))::uuid, '',
+           g % 10 = 0, now() - g * 300 / (:rows / 10) * interval '1 day'
+    FROM generate_series(0, :rows / 10 - 1) g
+    """,
+    """
+    INSERT INTO eve_messages (id, user_id, session_id, role, text, created_at)
+    SELECT md5('plan-m' || g)::uuid, s.user_id, s.id, 'user', 'hello',
+           s.created_at + g / (:rows / 10) * interval '1 second'
+    FROM generate_series(0, :rows - 1) g
+    JOIN eve_sessions s ON s.id = md5('plan-e' || (g % (:rows / 10)))::uuid
+    """,
+]
+
+Case = Tuple[str, Callable[[AsyncSession], Awaitable[Any]]]
+
+
+def plan_id(key: str) -> str:
+    """The id SEED gives row `key`, e.g. plan_id("plan-u0")."""
+    return str(uuid.UUID(hashlib.md5(key.encode()).hexdigest()))
+
+
+def principal(user_id: str) -> Principal:
+    return Principal(
+        id=user_id,
+        email=f"{user_id}@example.com",
+        name=None,
+        username=None,
+        is_admin=False,
+        photo_version=None,
+        created_at=None,
+    )
+
+
+def cases(conn: AsyncConnection, chat_session_id: int) -> List[Case]:
+    user = principal(plan_id("plan-u0"))
+
+    def session() -> AsyncSession:
+        return AsyncSession(
+            bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False
+        )
+
+    chat = ChatService(provider=None, db_session_factory=session)  # type: ignore[arg-type]
+
+    async def journals(db: AsyncSession) -> Any:
+        first = await journal_service.list_journals(db, user_id=user.id, limit=20)
+        return await journal_service.list_journals(
+            db, user_id=user.id, cursor=first.next_cursor, limit=20
+        )
+
+    async def chat_history(db: AsyncSession) -> Any:
+        # as GET /api/chat/{session_id}
+        cs = await db.get(ChatSession, chat_session_id)
+        assert cs is not None
+        return await paginate(
+            db,
+            select(Message).where(
+                Message.session_id == chat_session_id,
+                Message.created_at >= month_floor(cs.created_at),
+            ),
+            created_col=Message.created_at,
+            id_col=Message.id,
+            limit=100,
+            descending=False,
+        )
+
+    async def admin_users(db: AsyncSession) -> Any:
+        # as GET /api/admin/users
+        return await paginate(
+            db,
+            select(User).where(getattr(User.is_admin, "is_")(False)),
+            created_col=User.created_at,
+            id_col=User.id,
+            limit=50,
+        )
+
+    async def active_eve_session(db: AsyncSession) -> Any:
+        # as EveService.voice_turn / end_voice_session, without the STT
+        stmt = select(EveSession).where(
+            EveSession.id == plan_id("plan-e0"),
+            EveSession.user_id == user.id,
+            EveSession.is_active,
+        )
+        return (await db.execute(stmt)).scalar_one_or_none()
+
+    return [
+        ("journals, pages 1 and 2", journals),
+        ("blogs", lambda db: blog_service.list_blogs(db, limit=20)),
+        ("chat history", chat_history),
+        ("chat model context", lambda db: chat._history(db, chat_session_id, 20)),
+        (
+            "voice responses",
+            lambda db: VoiceSessionResponseService(db).list_responses(user, limit=20),
+        ),
+        (
+            "voice responses by session",
+            lambda db: VoiceSessionResponseService(db).get_responses_by_session(
+                "plan-s0", user
+            ),
+        ),
+        ("active eve session", active_eve_session),
+        (
+            "eve session messages",
+            lambda db: EveService(db).list_session_messages(plan_id("plan-e0"), user),
+        ),
+        ("admin users", admin_users),
+    ]
+
+
+def walk(node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk(child)
+
+
+def table_of(relation: str) -> str:
+    """The table a partition belongs to: messages_y2025m03 -> messages"""
+    return _PARTITION_SUFFIX.sub("", relation)
+
+
+def problems(
+    plan: Dict[str, Any], months: Dict[str, int], sort_ok: bool = False
+) -> List[str]:
+    found = []
+    read: Dict[str, int] = {}
+    for node in walk(plan):
+        kind = node["Node Type"]
+        relation = node.get("Relation Name", "")
+        if node.get("Actual Loops", 0) and relation != table_of(relation):
+            read[table_of(relation)] = read.get(table_of(relation), 0) + 1
+        scanned = node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)
+        if kind == "Seq Scan" and table_of(relation) in TABLES and scanned:
+            found.append(f"Seq Scan on {relation}")
+        elif kind in BAD_NODES and not sort_ok:
+            found.append(f"{kind} ({', '.join(node.get('Sort Key', []))})")
+    for table, count in read.items():
+        # + 1 for the default partition
+        if count >= months[table] + 1:
+            found.append(f"all {count} partitions of {table} read")
+    return found
+
+
+def summary(plan: Dict[str, Any]) -> str:
+    scans = []
+    for n in walk(plan):
+        if n.get("Index Name") and n.get("Actual Loops", 0):
+            scan = f"{n['Node Type']} using {n['Index Name']}"
+            relation = n.get("Relation Name", "")
+            if relation != table_of(relation):
+                scan += f" on {relation}"
+            scans.append(scan)
+    return "; ".join(scans) or plan["Node Type"]
+
+
+async def main(rows: int, users: int) -> int:
+    captured: List[Tuple[str, Any]] = []
+
+    def capture(
+        conn: Any, cursor: Any, statement: str, params: Any, *args: Any
+    ) -> None:
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((statement, params))
+
+    failed = 0
+    async with async_engine.connect() as conn:
+        await conn.begin()
+        started = datetime.now(timezone.utc)
+        # the months the seeded messages fall in
+        months: Dict[str, int] = {}
+        for table in PARTITIONED_TABLES:
+            for month in month_range(current_month().plus(-10), current_month()):
+                await create_partition(conn, table, month)
+            months[table] = len(await list_partitions(conn, table))
+        for stmt in SEED:
+            await conn.execute(text(stmt), {"rows": rows, "users": users})
+        for table in TABLES + ["eve_sessions"]:
+            await conn.execute(text(f"ANALYZE {table}"))
+        chat_session_id = (
+            await conn.execute(
+                text("SELECT min(id) FROM chat_sessions WHERE title = 'plan'")
+            )
+        ).scalar_one()
+        seconds = (datetime.now(timezone.utc) - started).total_seconds()
+        print(f"seeded {rows} rows per table over {users} users in {seconds:.1f}s\n")
+
+        for label, run in cases(conn, chat_session_id):
+            captured.clear()
+            event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+            try:
+                async with AsyncSession(
+                    bind=conn, join_transaction_mode="create_savepoint"
+                ) as db:
+                    await run(db)
+            finally:
+                event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+            for statement, params in captured:
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, FORMAT JSON) {statement}", tuple(params or ())
+                )
+                plan = result.scalar_one()[0]["Plan"]
+                bad = problems(plan, months, label in SORT_OK)
+                failed += bool(bad)
+                status = "FAIL " + ", ".join(bad) if bad else "ok"
+                sql = " ".join(statement.split())
+                print(f"{label:<28}{status}\n    {sql[:110]}\n    {summary(plan)}")
+        await conn.rollback()
+    await async_engine.dispose()
+
+    print(f"\n{failed} plan(s) failed" if failed else "\nall plans use an index")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=300000)
+    parser.add_argument("--users", type=int, default=5000)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.rows, args.users)))
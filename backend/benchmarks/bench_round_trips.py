@@ -0,0 +1,194 @@
+"""
+Database work per write request: statements, transactions and pool
+checkouts for each create/update/delete route.
+
+    cd backend && DB_URI=postgresql://... python -m benchmarks.bench_round_trips
+
+Needs a migrated database; it registers a throwaway user and drives the
+routes through the ASGI app. Every transaction costs two round trips on
+top of its statements (BEGIN and COMMIT/ROLLBACK), so the last column is
+what a request pays in network latency to Postgres. The model call behind
+chat messages is stubbed, and embedding refreshes (queued in the
+background after the response) are switched off so only the request's
+own queries are counted.
+"""
+
+import argparse
+import asyncio
+import uuid
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional
+
+import httpx
+from sqlalchemy import event
+
+from app.main import app
+from app.routes.chat import chat as chat_routes
+from app.services.embeddings.embeddings import journal_embeddings
+from app.utilities.db import async_engine
+
+
+@dataclass
+class Counts:
+    statements: int = 0
+    transactions: int = 0
+    checkouts: int = 0
+
+    @property
+    def round_trips(self) -> int:
+        return self.statements + 2 * self.transactions
+
+
+counts = Counts()
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _statement(*args: Any) -> None:
+    counts.statements += 1
+
+
+@event.listens_for(async_engine.sync_engine, "begin")
+def _begin(conn: Any) -> None:
+    counts.transactions += 1
+
+
+@event.listens_for(async_engine.sync_engine.pool, "checkout")
+def _checkout(*args: Any) -> None:
+    counts.checkouts += 1
+
+
+class StubProvider:
+    async def generate_response(self, prompt: str, history: List[Any]) -> str:
+        return "stub reply"
+
+
+async def measure(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    json: Optional[Dict[str, Any]] = None,
+) -> "tuple[Counts, Any]":
+    global counts
+    counts = Counts()
+    response = await client.request(method, url, json=json)
+    response.raise_for_status()
+    return replace(counts), response.json() if response.content else None
+
+
+async def main() -> None:
+    journal_embeddings.schedule = lambda journal_id: None  # type: ignore[method-assign]
+    chat_routes._chat_service.provider = StubProvider()
+    async with async_engine.connect():
+        pass  # the dialect's first-connect queries are not the request's
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+        account = {"name": "Bench", "email": email, "password": "secret1"}
+        rows = [
+            ("POST /api/register", *await measure(c, "POST", "/api/register", account))
+        ]
+        login = await c.post("/api/login", json=account)
+        c.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+        await c.get("/api/me")  # warm the principal cache
+
+        async def step(label: str, method: str, url: str, body: Any = None) -> Any:
+            counted, data = await measure(c, method, url, body)
+            rows.append((label, counted, data))
+            return data
+
+        j = await step(
+            "POST /api/journals",
+            "POST",
+            "/api/journals",
+            {"title": "t", "content": "c", "entry_date": "2024-02-04T19:30:00Z"},
+        )
+        await step(
+            "PUT /api/journals/{id}", "PUT", f"/api/journals/{j['id']}", {"title": "t2"}
+        )
+        await step("DELETE /api/journals/{id}", "DELETE", f"/api/journals/{j['id']}")
+        b = await step(
+            "POST /api/blogs", "POST", "/api/blogs", {"title": "t", "content": "c"}
+        )
+        await step(
+            "PUT /api/blogs/{id}", "PUT", f"/api/blogs/{b['id']}", {"title": "t2"}
+        )
+        await step("DELETE /api/blogs/{id}", "DELETE", f"/api/blogs/{b['id']}")
+        e = await step(
+            "POST /api/eve/journals",
+            "POST",
+            "/api/eve/journals",
+            {"title": "t", "content": "c"},
+        )
+        await step(
+            "PUT /api/eve/journals/{id}",
+            "PUT",
+            f"/api/eve/journals/{e['id']}",
+            {"title": "t2"},
+        )
+        m = await step(
+            "POST /api/eve/journals/{id}/messages",
+            "POST",
+            f"/api/eve/journals/{e['id']}/messages",
+            {"text": "hi", "role": "user"},
+        )
+        await step(
+            "PUT /api/eve/messages/{id}",
+            "PUT",
+            f"/api/eve/messages/{m['id']}",
+            {"text": "hey"},
+        )
+        await step(
+            "DELETE /api/eve/messages/{id}", "DELETE", f"/api/eve/messages/{m['id']}"
+        )
+        await step(
+            "DELETE /api/eve/journals/{id}", "DELETE", f"/api/eve/journals/{e['id']}"
+        )
+        v = await step(
+            "POST /api/voice-session-responses/",
+            "POST",
+            "/api/voice-session-responses/",
+            {"session_id": str(uuid.uuid4()), "status": "ended"},
+        )
+        await step(
+            "PUT /api/voice-session-responses/{id}",
+            "PUT",
+            f"/api/voice-session-responses/{v['id']}",
+            {"summary": "s"},
+        )
+        await step(
+            "DELETE /api/voice-session-responses/{id}",
+            "DELETE",
+            f"/api/voice-session-responses/{v['id']}",
+        )
+        s = await step(
+            "POST /api/chat/session", "POST", "/api/chat/session", {"title": "t"}
+        )
+        await step(
+            "POST /api/chat/{id}/message",
+            "POST",
+            f"/api/chat/{s['session_id']}/message",
+            {"text": "hello"},
+        )
+        await step(
+            "POST /api/chat/{id}/message (crisis)",
+            "POST",
+            f"/api/chat/{s['session_id']}/message",
+            {"text": "I want to kill myself"},
+        )
+        await step("DELETE /api/chat/{id}", "DELETE", f"/api/chat/{s['session_id']}")
+
+    width = max(len(label) for label, _, _ in rows) + 2
+    print(f"{'route':<{width}}{'stmts':>7}{'txns':>6}{'conns':>7}{'round trips':>13}")
+    for label, counted, _ in rows:
+        print(
+            f"{label:<{width}}{counted.statements:>7}{counted.transactions:>6}"
+            f"{counted.checkouts:>7}{counted.round_trips:>13}"
+        )
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.parse_args()
+    asyncio.run(main())
@@ -0,0 +1,155 @@
+"""
+ilike vs full-text search on a synthetic journal table.
+
+    cd backend && DB_URI=postgresql://... python -m benchmarks.bench_search --rows 1000000
+
+Builds `bench_search_docs` (title + ~60-word body, Zipf-ish vocabulary) in
+the configured database, adds the same generated tsvector column and GIN
+index the app uses, then times the first page of each search shape the
+list endpoints run. Pass --keep to reuse the table on the next run.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config import settings
+from app.utilities.db import async_engine
+from app.utilities.search import SEARCH_CONFIG, search_vector_ddl
+
+TABLE = "bench_search_docs"
+
+COMMON = (
+    "today feel felt really tired happy sad anxious stressed work college exam "
+    "friend friends family mom dad sleep slept morning night walk talk coffee "
+    "tea rain music movie class assignment deadline phone call message weekend "
+    "gym run running ran food lunch dinner breakfast better worse okay alone "
+    "calm breathe meditation journal write wrote think thinking overthinking "
+    "boss meeting project bus metro traffic late early tomorrow yesterday"
+).split()
+
+# (label, query) — a very common word, a mid-frequency one, a rare token,
+# a phrase and a miss
+QUERIES: List[Tuple[str, str]] = [
+    ("common", "today"),
+    ("mid", "meditation"),
+    ("rare", "kw4242"),
+    ("phrase", "morning walk"),
+    ("miss", "zzzunmatched"),
+]
+REPEATS = 5
+
+
+async def build(conn: AsyncConnection, rows: int) -> None:
+    await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    await conn.execute(
+        text(
+            f"CREATE TABLE {TABLE} (id bigserial PRIMARY KEY, title text, "
+            "content text, created_at timestamptz NOT NULL DEFAULT now())"
+        )
+    )
+    # Common words for most positions, 5000 rare kwNNNN tokens for the rest;
+    # random()^3 skews picks toward the head of the list.
+    vocab = "(ARRAY[" + ",".join(f"'{w}'" for w in COMMON) + "])"
+    await conn.execute(
+        text(f"""
+            INSERT INTO {TABLE} (title, content, created_at)
+            SELECT
+                array_to_string(ARRAY(
+                    SELECT {vocab}[1 + floor(random() ^ 3 * {len(COMMON)})::int]
+                    FROM generate_series(1, 4) WHERE g > 0), ' '),
+                array_to_string(ARRAY(
+                    SELECT CASE WHEN random() < 0.05
+                        THEN 'kw' || lpad(floor(random() * 5000)::text, 4, '0')
+                        ELSE {vocab}[1 + floor(random() ^ 3 * {len(COMMON)})::int]
+                    END
+                    FROM generate_series(1, 60) WHERE g > 0), ' '),
+                now() - (g || ' seconds')::interval
+            FROM generate_series(1, :rows) AS g
+            """),
+        {"rows": rows},
+    )
+    await conn.execute(text(f"CREATE INDEX ON {TABLE} (created_at DESC, id DESC)"))
+    for stmt in search_vector_ddl(TABLE):
+        await conn.execute(text(stmt))
+    await conn.execute(text(f"ANALYZE {TABLE}"))
+
+
+ILIKE = f"""
+    SELECT id FROM {TABLE}
+    WHERE title ILIKE :pattern OR content ILIKE :pattern
+    ORDER BY created_at DESC, id DESC LIMIT 10
+"""
+# Same shape as app.utilities.search.ranked_search: rank the newest
+# SEARCH_RANK_WINDOW matches, return the best 10.
+FTS = f"""
+    SELECT id, ts_rank(search_vector, query) AS rank
+    FROM {TABLE}, websearch_to_tsquery('{SEARCH_CONFIG}', :q) AS query
+    WHERE id IN (
+        SELECT id FROM {TABLE}
+        WHERE search_vector @@ websearch_to_tsquery('{SEARCH_CONFIG}', :q)
+        ORDER BY created_at DESC LIMIT {settings.search_rank_window}
+    )
+    ORDER BY rank DESC, id DESC LIMIT 10
+"""
+
+
+async def timed(conn: AsyncConnection, sql: str, params: Dict[str, Any]) -> float:
+    runs = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        await conn.execute(text(sql), params)
+        runs.append((time.perf_counter() - start) * 1000)
+    return statistics.median(runs)
+
+
+async def uses_index(conn: AsyncConnection, sql: str, params: Dict[str, Any]) -> bool:
+    plan = (await conn.execute(text(f"EXPLAIN {sql}"), params)).scalars().all()
+    return any(f"ix_{TABLE}_search_vector" in line for line in plan)
+
+
+async def main(rows: int, keep: bool) -> None:
+    async with async_engine.connect() as conn:
+        # as in ranked_search(): no generic plans for term-dependent queries
+        await conn.execute(text("SET plan_cache_mode = force_custom_plan"))
+        existing = (
+            await conn.execute(text(f"SELECT count(*) FROM {TABLE}"))
+            if keep
+            and (
+                await conn.execute(text("SELECT to_regclass(:t)"), {"t": TABLE})
+            ).scalar()
+            else None
+        )
+        if existing is None or existing.scalar() != rows:
+            start = time.perf_counter()
+            await build(conn, rows)
+            await conn.commit()
+            print(f"built {rows:,} rows in {time.perf_counter() - start:.0f}s")
+
+        print(f"\n{'query':<8}{'ilike ms':>12}{'fts ms':>10}{'speedup':>10}  gin")
+        for label, q in QUERIES:
+            ilike_ms = await timed(conn, ILIKE, {"pattern": f"%{q}%"})
+            fts_ms = await timed(conn, FTS, {"q": q})
+            gin = await uses_index(conn, FTS, {"q": q})
+            print(
+                f"{label:<8}{ilike_ms:>12.1f}{fts_ms:>10.1f}"
+                f"{ilike_ms / fts_ms:>9.1f}x  {'yes' if gin else 'no'}"
+            )
+
+        if not keep:
+            await conn.execute(text(f"DROP TABLE {TABLE}"))
+            await conn.commit()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.keep))
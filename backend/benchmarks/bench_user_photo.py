@@ -0,0 +1,172 @@
+"""
+Bytes read per authenticated request, before and after moving User.photo
+out of the users row.
+
+    cd backend && DB_URI=postgresql://... python -m benchmarks.bench_user_photo --users 500
+
+Builds two copies of the users table: `bench_users_inline` in the old shape,
+with the photo as a bytea column, and `bench_users` in the new shape, which
+only has photo_version. Each copy is filled with the same users and
+incompressible ~JPEG-sized photos. The benchmark then runs the two lookups
+every request makes:
+
+- `db.get(User, id)` in get_current_user.
+- The selectinload(Blog.user) batch behind a 10-post feed page.
+
+Reported per request: bytes returned to the app, heap and TOAST pages
+Postgres touched (from pg_statio), and median latency.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import statistics
+import time
+from typing import Any, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.models.user import User
+from app.utilities.db import async_engine
+
+BEFORE = "bench_users_inline"
+AFTER = "bench_users"
+REPEATS = 200
+PAGE_AUTHORS = 10
+
+# Exactly what the ORM selects for a User today
+COLUMNS = [c.name for c in User.__table__.columns]  # type: ignore[attr-defined]
+
+
+async def build(conn: AsyncConnection, users: int, photo_kb: int) -> List[str]:
+    for table in (BEFORE, AFTER):
+        await conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    base = (
+        "id varchar(36) PRIMARY KEY, name varchar(255), age int, "
+        "gender varchar(32), username varchar(128), email varchar(255), "
+        "hashed_password varchar(255), is_admin boolean, "
+        "created_at timestamptz NOT NULL DEFAULT now()"
+    )
+    await conn.execute(text(f"CREATE TABLE {BEFORE} ({base}, photo bytea)"))
+    await conn.execute(
+        text(f"CREATE TABLE {AFTER} ({base}, photo_version varchar(32))")
+    )
+    ids = [f"{i:08d}-0000-0000-0000-000000000000" for i in range(users)]
+    for i, ident in enumerate(ids):
+        row = {
+            "id": ident,
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "pw": "$2b$12$" + "x" * 53,
+            # random bytes: JPEG data does not compress, so TOAST stores it as is
+            "photo": os.urandom(photo_kb * 1024),
+            "version": hashlib.md5(ident.encode()).hexdigest(),
+        }
+        await conn.execute(
+            text(
+                f"INSERT INTO {BEFORE} (id, name, username, email, hashed_password, "
+                "is_admin, photo) VALUES (:id, :name, :id, :email, :pw, false, :photo)"
+            ),
+            row,
+        )
+        await conn.execute(
+            text(
+                f"INSERT INTO {AFTER} (id, name, username, email, hashed_password, "
+                "is_admin, photo_version) "
+                "VALUES (:id, :name, :id, :email, :pw, false, :version)"
+            ),
+            row,
+        )
+    for table in (BEFORE, AFTER):
+        await conn.execute(text(f"ANALYZE {table}"))
+    return ids
+
+
+async def pages_touched(conn: AsyncConnection, table: str) -> int:
+    # Backends publish their I/O counters when they go idle between
+    # transactions; force that, then read them fresh rather than snapshotted.
+    await conn.execute(text("SELECT pg_stat_force_next_flush()"))
+    await conn.commit()
+    await asyncio.sleep(0.05)
+    await conn.execute(text("SET stats_fetch_consistency = none"))
+    return int(
+        (
+            await conn.execute(
+                text(
+                    "SELECT coalesce(heap_blks_read + heap_blks_hit, 0) "
+                    "+ coalesce(toast_blks_read + toast_blks_hit, 0) "
+                    "+ coalesce(tidx_blks_read + tidx_blks_hit, 0) "
+                    "FROM pg_statio_user_tables WHERE relname = :t"
+                ),
+                {"t": table},
+            )
+        ).scalar_one()
+    )
+
+
+def _size(value: Any) -> int:
+    return len(value) if isinstance(value, bytes) else len(str(value))
+
+
+async def measure(
+    conn: AsyncConnection, table: str, columns: List[str], batches: List[List[str]]
+) -> Tuple[float, float, float]:
+    """(bytes returned, pages touched, median ms) per request."""
+    sql = text(f"SELECT {', '.join(columns)} FROM {table} WHERE id = ANY(:ids)")
+    pages_before = await pages_touched(conn, table)
+    returned = 0
+    runs = []
+    for ids in batches:
+        start = time.perf_counter()
+        rows = (await conn.execute(sql, {"ids": ids})).all()
+        runs.append((time.perf_counter() - start) * 1000)
+        returned += sum(_size(v) for row in rows for v in row)
+    pages = await pages_touched(conn, table) - pages_before
+    n = len(batches)
+    return returned / n, pages / n, statistics.median(runs)
+
+
+async def main(users: int, photo_kb: int) -> None:
+    async with async_engine.connect() as conn:
+        start = time.perf_counter()
+        ids = await build(conn, users, photo_kb)
+        await conn.commit()
+        print(
+            f"built {users:,} users with {photo_kb} KB photos "
+            f"in {time.perf_counter() - start:.0f}s"
+        )
+
+        step = max(1, users // REPEATS)
+        single = [[ids[(i * step) % users]] for i in range(REPEATS)]
+        feed = [
+            [ids[(i * step + j) % users] for j in range(PAGE_AUTHORS)]
+            for i in range(REPEATS)
+        ]
+        before_cols = [c for c in COLUMNS if c != "photo_version"] + ["photo"]
+
+        print(f"\n{'lookup':<22}{'bytes':>12}{'pages':>9}{'ms':>8}")
+        for label, batches in (
+            ("get_current_user", single),
+            (f"feed authors ({PAGE_AUTHORS})", feed),
+        ):
+            for shape, table, cols in (
+                ("before", BEFORE, before_cols),
+                ("after", AFTER, COLUMNS),
+            ):
+                size, pages, ms = await measure(conn, table, cols, batches)
+                print(f"{label + ' ' + shape:<22}{size:>12,.0f}{pages:>9.1f}{ms:>8.2f}")
+
+        for table in (BEFORE, AFTER):
+            await conn.execute(text(f"DROP TABLE {table}"))
+        await conn.commit()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--photo-kb", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.photo_kb))
@@ -0,0 +1,148 @@
+"""
+Primary-key layouts compared: VARCHAR(36) uuid4 (the old schema), native
+uuid with uuid4, and native uuid with UUIDv7 (the current schema).
+
+    cd backend && DB_URI=postgresql://... python -m benchmarks.bench_uuid_keys --rows 500000
+
+For each layout it builds `bench_keys_<layout>` (id primary key, an
+indexed user_id foreign-key column of the same type, a created_at and a
+short payload) in the configured database and inserts --rows rows in
+batches the way the app does, with ids generated in Python. Reported per
+layout: insert throughput, heap and index sizes, and the shared buffers
+one more batch dirties. Random keys touch a different leaf page per row
+and keep the whole index hot; time-ordered ones keep appending to the
+same few pages. CHECKPOINT needs a superuser or pg_checkpoint. The tables
+are dropped afterwards.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.utilities.db import async_engine
+from app.utilities.ids import uuid7
+
+BATCH = 1000
+USERS = 1000
+
+# name -> (column type, id generator)
+LAYOUTS: Dict[str, Tuple[str, Callable[[], uuid.UUID]]] = {
+    "varchar_uuid4": ("VARCHAR(36)", uuid.uuid4),
+    "uuid_uuid4": ("uuid", uuid.uuid4),
+    "uuid_uuid7": ("uuid", uuid7),
+}
+
+
+async def build(
+    conn: AsyncConnection,
+    table: str,
+    column_type: str,
+    rows: int,
+    new_id: Callable[[], uuid.UUID],
+    users: List[str],
+) -> float:
+    await conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    await conn.execute(
+        text(
+            f"CREATE TABLE {table} (id {column_type} PRIMARY KEY, "
+            f"user_id {column_type} NOT NULL, "
+            "created_at timestamptz NOT NULL DEFAULT now(), payload text)"
+        )
+    )
+    await conn.execute(text(f"CREATE INDEX ON {table} (user_id)"))
+    await conn.commit()
+
+    insert = f"INSERT INTO {table} (id, user_id, payload) VALUES ($1, $2, $3)"
+    start = time.perf_counter()
+    for done in range(0, rows, BATCH):
+        batch = [
+            (str(new_id()), random.choice(users), "x" * 120)
+            for _ in range(min(BATCH, rows - done))
+        ]
+        await conn.exec_driver_sql(insert, batch)
+        await conn.commit()
+    seconds = time.perf_counter() - start
+    await conn.execute(text(f"VACUUM ANALYZE {table}"))
+    return rows / seconds
+
+
+async def sizes(conn: AsyncConnection, table: str) -> Tuple[int, int, int]:
+    heap, pkey, user_ix = (
+        await conn.execute(
+            text(
+                "SELECT pg_relation_size(:t), pg_relation_size(:t || '_pkey'), "
+                "pg_relation_size(:t || '_user_id_idx')"
+            ),
+            {"t": table},
+        )
+    ).one()
+    return heap, pkey, user_ix
+
+
+async def dirtied_by_inserts(
+    conn: AsyncConnection,
+    table: str,
+    column_type: str,
+    new_id: Callable[[], uuid.UUID],
+    users: List[str],
+) -> int:
+    """Shared buffers dirtied by one more batch: pages a checkpoint must write."""
+    array_type = column_type.split("(")[0] + "[]"
+    await conn.execute(text("CHECKPOINT"))  # start from clean pages
+    ids = [str(new_id()) for _ in range(BATCH)]
+    owners = [random.choice(users) for _ in range(BATCH)]
+    result = await conn.exec_driver_sql(
+        "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+        f"INSERT INTO {table} (id, user_id, payload) "
+        f"SELECT i, u, repeat('x', 120) FROM unnest($1::{array_type}, "
+        f"$2::{array_type}) AS t(i, u)",
+        (ids, owners),
+    )
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"].get("Shared Dirtied Blocks", 0))
+
+
+def mb(n: int) -> str:
+    return f"{n / 1024 / 1024:.1f}"
+
+
+async def main(rows: int) -> None:
+    results = []
+    async with async_engine.connect() as raw:
+        conn = await raw.execution_options(isolation_level="AUTOCOMMIT")
+        for name, (column_type, new_id) in LAYOUTS.items():
+            table = f"bench_keys_{name}"
+            users = [str(new_id()) for _ in range(USERS)]
+            per_second = await build(conn, table, column_type, rows, new_id, users)
+            heap, pkey, user_ix = await sizes(conn, table)
+            dirtied = await dirtied_by_inserts(conn, table, column_type, new_id, users)
+            results.append((name, per_second, heap, pkey, user_ix, dirtied))
+            await conn.execute(text(f"DROP TABLE {table}"))
+
+    print(f"{rows:,} rows per layout, batches of {BATCH}\n")
+    print(
+        f"{'layout':<16}{'rows/s':>10}{'heap MB':>10}{'pkey MB':>10}"
+        f"{'user_id MB':>12}{f'dirtied by {BATCH} more':>22}"
+    )
+    for name, per_second, heap, pkey, user_ix, dirtied in results:
+        print(
+            f"{name:<16}{per_second:>10,.0f}{mb(heap):>10}{mb(pkey):>10}"
+            f"{mb(user_ix):>12}{dirtied:>22,}"
+        )
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows))
@@ -0,0 +1,73 @@
+"""
+Statement budgets per endpoint, for bench_query_budgets and as a pytest
+plugin (pytest is a dev dependency):
+
+    cd backend && python -m pytest -p benchmarks.query_budget
+
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    def test_blog_tags(query_budget):
+        with TestClient(app) as client, query_budget(1):
+            client.get("/api/blogs/tags")
+
+Every request the app serves inside the block must stay within the
+budget, and none may repeat one statement `max_repeats` times (a likely
+N+1). Requests are counted by the app's own request middleware, so this
+works with TestClient and httpx.ASGITransport alike; the middleware only
+counts while QUERY_STATS_ENABLED is on (the default).
+"""
+
+from contextlib import contextmanager
+from typing import Callable, ContextManager, Iterator, List, Optional, Tuple
+
+import pytest
+
+from app.config import settings
+from app.utilities import query_stats
+from app.utilities.query_stats import QueryStats
+
+Recorded = List[Tuple[str, str, QueryStats]]
+QueryBudget = Callable[..., ContextManager[Recorded]]
+
+
+def _describe(method: str, path: str, stats: QueryStats) -> str:
+    lines = [f"{method} {path}: {stats.statements} statements"]
+    for sql, count in stats.fingerprints.most_common():
+        lines.append(f"  {count} x {' '.join(sql.split())[:160]}")
+    return "\n".join(lines)
+
+
+@contextmanager
+def query_budget_block(
+    max_statements: int,
+    *,
+    max_repeats: Optional[int] = settings.query_repeat_threshold,
+) -> Iterator[Recorded]:
+    recorded: Recorded = []
+
+    def record(method: str, path: str, stats: QueryStats) -> None:
+        recorded.append((method, path, stats))
+
+    query_stats._recorders.append(record)
+    try:
+        yield recorded
+    finally:
+        query_stats._recorders.remove(record)
+
+    assert recorded, "no request was served inside the query_budget block"
+    for method, path, stats in recorded:
+        assert (
+            stats.statements <= max_statements
+        ), f"over budget ({max_statements}):\n{_describe(method, path, stats)}"
+        if max_repeats:
+            assert not stats.repeated(
+                max_repeats
+            ), f"repeated statement (likely N+1):\n{_describe(method, path, stats)}"
+
+
+@pytest.fixture
+def query_budget() -> QueryBudget:
+    """`with query_budget(n, max_repeats=...)`: see the module docstring."""
+    return query_budget_block